@@ -5,6 +5,7 @@ CSRF Protection for forms
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from fastapi import Request, HTTPException
 import os
+import secrets
 
 # Secret key for CSRF tokens
 SECRET_KEY = os.getenv("SECRET_KEY", "skaters-secret-key-change-in-production-please")
@@ -21,7 +22,6 @@ def generate_csrf_token(request: Request) -> str:
     # Use session ID or create a unique identifier
     session_id = request.session.get("_csrf_session_id")
     if not session_id:
-        import secrets
         session_id = secrets.token_urlsafe(32)
         request.session["_csrf_session_id"] = session_id
     
@@ -2,15 +2,26 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import Request
+from typing import AsyncGenerator, Generator, List
+import itertools
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL - defaults to SQLite for development
 # Railway provides DATABASE_URL for PostgreSQL
 import sys
@@ -30,39 +41,448 @@ else:
     # Local development - use SQLite
     DATABASE_URL = "sqlite:///./skaters.db"
 
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
+# Engine settings (see .env.example)
+DB_ECHO = _env_flag("DB_ECHO", "false")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+# SQLite (development) tuning
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", "256"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's pool, for sizing it under load"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.longest_hold = 0.0
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        with self._lock:
+            self.checked_out -= 1
+            self.longest_hold = max(self.longest_hold, time.monotonic() - started)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, engine: Engine) -> dict:
+        pool = engine.pool
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "longest_hold_ms": round(self.longest_hold * 1000, 1),
+            }
+        # QueuePool only
+        for name in ("size", "overflow", "timeout"):
+            if hasattr(pool, name):
+                value = getattr(pool, name)
+                stats[f"pool_{name}"] = value() if callable(value) else value
+        return stats
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_MB * 1024 * 1024}")
+    # Negative cache_size is in KiB
+    cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_MB * 1024}")
+    cursor.close()
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and url not in ("sqlite://", "sqlite:///:memory:") and "mode=memory" not in url
+
+
+def _engine_options(url: str, use_async: bool) -> dict:
+    options = {"echo": DB_ECHO}
+    if url.startswith("sqlite"):
+        if not use_async:
+            options["connect_args"] = {"check_same_thread": False}
+        # In-memory databases use a single shared connection, not a QueuePool
+        if _is_sqlite_file(url):
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+            if use_async:
+                # aiosqlite defaults to opening a connection per checkout
+                options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql"):
+        if use_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _instrument(sync_engine: Engine, url: str) -> None:
+    if _is_sqlite_file(url):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    sync_engine.pool_metrics = PoolMetrics()
+    sync_engine.pool_metrics.attach(sync_engine)
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Engine for `url` configured from the DB_* / SQLITE_* settings.
+
+    PostgreSQL gets a pre-pinged, recycled QueuePool and a server-side
+    statement_timeout; SQLite files get WAL and cache pragmas on connect.
+    Pool checkouts are counted in `engine.pool_metrics`.
+    """
+    new_engine = create_engine(url, **_engine_options(url, use_async=False))
+    _instrument(new_engine, url)
+    return new_engine
+
+
+def async_database_url(url: str) -> str:
+    """The same database through an asyncio driver (asyncpg / aiosqlite)"""
+    if url.startswith("postgresql://"):
+        # asyncpg spells libpq's sslmode as ssl
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1).replace("sslmode=", "ssl=")
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """create_db_engine for an asyncio driver; pool metrics live on `.sync_engine`"""
+    new_engine = create_async_engine(url, **_engine_options(url, use_async=True))
+    _instrument(new_engine.sync_engine, url)
+    return new_engine
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=True  # Set to False in production
-)
+engine = create_db_engine(DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that take an AsyncSession (get_async_db); the
+# rest run their sync sessions in the threadpool
+async_engine = create_async_db_engine(async_database_url(DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replicas for read-only GET routes (comma-separated URLs, may be empty)
+DATABASE_REPLICA_URLS = [
+    url.strip().replace("postgres://", "postgresql://", 1)
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# After a write, the user's reads stay on the primary this long (replication lag)
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "15"))
+# A replica that failed to connect is skipped this long
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+# Session key holding the time until which reads go to the primary
+PRIMARY_UNTIL_KEY = "db_primary_until"
+
+
+class ReplicaSet:
+    """Read replicas, used round-robin and skipped for a while after a connection failure"""
+
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self.engines = [create_db_engine(url) for url in urls]
+        self.async_engines = [create_async_db_engine(async_database_url(url)) for url in urls]
+        self.sessions = [sessionmaker(autocommit=False, autoflush=False, bind=e) for e in self.engines]
+        self.async_sessions = [
+            async_sessionmaker(e, autoflush=False, expire_on_commit=False) for e in self.async_engines
+        ]
+        self._down_until = [0.0] * len(urls)
+        self._turn = itertools.count()
+
+    def candidates(self) -> List[int]:
+        """Healthy replicas, starting with the next one in turn"""
+        count = len(self.urls)
+        if not count:
+            return []
+        start = next(self._turn) % count
+        now = time.monotonic()
+        indexes = ((start + offset) % count for offset in range(count))
+        return [index for index in indexes if self._down_until[index] <= now]
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        self._down_until[index] = time.monotonic() + REPLICA_RETRY_SECONDS
+        logger.warning(f"Read replica {index} unavailable, using the primary for {REPLICA_RETRY_SECONDS:.0f}s: {error}")
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator:
+@event.listens_for(Session, "after_flush")
+def _note_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+def _reads_from_primary(request: Request) -> bool:
+    """Whether this user wrote recently enough that a replica may not have caught up"""
+    return request.session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+def get_db(request: Request) -> Generator:
     """
     Dependency for getting database session
     Usage: db: Session = Depends(get_db)
+
+    Sessions are on the primary. If the request writes, the user's reads
+    stay on the primary for REPLICA_STICKY_SECONDS (read-your-writes).
     """
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        if replicas.urls and db.info.get("wrote"):
+            request.session[PRIMARY_UNTIL_KEY] = time.time() + REPLICA_STICKY_SECONDS
+        db.close()
+
+
+def open_read_session(use_primary: bool = False) -> Session:
+    """Session on a healthy read replica, else on the primary"""
+    if not use_primary:
+        for index in replicas.candidates():
+            db = replicas.sessions[index]()
+            try:
+                db.connection()
+                return db
+            except DBAPIError as e:
+                db.close()
+                replicas.mark_down(index, e)
+    return SessionLocal()
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Dependency for read-only GET routes: a session on a read replica when
+    one is configured and healthy, else on the primary
+    Usage: db: Session = Depends(get_read_db)
+    """
+    db = open_read_session(use_primary=_reads_from_primary(request))
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session
+    Usage: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def open_async_read_session(use_primary: bool = False) -> AsyncSession:
+    """open_read_session for an AsyncSession"""
+    if not use_primary:
+        for index in replicas.candidates():
+            db = replicas.async_sessions[index]()
+            try:
+                await db.connection()
+                return db
+            except DBAPIError as e:
+                await db.close()
+                replicas.mark_down(index, e)
+    return AsyncSessionLocal()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    get_read_db for async routes
+    Usage: db: AsyncSession = Depends(get_async_read_db)
+    """
+    db = await open_async_read_session(use_primary=_reads_from_primary(request))
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection (aiosqlite keeps a thread per connection)"""
+    for async_replica in [async_engine] + replicas.async_engines:
+        await async_replica.dispose()
+    for sync_engine in [engine] + replicas.engines:
+        sync_engine.dispose()
+
+
+def pool_stats() -> dict:
+    """Connection pool counters for every engine of this worker, by engine (shown on the admin dashboard)"""
+    stats = {
+        "primary": engine.pool_metrics.snapshot(engine),
+        "primary (async)": async_engine.sync_engine.pool_metrics.snapshot(async_engine.sync_engine),
+    }
+    for number, (replica, async_replica) in enumerate(zip(replicas.engines, replicas.async_engines), 1):
+        stats[f"replica {number}"] = replica.pool_metrics.snapshot(replica)
+        stats[f"replica {number} (async)"] = async_replica.sync_engine.pool_metrics.snapshot(async_replica.sync_engine)
+    return stats
+
+
 def init_db():
     """Initialize database - create all tables"""
     from app.models import venue  # Import models
     Base.metadata.create_all(bind=engine)
+    ensure_columns()
     print("✅ Database tables created successfully!")
 
 
+def upsert(connection, table, rows, key_columns, update_columns=None, changed_column=None, returning=None,
+           update_expressions=None):
+    """
+    Insert rows, updating the ones whose key already exists.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, and a
+    delete-then-insert elsewhere. `update_columns` limits what an existing
+    row gets overwritten with (default: every non-key column in the rows).
+    With `changed_column`, existing rows whose value in that column already
+    matches are left untouched. `returning` columns come back for the rows
+    that were inserted or updated. `update_expressions` maps some of the
+    update columns to a function of the `excluded` row that gives the value
+    to set instead of the incoming one.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy import and_
+        for row in rows:
+            connection.execute(table.delete().where(and_(*[table.c[key] == row[key] for key in key_columns])))
+        if returning:
+            return connection.execute(table.insert().returning(*returning), rows).all()
+        connection.execute(table.insert(), rows)
+        return
+
+    statement = insert(table)
+    if update_columns is None:
+        update_columns = [name for name in rows[0] if name not in key_columns]
+    updates = {name: statement.excluded[name] for name in update_columns}
+    for name, expression in (update_expressions or {}).items():
+        updates[name] = expression(statement.excluded)
+    where = None
+    if changed_column is not None:
+        where = table.c[changed_column].is_distinct_from(statement.excluded[changed_column])
+    statement = statement.on_conflict_do_update(index_elements=key_columns, set_=updates, where=where)
+    if returning:
+        return connection.execute(statement.returning(*returning), rows).all()
+    connection.execute(statement, rows)
+
+
+def ensure_columns():
+    """Add nullable (or defaulted) columns added to models after their tables already existed"""
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+    from app.models import venue  # Import models
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                    logger.info(f"Added column {table.name}.{column.name}")
+
+
+def ensure_created_at():
+    """
+    Backfill created_at on rows from before the column became NOT NULL.
+
+    Keyset pagination skips rows whose key is NULL. Old rows get their
+    updated_at (or now); PostgreSQL also gets the constraint, which SQLite
+    cannot add to an existing column.
+    """
+    from datetime import datetime
+    from sqlalchemy import func, inspect
+    from app.models import venue  # Import models
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            column = table.c.get("created_at")
+            if table.name not in existing or column is None or column.nullable:
+                continue
+            if "updated_at" in table.c:
+                # updated_at is set explicitly so its onupdate (ETags, sitemaps) does not fire
+                values = {"created_at": func.coalesce(table.c.updated_at, now), "updated_at": table.c.updated_at}
+            else:
+                values = {"created_at": now}
+            result = connection.execute(table.update().where(column.is_(None)).values(**values))
+            if result.rowcount:
+                logger.info(f"Backfilled {table.name}.created_at on {result.rowcount} rows")
+            nullable = any(c["name"] == "created_at" and c["nullable"] for c in inspector.get_columns(table.name))
+            if nullable and engine.dialect.name == "postgresql":
+                connection.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN created_at SET NOT NULL"))
+
+
+def ensure_indexes():
+    """Create indexes added to models after their tables already existed"""
+    from sqlalchemy import inspect
+    from app.models import venue  # Import models
+    existing = set(inspect(engine).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name in existing:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+
 def drop_db():
     """Drop all tables - use with caution!"""
     Base.metadata.drop_all(bind=engine)
@@ -3,26 +3,54 @@ Authentication and authorization dependencies
 """
 
 from fastapi import Request, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.venue import User
+from app.user_cache import UserPrincipal, user_cache
 from typing import Optional
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
+def _resolve_user(request: Request, db: Session, verify: bool) -> Optional[UserPrincipal]:
     """
-    Get the currently logged-in user from session.
-    Returns None if not authenticated.
+    Principal of the session's user, served from the request or the process
+    user cache when possible. With verify=False (pages that only display the
+    user) the principal stored in the session is good enough; otherwise an
+    expired cache entry is refreshed from the database.
     """
     user_id = request.session.get("user_id")
     if not user_id:
         return None
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+
+    resolved = getattr(request.state, "current_user", None)
+    if resolved is not None and resolved[0] == user_id and (resolved[2] or not verify):
+        return resolved[1]
+
+    verified, principal = user_cache.lookup(user_id)
+    if not verified:
+        stored = UserPrincipal.from_session(request.session.get("user"))
+        if not verify and stored is not None and stored.id == user_id:
+            principal = stored
+        else:
+            principal = user_cache.load(db, user_id)
+            verified = True
+
+    # Keep the session copy current so other workers see account changes
+    if verified and principal is not None and request.session.get("user") != principal.to_session():
+        request.session["user"] = principal.to_session()
+
+    request.state.current_user = (user_id, principal, verified)
+    return principal
 
 
-def require_auth(request: Request, db: Session = Depends(get_db)) -> User:
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> Optional[UserPrincipal]:
+    """
+    Get the currently logged-in user from session.
+    Returns None if not authenticated.
+    """
+    return _resolve_user(request, db, verify=True)
+
+
+def require_auth(request: Request, db: Session = Depends(get_db)) -> UserPrincipal:
     """
     Require user to be authenticated.
     Raises 401 if not logged in.
@@ -44,7 +72,7 @@ def require_auth(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
-def require_admin(request: Request, db: Session = Depends(get_db)) -> User:
+def require_admin(request: Request, db: Session = Depends(get_db)) -> UserPrincipal:
     """
     Require user to be an admin.
     Raises 401 if not logged in, 403 if not admin.
@@ -60,9 +88,15 @@ def require_admin(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
+def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[UserPrincipal]:
     """
     Get current user if logged in, None otherwise.
     Useful for pages that work both logged in and out.
+    Never queries the users table for sessions created at login.
     """
-    return get_current_user(request, db)
+    return _resolve_user(request, db, verify=False)
+
+
+async def get_current_user_optional_async(request: Request, db: AsyncSession) -> Optional[UserPrincipal]:
+    """get_current_user_optional for routes on an AsyncSession"""
+    return await db.run_sync(lambda session: _resolve_user(request, session, verify=False))
@@ -0,0 +1,159 @@
+"""
+Vectorized distance engine for "near me" lookups
+
+Holds venue coordinates as contiguous float64 arrays so haversine distances,
+radius masks and top-k selection run as single NumPy passes instead of a
+Python loop per venue.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.geo import EARTH_RADIUS_MILES
+
+# Upper bound on the (queries x venues) matrix built per chunk in batch
+# lookups, so precomputing for the whole catalog stays within a few dozen MB
+BATCH_CELLS = 4_000_000
+
+
+class DistanceEngine:
+    """Venue coordinates in radians, ready for vectorized haversine"""
+
+    def __init__(self, ids: Sequence[int], latitudes: Sequence[float], longitudes: Sequence[float]):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64)
+        self.lat = np.ascontiguousarray(np.radians(np.asarray(latitudes, dtype=np.float64)))
+        self.lng = np.ascontiguousarray(np.radians(np.asarray(longitudes, dtype=np.float64)))
+        self.cos_lat = np.cos(self.lat)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "DistanceEngine":
+        """Build from rows exposing id, latitude and longitude (ORM objects or column tuples)"""
+        rows = list(rows)
+        return cls(
+            [row.id for row in rows],
+            [row.latitude for row in rows],
+            [row.longitude for row in rows]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def distances(self, lat: float, lng: float) -> np.ndarray:
+        """Distance in miles from (lat, lng) to every venue"""
+        lat_rad = np.radians(lat)
+        lng_rad = np.radians(lng)
+
+        a = np.sin((self.lat - lat_rad) / 2) ** 2 + \
+            np.cos(lat_rad) * self.cos_lat * np.sin((self.lng - lng_rad) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def distance_matrix(self, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+        """Distances in miles with one row per query point and one column per venue"""
+        lat_rad = np.radians(np.asarray(lats, dtype=np.float64))[:, None]
+        lng_rad = np.radians(np.asarray(lngs, dtype=np.float64))[:, None]
+
+        a = np.sin((self.lat - lat_rad) / 2) ** 2 + \
+            np.cos(lat_rad) * self.cos_lat * np.sin((self.lng - lng_rad) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        radius: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions and distances of the k closest venues, nearest first.
+
+        Only venues within radius miles are considered when radius is given.
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        distances = self.distances(lat, lng)
+
+        if radius is not None:
+            candidates = np.flatnonzero(distances <= radius)
+        else:
+            candidates = np.arange(len(distances))
+
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+        return candidates, distances[candidates]
+
+    def nearest_many(
+        self,
+        lats: Sequence[float],
+        lngs: Sequence[float],
+        k: int,
+        radius: Optional[float] = None,
+        exclude: Optional[Sequence[int]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        nearest() for a batch of query points.
+
+        exclude gives, per query point, a venue position to leave out - used
+        when the query points are the venues themselves.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        count = len(self)
+        k = min(k, count)
+        if k <= 0:
+            return [(np.empty(0, dtype=np.intp), np.empty(0)) for _ in range(len(lats))]
+        chunk = max(1, BATCH_CELLS // max(count, 1))
+
+        results = []
+        for start in range(0, len(lats), chunk):
+            matrix = self.distance_matrix(lats[start:start + chunk], lngs[start:start + chunk])
+            rows = np.arange(matrix.shape[0])
+
+            if exclude is not None:
+                matrix[rows, np.asarray(exclude[start:start + chunk])] = np.inf
+            if radius is not None:
+                matrix[matrix > radius] = np.inf
+
+            if k < count:
+                top = np.argpartition(matrix, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(count), (len(rows), count))
+            top_distances = matrix[rows[:, None], top]
+            order = np.argsort(top_distances, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+            for positions, distances in zip(top, top_distances):
+                keep = np.isfinite(distances)
+                results.append((positions[keep], distances[keep]))
+
+        return results
+
+
+def nearby_blocks(
+    rows: Sequence[Any],
+    k: int = 6,
+    radius: Optional[float] = None
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Precompute the "nearby venues" block for every venue in one batch.
+
+    Returns venue id -> list of {"id", "distance"} for its k closest
+    neighbours, nearest first.
+    """
+    engine = DistanceEngine.from_rows(rows)
+    positions = np.arange(len(engine))
+    neighbours = engine.nearest_many(
+        np.degrees(engine.lat), np.degrees(engine.lng), k, radius, exclude=positions
+    )
+
+    return {
+        int(engine.ids[position]): [
+            {"id": int(engine.ids[other]), "distance": round(float(distance), 1)}
+            for other, distance in zip(others, distances)
+        ]
+        for position, (others, distances) in zip(positions, neighbours)
+    }
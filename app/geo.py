@@ -0,0 +1,154 @@
+"""
+Geographic helpers - distances, bounding boxes and geohash grid cells
+"""
+
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_MILES = 3959
+
+# Precision of the geohash cells stored in venue_geo_cells.
+# A precision 4 cell is roughly 24 x 12 miles, which keeps the cell list for a
+# typical "near me" radius small while still discarding most of the table.
+GEO_CELL_PRECISION = 4
+
+# Above this many cells the IN (...) list stops paying for itself and the
+# latitude/longitude range filter alone is used
+MAX_QUERY_CELLS = 512
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate distance between two coordinates using Haversine formula (in miles)"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+
+    return EARTH_RADIUS_MILES * c
+
+
+def bounding_box(lat: float, lng: float, radius_miles: float) -> Tuple[float, float, float, float]:
+    """
+    Get the (min_lat, max_lat, min_lng, max_lng) box that contains every point
+    within radius_miles of (lat, lng).
+
+    Longitudes are normalised to [-180, 180]; when the box crosses the
+    antimeridian min_lng is greater than max_lng.
+    """
+    delta_lat = math.degrees(radius_miles / EARTH_RADIUS_MILES)
+    min_lat = lat - delta_lat
+    max_lat = lat + delta_lat
+
+    # Near the poles every longitude is within reach
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    delta_lng = math.degrees(
+        math.asin(min(1.0, math.sin(radius_miles / EARTH_RADIUS_MILES) / math.cos(math.radians(lat))))
+    )
+    if delta_lng >= 180:
+        return min_lat, max_lat, -180.0, 180.0
+
+    min_lng = lng - delta_lng
+    max_lng = lng + delta_lng
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell at the given precision"""
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def encode_geohash(lat: float, lng: float, precision: int = GEO_CELL_PRECISION) -> str:
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    ch = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                ch = (ch << 1) | 1
+                lng_range[0] = mid
+            else:
+                ch = ch << 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_range[0] = mid
+            else:
+                ch = ch << 1
+                lat_range[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_GEOHASH_BASE32[ch])
+            bit = 0
+            ch = 0
+
+    return "".join(chars)
+
+
+def cells_for_bbox(
+    min_lat: float,
+    max_lat: float,
+    min_lng: float,
+    max_lng: float,
+    precision: int = GEO_CELL_PRECISION
+) -> List[str]:
+    """
+    List the geohash cells that cover a bounding box.
+
+    Returns an empty list when the box would need more than MAX_QUERY_CELLS
+    cells; callers should then fall back to a plain range filter.
+    """
+    cell_height, cell_width = _cell_size(precision)
+
+    if min_lng > max_lng:
+        # Box crosses the antimeridian - cover both halves
+        lng_spans = [(min_lng, 180.0), (-180.0, max_lng)]
+    else:
+        lng_spans = [(min_lng, max_lng)]
+
+    lat_start = int(math.floor((min_lat + 90) / cell_height))
+    lat_end = int(math.floor((min(max_lat, 90 - 1e-9) + 90) / cell_height))
+
+    index_ranges = []
+    total = 0
+    for span_min, span_max in lng_spans:
+        lng_start = int(math.floor((span_min + 180) / cell_width))
+        lng_end = int(math.floor((min(span_max, 180 - 1e-9) + 180) / cell_width))
+        index_ranges.append((lng_start, lng_end))
+        total += (lng_end - lng_start + 1) * (lat_end - lat_start + 1)
+
+    if total > MAX_QUERY_CELLS:
+        return []
+
+    cells = []
+    for lng_start, lng_end in index_ranges:
+        for lat_index in range(lat_start, lat_end + 1):
+            cell_lat = (lat_index + 0.5) * cell_height - 90
+            for lng_index in range(lng_start, lng_end + 1):
+                cell_lng = (lng_index + 0.5) * cell_width - 180
+                cells.append(encode_geohash(cell_lat, cell_lng, precision))
+
+    return cells
@@ -0,0 +1,113 @@
+"""
+HTTP validators for cacheable responses (ETag / Last-Modified / 304)
+
+Handlers derive an ETag and Last-Modified from cheap freshness data
+(e.g. max(updated_at)), answer 304 before doing any real work when the
+client's copy is current, and attach the same headers to full responses.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def _template_digest() -> str:
+    digest = hashlib.sha1()
+    for path in sorted(TEMPLATES_DIR.rglob("*.html")):
+        digest.update(str(path.relative_to(TEMPLATES_DIR)).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+# Changes whenever page markup can change: the template files plus the
+# deployed commit (Railway sets RAILWAY_GIT_COMMIT_SHA). Set TEMPLATE_VERSION
+# to pin it explicitly.
+TEMPLATE_VERSION = os.getenv("TEMPLATE_VERSION") or f"{_template_digest()}-{os.getenv('RAILWAY_GIT_COMMIT_SHA', '')[:12]}"
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """Quoted ETag from anything that changes whenever the response would"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Whether the client's cached copy is still current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        tags = {_opaque(tag) for tag in if_none_match.split(",")}
+        return "*" in tags or _opaque(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified) <= since
+    return False
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "no-cache"
+) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control for both 200 and 304 responses"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def page_validators(request: Request, user, last_modified: Optional[datetime], *parts) -> Optional[Dict[str, str]]:
+    """
+    Validators for an HTML page built from `parts` (ids, timestamps, counts).
+
+    The nav shows the signed-in user, so the viewer is part of the ETag and
+    signed-in pages get no Last-Modified (which cannot see a nav change).
+    Returns None when the response must not be revalidated at all, i.e.
+    when it will show one-off flash messages.
+    """
+    if "session" in request.scope and request.session.get("_messages"):
+        return None
+
+    viewer = user.to_session() if user is not None else None
+    etag = make_etag(TEMPLATE_VERSION, viewer, last_modified, *parts)
+    if user is not None:
+        headers = validator_headers(etag, None, "private, no-cache")
+    else:
+        headers = validator_headers(etag, last_modified, "no-cache")
+    headers["Vary"] = "Cookie"
+    return headers
@@ -5,14 +5,19 @@ Built with FastAPI for reliability and SEO optimization
 
 from fastapi import FastAPI, Request, Depends
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
+from sqlalchemy import func, distinct, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 from typing import List, Dict, Any
-from app.database import get_db
-from app.models.venue import Venue
+from app.database import get_async_db, get_async_read_db, SessionLocal, dispose_engines
+from app.dependencies import get_current_user_optional_async
+from app.models.rollup import StateRollup
+from app.representatives import popular_cities
+from app.venue_cache import venue_cache
+from app.middleware import SiteMiddleware
+from app.page_cache import PageCacheMiddleware
+from app.templating import templates, precompile_templates
 from starlette.middleware.sessions import SessionMiddleware
 import os
 import logging
@@ -29,6 +34,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Cached anonymous SEO pages; added first so it runs inside the session middleware
+app.add_middleware(PageCacheMiddleware)
+
 # Add session middleware for authentication
 app.add_middleware(
     SessionMiddleware,
@@ -38,61 +46,13 @@ app.add_middleware(
     https_only=os.getenv("ENVIRONMENT") == "production"
 )
 
-# Add flash messages and CSRF to template context
-@app.middleware("http")
-async def add_template_context(request: Request, call_next):
-    """Add flash messages and CSRF token to all template contexts"""
-    from app.flash import get_flashed_messages
-    from app.csrf import generate_csrf_token
-    
-    # Get flash messages before processing request
-    messages = get_flashed_messages(request)
-    
-    # Generate CSRF token
-    csrf_token = generate_csrf_token(request)
-    
-    # Store in request state for templates
-    request.state.messages = messages
-    request.state.csrf_token = csrf_token
-    
-    response = await call_next(request)
-    return response
-
-# Add security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    """Add security headers to all responses"""
-    response = await call_next(request)
-    
-    # Prevent MIME type sniffing
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    
-    # Prevent clickjacking
-    response.headers["X-Frame-Options"] = "DENY"
-    
-    # Enable XSS protection
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    
-    # Force HTTPS in production
-    if os.getenv("ENVIRONMENT") == "production":
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    
-    # Content Security Policy (basic)
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://maps.googleapis.com; "
-        "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com; "
-        "img-src 'self' data: https: http:; "
-        "font-src 'self' data:; "
-        "connect-src 'self' https://maps.googleapis.com;"
-    )
-    
-    return response
+# Security headers and the CSRF token / flash messages templates read; added last
+# so it wraps the session middleware (the template state is read lazily, inside it)
+app.add_middleware(SiteMiddleware)
 
-# Setup static files and templates
+# Setup static files (templates come from app.templating)
 BASE_DIR = Path(__file__).resolve().parent
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 # Import routes
 from app.routes import venues, search, auth, reviews, dashboard, locations, seo, admin, near_me, sport_pages
@@ -110,6 +70,45 @@ app.include_router(seo.router, tags=["seo"])  # SEO routes (robots.txt, sitemap.
 app.include_router(admin.router, prefix="/admin", tags=["admin"])  # Admin panel
 
 
+@app.on_event("startup")
+async def warm_up():
+    """Build lookup indexes and read caches before serving traffic"""
+    from app.database import ensure_columns, ensure_created_at, ensure_indexes
+    from app.ratings import ensure_ratings
+    from app.rollups import ensure_rollups
+    from app.spatial import ensure_geo_index
+    from app.search import search_backend
+    
+    ensure_columns()
+    ensure_created_at()
+    ensure_indexes()
+    
+    db = SessionLocal()
+    try:
+        ensure_geo_index(db)
+        ensure_rollups(db)
+        ensure_ratings(db)
+    finally:
+        db.close()
+    
+    # Load every template now (from bytecode when precompiled) rather than on first render
+    precompile_templates()
+    
+    snapshot = venue_cache.rebuild()
+    try:
+        search_backend.open(snapshot)
+        logger.info(f"Search backend ready: {search_backend.name}")
+    except Exception as e:
+        # /search falls back to substring matching on the snapshot
+        logger.error(f"Search backend {search_backend.name} unavailable: {e}", exc_info=True)
+
+
+@app.on_event("shutdown")
+async def close_connections():
+    """Close pooled connections"""
+    await dispose_engines()
+
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
@@ -144,7 +143,7 @@ async def server_error_handler(request: Request, exc):
     )
 
 
-def get_popular_states(db: Session, limit: int = 12) -> List[Dict[str, Any]]:
+async def get_popular_states(db: AsyncSession, limit: int = 12) -> List[Dict[str, Any]]:
     """Get list of states with the most venues"""
     # Valid US state codes (2 letters)
     us_states = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 
@@ -153,124 +152,43 @@ def get_popular_states(db: Session, limit: int = 12) -> List[Dict[str, Any]]:
                  'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 
                  'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC']
     
-    states = db.query(
-        Venue.state,
-        func.count(Venue.id).label('venue_count')
-    ).filter(
-        Venue.status == "ACTIVE",
-        Venue.state.in_(us_states)
-    ).group_by(
-        Venue.state
-    ).order_by(
-        func.count(Venue.id).desc()
-    ).limit(limit).all()
+    states = (await db.execute(
+        select(
+            StateRollup.state,
+            StateRollup.venue_count
+        ).where(
+            StateRollup.state.in_(us_states)
+        ).order_by(
+            StateRollup.venue_count.desc()
+        ).limit(limit)
+    )).all()
     
     return [{"code": state, "venue_count": count} for state, count in states]
 
-def get_popular_cities(db: Session, limit: int = 6) -> List[Dict[str, Any]]:
+async def get_popular_cities(db: AsyncSession, limit: int = 6) -> List[Dict[str, Any]]:
     """Get list of cities with the most venues, including a representative image"""
-    from sqlalchemy.orm import joinedload
-    
-    cities = db.query(
-        Venue.city,
-        Venue.state,
-        func.count(Venue.id).label('venue_count')
-    ).filter(
-        Venue.status == "ACTIVE"
-    ).group_by(
-        Venue.city,
-        Venue.state
-    ).order_by(
-        func.count(Venue.id).desc()
-    ).limit(limit).all()
-    
-    result = []
-    for city, state, count in cities:
-        # Get a top-rated venue from this city that has photos
-        # First try to find a venue with photos
-        venue_with_photo = db.query(Venue)\
-            .options(joinedload(Venue.photos))\
-            .join(Venue.photos)\
-            .filter(
-                Venue.city == city,
-                Venue.state == state,
-                Venue.status == "ACTIVE"
-            ).order_by(
-                Venue.rating.desc()
-            ).first()
-        
-        # If no venue with photos found, try without the join (fallback)
-        if not venue_with_photo:
-            venue_with_photo = db.query(Venue)\
-                .options(joinedload(Venue.photos))\
-                .filter(
-                    Venue.city == city,
-                    Venue.state == state,
-                    Venue.status == "ACTIVE"
-                ).order_by(
-                    Venue.rating.desc()
-                ).first()
-        
-        # Get image URL from the venue
-        image_url = None
-        if venue_with_photo and venue_with_photo.photos:
-            photo = next((p for p in venue_with_photo.photos if p.is_primary), 
-                        venue_with_photo.photos[0] if venue_with_photo.photos else None)
-            if photo:
-                if 'maxwidth=' in photo.url:
-                    image_url = photo.url.replace('maxwidth=1600', 'maxwidth=600').replace('maxwidth=800', 'maxwidth=600')
-                elif '?' in photo.url:
-                    image_url = f"{photo.url}&maxwidth=600"
-                else:
-                    image_url = f"{photo.url}?maxwidth=600"
-        
-        result.append({
-            "name": city, 
-            "state": state, 
-            "venue_count": count,
-            "image_url": image_url,
-            "slug": f"/locations/{state.lower()}/{city.lower().replace(' ', '-')}"
-        })
-    
-    return result
+    return await db.run_sync(popular_cities, limit)
 
 @app.get("/", response_class=HTMLResponse)
-async def homepage(request: Request, db: Session = Depends(get_db)):
+async def homepage(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """Homepage with featured venues and location-based navigation"""
-    from app.dependencies import get_current_user_optional
-    
     # Get current user for navigation
-    current_user = get_current_user_optional(request, db)
-    
-    # Query top-rated venues from database with their photos
-    from sqlalchemy.orm import joinedload
-    from app.models.venue import VenuePhoto
-    
-    venues = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .filter(Venue.status == "ACTIVE")\
-        .order_by(Venue.rating.desc())\
-        .limit(6)\
-        .all()
+    current_user = await get_current_user_optional_async(request, db)
     
+    # Top-rated venues come from the in-memory snapshot, not the database
     featured_venues = []
-    for venue in venues:
-        # Get the primary photo if available, otherwise the first photo, or use a placeholder
-        primary_photo = next((p for p in venue.photos if p.is_primary), None) if venue.photos else None
-        first_photo = venue.photos[0] if venue.photos else None
-        photo = primary_photo or first_photo
-        
-        # Construct the image URL
+    for venue in (await venue_cache.get_async()).top_rated(6):
+        # Construct the image URL from the primary (or first) photo
         image_url = None
-        if photo:
+        if venue.photo_url:
             # Ensure maxwidth parameter is included for Google Photos (use 400px for thumbnails)
-            if 'maxwidth=' in photo.url:
+            if 'maxwidth=' in venue.photo_url:
                 # Replace existing maxwidth with 400 for faster loading
-                image_url = photo.url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
-            elif '?' in photo.url:
-                image_url = f"{photo.url}&maxwidth=400"
+                image_url = venue.photo_url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
+            elif '?' in venue.photo_url:
+                image_url = f"{venue.photo_url}&maxwidth=400"
             else:
-                image_url = f"{photo.url}?maxwidth=400"
+                image_url = f"{venue.photo_url}?maxwidth=400"
         
         featured_venues.append({
             "id": venue.id,
@@ -286,8 +204,8 @@ async def homepage(request: Request, db: Session = Depends(get_db)):
         })
     
     # Get location-based data
-    popular_states = get_popular_states(db)
-    popular_cities = get_popular_cities(db)
+    popular_states = await get_popular_states(db)
+    popular_cities = await get_popular_cities(db)
     
     # Valid US state codes
     us_states = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 
@@ -296,17 +214,21 @@ async def homepage(request: Request, db: Session = Depends(get_db)):
                  'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 
                  'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC']
     
-    # Get real stats from database (US venues only)
-    total_venues = db.query(Venue).filter(Venue.status == "ACTIVE", Venue.state.in_(us_states)).count()
-    total_cities = db.query(func.count(func.distinct(Venue.city + Venue.state))).filter(Venue.status == "ACTIVE", Venue.state.in_(us_states)).scalar()
-    total_states = db.query(func.count(func.distinct(Venue.state))).filter(Venue.status == "ACTIVE", Venue.state.in_(us_states)).scalar()
-    total_reviews = db.query(func.sum(Venue.review_count)).filter(Venue.status == "ACTIVE", Venue.state.in_(us_states)).scalar() or 0
+    # Site-wide stats from the state rollups (US venues only)
+    total_venues, total_cities, total_states, total_reviews = (await db.execute(
+        select(
+            func.sum(StateRollup.venue_count),
+            func.sum(StateRollup.city_count),
+            func.count(StateRollup.state),
+            func.sum(StateRollup.review_sum)
+        ).where(StateRollup.state.in_(us_states))
+    )).one()
     
     stats = {
-        "total_venues": total_venues,
-        "cities": total_cities,
+        "total_venues": total_venues or 0,
+        "cities": total_cities or 0,
         "states": total_states,
-        "reviews": int(total_reviews)
+        "reviews": int(total_reviews or 0)
     }
     
     return templates.TemplateResponse(
@@ -330,6 +252,13 @@ async def health_check():
     return {"status": "healthy", "service": "skaters.com"}
 
 
+@app.get("/health/db")
+async def database_health(db: AsyncSession = Depends(get_async_db)):
+    """Database round trip (pool counters are on the admin dashboard)"""
+    await db.execute(text("SELECT 1"))
+    return {"status": "healthy"}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,92 @@
+"""
+Site-wide ASGI middleware: security headers and template request state
+
+One plain ASGI middleware instead of two BaseHTTPMiddleware functions, so
+responses are not re-wrapped in an extra task and stream per request. The
+security headers are built once at import. The CSRF token and flash
+messages that base templates read from request.state are only computed
+when a template actually reads them, so JSON, redirect and cached
+responses never sign a token or touch the session for them. Static files
+and health checks skip the request state entirely.
+"""
+
+import os
+
+from starlette.requests import Request
+
+from app.csrf import generate_csrf_token
+from app.flash import get_flashed_messages
+
+# Paths that never render templates
+SKIP_STATE_PREFIXES = ("/static/", "/health")
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://maps.googleapis.com; "
+    "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com; "
+    "img-src 'self' data: https: http:; "
+    "font-src 'self' data:; "
+    "connect-src 'self' https://maps.googleapis.com;"
+)
+
+
+def security_headers(production: bool) -> list:
+    """Raw (name, value) pairs added to every response"""
+    headers = [
+        # Prevent MIME type sniffing
+        ("x-content-type-options", "nosniff"),
+        # Prevent clickjacking
+        ("x-frame-options", "DENY"),
+        # Enable XSS protection
+        ("x-xss-protection", "1; mode=block"),
+        # Content Security Policy (basic)
+        ("content-security-policy", CONTENT_SECURITY_POLICY),
+    ]
+    if production:
+        # Force HTTPS in production
+        headers.append(("strict-transport-security", "max-age=31536000; includeSubDomains"))
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+class _TemplateState(dict):
+    """scope["state"] that fills csrf_token and messages on first read"""
+
+    def __init__(self, scope, state):
+        super().__init__(state)
+        self._scope = scope
+
+    def __missing__(self, key):
+        # Read while rendering, inside SessionMiddleware, so the session is there
+        if key == "csrf_token":
+            value = generate_csrf_token(Request(self._scope))
+        elif key == "messages":
+            value = get_flashed_messages(Request(self._scope))
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+class SiteMiddleware:
+    """Adds the security headers and the lazy template state"""
+
+    def __init__(self, app, production: bool = os.getenv("ENVIRONMENT") == "production"):
+        self.app = app
+        self.headers = security_headers(production)
+        self._names = {name for name, _ in self.headers}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not scope["path"].startswith(SKIP_STATE_PREFIXES):
+            scope["state"] = _TemplateState(scope, scope.get("state") or {})
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = [(name, value) for name, value in message.get("headers", ()) if name.lower() not in self._names]
+                message = {**message, "headers": headers + self.headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
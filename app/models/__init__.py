@@ -1 +1,2 @@
-from .venue import Venue, VenuePhoto, VenueAmenity, VenueHours, VenuePricing, Review, User, SavedVenue
+from .venue import Venue, VenuePhoto, VenueGeoCell, VenueAmenity, VenueHours, VenuePricing, Review, User, SavedVenue
+from .rollup import StateRollup, CityRollup, CitySportRollup
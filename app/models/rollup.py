@@ -0,0 +1,171 @@
+"""
+Precomputed venue rollups by state, city and (city, sport type)
+
+The homepage, location pages, admin dashboard and sitemap read these few
+rows instead of grouping the venues table on every request. Groups touched
+by a flush are recomputed inside the same transaction, so the rollups never
+disagree with the venues they summarize. Writes that bypass the ORM are
+picked up by app.rollups.refresh_rollups (scripts/refresh_rollups.py).
+"""
+
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, case, distinct, event, func, inspect, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.database import Base, upsert
+from app.models.venue import Venue, SportType
+
+
+class _RollupColumns:
+    """Measures shared by every rollup grain"""
+    venue_count = Column(Integer, nullable=False, default=0)
+    rated_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    review_sum = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def rating_avg(self) -> float:
+        """Average rating of venues that have one"""
+        return round(self.rating_sum / self.rated_count, 1) if self.rated_count else 0.0
+
+
+class StateRollup(_RollupColumns, Base):
+    __tablename__ = "state_rollups"
+
+    state = Column(String(2), primary_key=True)
+    city_count = Column(Integer, nullable=False, default=0)
+
+
+class CityRollup(_RollupColumns, Base):
+    __tablename__ = "city_rollups"
+
+    state = Column(String(2), primary_key=True)
+    city = Column(String(100), primary_key=True)
+
+
+class CitySportRollup(_RollupColumns, Base):
+    __tablename__ = "city_sport_rollups"
+
+    state = Column(String(2), primary_key=True)
+    city = Column(String(100), primary_key=True)
+    sport_type = Column(Enum(SportType), primary_key=True)
+
+
+# Venue columns that feed the rollups
+ROLLUP_FIELDS = ("status", "state", "city", "sport_type", "rating", "review_count")
+
+# Database URL -> whether the rollup tables exist yet
+_existing_tables = {}
+
+
+def rollup_measures() -> list:
+    """Aggregate columns over active venues, in _RollupColumns order"""
+    return [
+        func.count(Venue.id).label("venue_count"),
+        func.coalesce(func.sum(case((Venue.rating > 0, 1), else_=0)), 0).label("rated_count"),
+        func.coalesce(func.sum(Venue.rating), 0.0).label("rating_sum"),
+        func.coalesce(func.sum(Venue.review_count), 0).label("review_sum"),
+    ]
+
+
+def rollup_selects() -> dict:
+    """GROUP BY queries over active venues for each rollup table"""
+    active = Venue.status == "ACTIVE"
+    return {
+        StateRollup: select(
+            Venue.state, func.count(distinct(Venue.city)).label("city_count"), *rollup_measures()
+        ).where(active).group_by(Venue.state),
+        CityRollup: select(
+            Venue.state, Venue.city, *rollup_measures()
+        ).where(active).group_by(Venue.state, Venue.city),
+        CitySportRollup: select(
+            Venue.state, Venue.city, Venue.sport_type, *rollup_measures()
+        ).where(active).group_by(Venue.state, Venue.city, Venue.sport_type),
+    }
+
+
+def rebuild_rollups(connection) -> None:
+    """Recompute every rollup row from the venues table"""
+    now = literal(datetime.utcnow(), DateTime).label("updated_at")
+    for model, query in rollup_selects().items():
+        query = query.add_columns(now)
+        table = model.__table__
+        connection.execute(table.delete())
+        connection.execute(table.insert().from_select([column.name for column in query.selected_columns], query))
+
+
+def recompute_rollups(connection, groups) -> None:
+    """Recompute the rollup rows of the given (state, city) groups"""
+    groups = list(groups)
+    states = list({state for state, _ in groups})
+    now = datetime.utcnow()
+
+    for model, query in rollup_selects().items():
+        table = model.__table__
+        if model is StateRollup:
+            query = query.where(Venue.state.in_(states))
+            scope = table.c.state.in_(states)
+        else:
+            query = query.where(tuple_(Venue.state, Venue.city).in_(groups))
+            scope = tuple_(table.c.state, table.c.city).in_(groups)
+
+        rows = [dict(row._mapping, updated_at=now) for row in connection.execute(query)]
+        keys = [column.name for column in table.primary_key]
+        if rows:
+            upsert(connection, table, rows, keys)
+
+        # Groups left without active venues
+        stale = table.delete().where(scope)
+        if rows:
+            key = tuple_(*table.primary_key.columns) if len(keys) > 1 else table.c[keys[0]]
+            present = [tuple(row[name] for name in keys) if len(keys) > 1 else row[keys[0]] for row in rows]
+            stale = stale.where(key.notin_(present))
+        connection.execute(stale)
+
+
+def forget_rollup_tables() -> None:
+    """Re-check table existence on the next flush (after creating the tables)"""
+    _existing_tables.clear()
+
+
+def _rollups_exist(connection) -> bool:
+    """Whether the rollup tables have been created (checked once per database)"""
+    url = str(connection.engine.url)
+    if url not in _existing_tables:
+        _existing_tables[url] = inspect(connection).has_table(StateRollup.__tablename__)
+    return _existing_tables[url]
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_rollup_groups(session, flush_context, instances):
+    # Runs before the UPDATE so the groups a venue is leaving can still be read
+    groups = session.info.setdefault("rollup_groups", set())
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Venue)
+        and any(inspect(obj).attrs[field].history.has_changes() for field in ROLLUP_FIELDS)
+    ]
+    for obj in chain(session.new, changed):
+        if isinstance(obj, Venue):
+            groups.add((obj.state, obj.city))
+
+    ids = [obj.id for obj in chain(changed, session.deleted) if isinstance(obj, Venue) and obj.id]
+    if ids:
+        stored = session.execute(select(Venue.state, Venue.city).where(Venue.id.in_(ids)))
+        groups.update(tuple(row) for row in stored)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _apply_rollup_groups(session, flush_context):
+    groups = session.info.pop("rollup_groups", None)
+    if not groups:
+        return
+
+    connection = session.connection()
+    if not _rollups_exist(connection):
+        # Older database; app.rollups.ensure_rollups creates and fills them
+        return
+    recompute_rollups(connection, groups)
@@ -2,11 +2,13 @@
 Database models for venues
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum, Index, event, inspect
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
+from itertools import chain
 import enum
 from app.database import Base
+from app.geo import encode_geohash
 
 
 class SportType(str, enum.Enum):
@@ -59,15 +61,19 @@ class Venue(Base):
     # Ratings
     rating = Column(Float, default=0.0)
     review_count = Column(Integer, default=0)
+    # Running totals over approved site reviews (see app.ratings)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
     google_place_id = Column(String(255), unique=True, index=True, nullable=True)
+    content_hash = Column(String(40))  # Hash of the scraped data, to skip unchanged re-imports
     
     # SEO
     meta_title = Column(String(200))
     meta_description = Column(Text)
     seo_keywords = Column(Text)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Timestamps (created_at is a keyset pagination key, so never NULL)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -77,6 +83,13 @@ class Venue(Base):
     reviews = relationship("Review", back_populates="venue", cascade="all, delete-orphan")
     pricing = relationship("VenuePricing", back_populates="venue", uselist=False, cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Keyset pagination of the admin venue lists (newest first)
+        Index("ix_venues_created_at_id", "created_at", "id"),
+        # max(updated_at) freshness checks for sitemaps and HTTP caching
+        Index("ix_venues_updated_at", "updated_at"),
+    )
+    
     def __repr__(self):
         return f"<Venue {self.name} ({self.city}, {self.state})>"
 
@@ -95,6 +108,14 @@ class VenuePhoto(Base):
     venue = relationship("Venue", back_populates="photos")
 
 
+class VenueGeoCell(Base):
+    """Geohash grid cell for each venue with coordinates - the spatial index for "near me" lookups"""
+    __tablename__ = "venue_geo_cells"
+    
+    venue_id = Column(Integer, ForeignKey("venues.id"), primary_key=True)
+    cell = Column(String(12), nullable=False, index=True)
+
+
 class VenueAmenity(Base):
     __tablename__ = "venue_amenities"
     
@@ -146,7 +167,7 @@ class Review(Base):
     title = Column(String(200))
     comment = Column(Text)
     approved = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Review queue pagination key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     venue = relationship("Venue", back_populates="reviews")
@@ -179,3 +200,50 @@ class SavedVenue(Base):
     
     user = relationship("User", back_populates="saved_venues")
     venue = relationship("Venue")
+
+
+# Keep venue_geo_cells in step with venue coordinates. These run inside the
+# flush, so the grid cell is written in the same transaction as the venue.
+@event.listens_for(Venue, "after_insert")
+@event.listens_for(Venue, "after_update")
+def _sync_venue_geo_cell(mapper, connection, target):
+    state = inspect(target)
+    if not state.attrs.latitude.history.has_changes() and not state.attrs.longitude.history.has_changes():
+        return
+    
+    table = VenueGeoCell.__table__
+    connection.execute(table.delete().where(table.c.venue_id == target.id))
+    if target.latitude is not None and target.longitude is not None:
+        connection.execute(
+            table.insert().values(venue_id=target.id, cell=encode_geohash(target.latitude, target.longitude))
+        )
+
+
+@event.listens_for(Venue, "before_delete")
+def _delete_venue_geo_cell(mapper, connection, target):
+    table = VenueGeoCell.__table__
+    connection.execute(table.delete().where(table.c.venue_id == target.id))
+
+
+# Photos, amenities, hours and pricing are part of the venue page, so a
+# write to any of them bumps the venue's updated_at (one UPDATE per flush).
+# That keeps updated_at usable as the page's ETag / Last-Modified source.
+_VENUE_PAGE_CHILDREN = (VenuePhoto, VenueAmenity, VenueHours, VenuePricing)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_touched_venues(session, flush_context):
+    touched = session.info.setdefault("touched_venue_ids", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _VENUE_PAGE_CHILDREN) and obj.venue_id is not None:
+            touched.add(obj.venue_id)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _touch_venues(session, flush_context):
+    touched = session.info.pop("touched_venue_ids", None)
+    if touched:
+        table = Venue.__table__
+        session.connection().execute(
+            table.update().where(table.c.id.in_(touched)).values(updated_at=datetime.utcnow())
+        )
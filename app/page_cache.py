@@ -0,0 +1,207 @@
+"""
+Rendered-page cache for anonymous SEO landing pages
+
+Location, sport city and hub pages look the same to every visitor who is
+not signed in, and crawlers request them in bursts. PageCacheMiddleware
+keeps their complete 200 responses in an in-process LRU (bounded by total
+bytes, entries expire after PAGE_CACHE_TTL seconds) keyed by path and
+query string. Hits are answered before routing, so no database session is
+opened. Concurrent misses for the same page wait for a single render.
+
+Any venue change seen by the venue snapshot drops every cached page;
+renders that started before the change are not stored. A hit whose ETag
+the client already has is answered with a bare 304.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import Request
+
+from app.http_cache import is_not_modified
+from app.venue_cache import venue_cache
+
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "300"))
+PAGE_CACHE_MAX_BYTES = int(float(os.getenv("PAGE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# Pages whose anonymous rendering depends only on the URL
+CACHED_PAGES = [
+    re.compile(r"^/(skate-parks|ice-rinks|roller-rinks)/[^/]+/[^/]+$"),
+    re.compile(r"^/locations/[^/]+(/[^/]+)?$"),
+    re.compile(r"^/(skate-parks|ice-rinks|roller-rinks|inline-skating)$"),
+    re.compile(r"^/([a-z-]+/)?near-me$"),
+]
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    status: int
+    headers: Headers
+    body: bytes
+    expires: float
+
+
+class PageCache:
+    """LRU of rendered pages, bounded by total body size"""
+
+    def __init__(self, ttl: float = PAGE_CACHE_TTL, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Bumped by invalidate(); a render only stores into the generation it started in
+        self.generation = 0
+        self._pages: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                return None
+            if page.expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._pages.move_to_end(key)
+            return page
+
+    def put(self, key: str, status: int, headers: Headers, body: bytes, generation: int) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._pages:
+                self._drop(key)
+            self._pages[key] = CachedPage(status, headers, body, time.monotonic() + self.ttl)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._pages)))
+
+    def _drop(self, key: str) -> None:
+        self._size -= len(self._pages.pop(key).body)
+
+    def invalidate(self, *args) -> None:
+        """Forget every page (signature fits venue_cache.on_snapshot_changed)"""
+        with self._lock:
+            self.generation += 1
+            self._pages.clear()
+            self._size = 0
+
+
+page_cache = PageCache()
+venue_cache.on_snapshot_changed(page_cache.invalidate)
+
+
+def cache_key(scope) -> Optional[str]:
+    """Cache key for an anonymous GET of a cacheable page, else None"""
+    if scope["type"] != "http" or scope["method"] != "GET":
+        return None
+    path = scope["path"]
+    if not any(pattern.match(path) for pattern in CACHED_PAGES):
+        return None
+
+    # Needs SessionMiddleware outside this middleware
+    session = scope.get("session")
+    if session is None or session.get("user_id") or session.get("_messages"):
+        return None
+
+    query = scope.get("query_string", b"").decode("latin-1")
+    if query:
+        query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    return f"{path}?{query}"
+
+
+class PageCacheMiddleware:
+    """Serve and fill the page cache (must sit inside SessionMiddleware)"""
+
+    def __init__(self, app, cache: PageCache = page_cache):
+        self.app = app
+        self.cache = cache
+        self._inflight: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        key = cache_key(scope) if self.cache.enabled else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        page = self.cache.get(key)
+        if page is None and key in self._inflight:
+            # Someone is already rendering this page; wait for their result
+            await self._inflight[key].wait()
+            page = self.cache.get(key)
+        if page is not None:
+            await self._send_page(page, scope, send)
+            return
+        if key in self._inflight:
+            # The render we waited on was not cacheable
+            await self.app(scope, receive, send)
+            return
+
+        done = self._inflight[key] = asyncio.Event()
+        try:
+            await self._render(key, scope, receive, send)
+        finally:
+            del self._inflight[key]
+            done.set()
+
+    async def _send_page(self, page: CachedPage, scope, send) -> None:
+        etag = next((value for name, value in page.headers if name.lower() == b"etag"), None)
+        if etag is not None and is_not_modified(Request(scope), etag.decode("latin-1")):
+            headers = [
+                (name, value) for name, value in page.headers
+                if name.lower() in (b"etag", b"cache-control", b"last-modified", b"vary")
+            ]
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": headers + [(b"x-page-cache", b"hit")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": page.status,
+            "headers": page.headers + [(b"x-page-cache", b"hit")],
+        })
+        await send({"type": "http.response.body", "body": page.body})
+
+    async def _render(self, key: str, scope, receive, send) -> None:
+        generation = self.cache.generation
+        response = {"status": None, "headers": [], "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+                message = dict(message, headers=response["headers"] + [(b"x-page-cache", b"miss")])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        headers = response["headers"]
+        names = {name.lower() for name, _ in headers}
+        cache_control = b",".join(value for name, value in headers if name.lower() == b"cache-control")
+        if (
+            response["status"] == 200
+            and b"set-cookie" not in names
+            and b"no-store" not in cache_control
+            and b"private" not in cache_control
+        ):
+            self.cache.put(key, 200, headers, b"".join(response["body"]), generation)
@@ -0,0 +1,248 @@
+"""
+Keyset (cursor) pagination
+
+Pages are addressed by the sort key of a boundary row instead of an offset,
+so page 500 costs the same as page 1. A cursor carries that key together
+with the page number and total count from the first page, so deeper pages
+neither count nor scan skipped rows. Cursors are opaque URL-safe tokens;
+a tampered or stale token just lands on some other valid page.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# (column or SQL expression, descending)
+KeysetOrder = Sequence[Tuple[Any, bool]]
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and set(value) == {"dt"} and isinstance(value["dt"], str):
+        return datetime.fromisoformat(value["dt"])
+    if isinstance(value, (str, int, float)):
+        return value
+    # null, lists and other objects never come out of encode()
+    raise ValueError(f"Bad cursor key value: {value!r}")
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position of a page: just after `key`, or just before it for Previous links"""
+    key: tuple
+    before: bool = False
+    page: int = 1
+    total: Optional[int] = None
+
+    def encode(self) -> str:
+        payload = {"k": [_dump(value) for value in self.key], "p": self.page}
+        if self.before:
+            payload["b"] = 1
+        if self.total is not None:
+            payload["t"] = self.total
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> Optional["Cursor"]:
+        """Parse a token from the URL; None (first page) when it is missing or malformed"""
+        if not token:
+            return None
+        try:
+            data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(data)
+            key, page, total = payload["k"], payload.get("p", 1), payload.get("t")
+            if not isinstance(key, list) or not key or not _is_int(page) or not (total is None or _is_int(total)):
+                return None
+            return cls(
+                key=tuple(_load(value) for value in key),
+                before=bool(payload.get("b")),
+                page=max(1, page),
+                total=total,
+            )
+        except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def fits(self, order: KeysetOrder) -> bool:
+        """Whether the key has one value per column of `order` (a token for another ordering does not)"""
+        return len(self.key) == len(order)
+
+
+@dataclass
+class KeysetPage:
+    """One page of results plus the cursors for its neighbours"""
+    items: list
+    page: int
+    total: Optional[int]
+    per_page: int
+    has_prev: bool
+    has_next: bool
+    next_cursor: Optional[str] = None
+    # Empty string when the previous page is the first one (link without a cursor)
+    prev_cursor: Optional[str] = None
+
+    @property
+    def total_pages(self) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(1, (self.total + self.per_page - 1) // self.per_page)
+
+
+def build_page(
+    rows: list,
+    key_of: Callable[[Any], tuple],
+    per_page: int,
+    cursor: Optional[Cursor],
+    total: Optional[int] = None
+) -> KeysetPage:
+    """
+    Turn up to per_page + 1 rows, fetched in cursor direction, into a page.
+
+    The extra row only signals that another page exists in that direction.
+    Rows fetched for a Previous link come in reverse and are flipped back.
+    """
+    more = len(rows) > per_page
+    rows = list(rows[:per_page])
+    backwards = cursor is not None and cursor.before
+    if backwards:
+        rows.reverse()
+
+    page = cursor.page if cursor else 1
+    if backwards and not more:
+        # Walked back to the real first page, whatever the token claimed
+        page = 1
+    if total is None and cursor is not None:
+        total = cursor.total
+
+    has_prev = more if backwards else cursor is not None
+    has_next = True if backwards else more
+    if not rows:
+        has_prev, has_next = page > 1, False
+
+    next_cursor = prev_cursor = None
+    if has_next:
+        next_cursor = Cursor(key_of(rows[-1]), page=page + 1, total=total).encode()
+    if has_prev:
+        if page <= 2 or not rows:
+            prev_cursor = ""
+        else:
+            prev_cursor = Cursor(key_of(rows[0]), before=True, page=page - 1, total=total).encode()
+
+    return KeysetPage(
+        items=rows,
+        page=page,
+        total=total,
+        per_page=per_page,
+        has_prev=has_prev,
+        has_next=has_next,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
+
+def keyset_filter(order: KeysetOrder, key: tuple, before: bool = False):
+    """Rows strictly after (or before) `key` in the given ordering"""
+    clauses = []
+    for position, (column, descending) in enumerate(order):
+        value = key[position]
+        beyond = column < value if descending != before else column > value
+        ties = [previous == key[index] for index, (previous, _) in enumerate(order[:position])]
+        clauses.append(and_(*ties, beyond))
+    return or_(*clauses)
+
+
+def keyset_order_by(order: KeysetOrder, before: bool = False) -> list:
+    """ORDER BY clauses for the ordering, reversed when walking backwards"""
+    return [
+        column.desc() if descending != before else column.asc()
+        for column, descending in order
+    ]
+
+
+def paginate_query(
+    query: Query,
+    order: KeysetOrder,
+    key_of: Callable[[Any], tuple],
+    per_page: int,
+    cursor: Optional[Cursor],
+    count: Optional[Callable[[], int]] = None
+) -> KeysetPage:
+    """
+    Fetch one page of an ORM query in a single indexed range scan.
+
+    `order` must end in a unique column (normally the primary key) and
+    key_of(row) must return the row's values for it. `count`, if given,
+    is only called for the first page.
+    """
+    if cursor is not None and not cursor.fits(order):
+        cursor = None
+    before = cursor is not None and cursor.before
+    if cursor is not None:
+        query = query.filter(keyset_filter(order, cursor.key, before))
+    rows = query.order_by(*keyset_order_by(order, before)).limit(per_page + 1).all()
+
+    total = count() if cursor is None and count is not None else None
+    return build_page(rows, key_of, per_page, cursor, total)
+
+
+def _bisect(items: Sequence, key: tuple, key_of: Callable[[Any], tuple], right: bool) -> int:
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high) // 2
+        probe = key_of(items[middle])
+        if probe < key or (right and probe == key):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def sequence_window(
+    items: Sequence,
+    key_of: Callable[[Any], tuple],
+    limit: Optional[int],
+    cursor: Optional[Cursor]
+) -> list:
+    """
+    Up to `limit` items after (or, reversed, before) the cursor in a list
+    sorted ascending by key_of. The boundary is found by binary search.
+    """
+    if cursor is None:
+        return list(items[:limit])
+    if cursor.before:
+        end = _bisect(items, cursor.key, key_of, right=False)
+        start = 0 if limit is None else max(0, end - limit)
+        return list(reversed(items[start:end]))
+    start = _bisect(items, cursor.key, key_of, right=True)
+    return list(items[start:] if limit is None else items[start:start + limit])
+
+
+def paginate_sequence(
+    items: Sequence,
+    key_of: Callable[[Any], tuple],
+    per_page: int,
+    cursor: Optional[Cursor]
+) -> KeysetPage:
+    """Page through an in-memory list sorted ascending by key_of in O(log n)"""
+    try:
+        rows = sequence_window(items, key_of, per_page + 1, cursor)
+    except TypeError:
+        # Key from a cursor built for another sort order
+        cursor = None
+        rows = sequence_window(items, key_of, per_page + 1, cursor)
+    return build_page(rows, key_of, per_page, cursor, total=len(items))
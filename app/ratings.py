@@ -0,0 +1,148 @@
+"""
+Venue ratings from approved reviews
+
+Venue.rating_sum and Venue.rating_count are running totals over a venue's
+approved reviews. Approving or deleting reviews moves them by the ratings
+involved, in one UPDATE per venue evaluated by the database, so nothing
+rereads a venue's reviews. Once a venue has approved reviews its rating
+and review_count follow the totals; until then they keep the imported
+(Google) values.
+
+reconcile_ratings recomputes every venue's totals in one GROUP BY and
+fixes the ones that drifted (raw SQL edits, older rows), and is safe to
+run from cron:
+    python scripts/reconcile_ratings.py
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Integer, Numeric, and_, bindparam, case, delete, func, inspect, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.rollup import StateRollup, recompute_rollups
+from app.models.venue import Review, Venue
+from app.venue_events import notify_venues_changed
+
+logger = logging.getLogger(__name__)
+
+# Keeps the division in NUMERIC on PostgreSQL (round() needs it) and real on SQLite
+_ONE = literal(Decimal("1.0"), Numeric(2, 1))
+
+
+def _average(total, count):
+    return func.round(total * _ONE / count, 1)
+
+
+def _apply_deltas(db: Session, deltas: Dict[int, List[int]]) -> None:
+    """Move each venue's totals by [rating delta, count delta] and rederive its rating"""
+    for venue in db.query(Venue).filter(Venue.id.in_(deltas)):
+        rating_delta, count_delta = deltas[venue.id]
+        total = Venue.rating_sum + rating_delta
+        count = Venue.rating_count + count_delta
+        # SQL expressions, so concurrent moderation cannot lose an update
+        venue.rating_sum = total
+        venue.rating_count = count
+        venue.rating = case((count > 0, _average(total, count)), else_=Venue.rating)
+        venue.review_count = case((count > 0, count), else_=Venue.review_count)
+
+
+def _collect(rows: Iterable[Tuple[int, int]], sign: int) -> Dict[int, List[int]]:
+    deltas = defaultdict(lambda: [0, 0])
+    for venue_id, rating in rows:
+        deltas[venue_id][0] += sign * rating
+        deltas[venue_id][1] += sign
+    return deltas
+
+
+def approve_reviews(db: Session, review_ids: Iterable[int]) -> int:
+    """Approve pending reviews and add them to their venues' ratings; returns the number approved"""
+    review_ids = list(review_ids)
+    if not review_ids:
+        return 0
+    # Only rows that were still pending count, however many moderators click at once
+    approved = db.execute(
+        update(Review)
+        .where(Review.id.in_(review_ids), Review.approved == False)
+        .values(approved=True, updated_at=datetime.utcnow())
+        .returning(Review.venue_id, Review.rating),
+        execution_options={"synchronize_session": False},
+    ).all()
+    _apply_deltas(db, _collect(approved, 1))
+    db.commit()
+    return len(approved)
+
+
+def delete_reviews(db: Session, review_ids: Iterable[int]) -> int:
+    """Delete reviews (rejected or removed), taking approved ones out of the ratings; returns the number deleted"""
+    review_ids = list(review_ids)
+    if not review_ids:
+        return 0
+    deleted = db.execute(
+        delete(Review)
+        .where(Review.id.in_(review_ids))
+        .returning(Review.venue_id, Review.rating, Review.approved),
+        execution_options={"synchronize_session": False},
+    ).all()
+    _apply_deltas(db, _collect([(row.venue_id, row.rating) for row in deleted if row.approved], -1))
+    db.commit()
+    return len(deleted)
+
+
+def reconcile_ratings(db: Session) -> int:
+    """Recompute every venue's totals from its approved reviews; returns the number of venues fixed"""
+    approved = select(
+        Review.venue_id,
+        func.sum(Review.rating).label("total"),
+        func.count(Review.id).label("count")
+    ).where(Review.approved == True).group_by(Review.venue_id).subquery()
+    total = func.coalesce(approved.c.total, 0)
+    count = func.coalesce(approved.c.count, 0)
+
+    drifted = db.execute(
+        select(Venue.id, Venue.state, Venue.city, total.label("total"), count.label("count"))
+        .outerjoin(approved, approved.c.venue_id == Venue.id)
+        .where(or_(
+            Venue.rating_sum != total,
+            Venue.rating_count != count,
+            and_(count > 0, or_(Venue.review_count != count, Venue.rating != _average(total, count))),
+        ))
+    ).all()
+    if not drifted:
+        return 0
+
+    venues = Venue.__table__
+    total, count = bindparam("total", type_=Integer), bindparam("count", type_=Integer)
+    connection = db.connection()
+    # Rounded by the database, like the incremental path, so both agree on halves
+    connection.execute(
+        update(venues)
+        .where(venues.c.id == bindparam("venue_id"))
+        .values(
+            rating_sum=total,
+            rating_count=count,
+            rating=case((count > 0, _average(total, count)), else_=venues.c.rating),
+            review_count=case((count > 0, count), else_=venues.c.review_count),
+        ),
+        [{"venue_id": row.id, "total": row.total, "count": row.count} for row in drifted]
+    )
+    # Core statements skip the session hooks that maintain the rollups
+    if inspect(connection).has_table(StateRollup.__tablename__):
+        recompute_rollups(connection, {(row.state, row.city) for row in drifted})
+    db.commit()
+    notify_venues_changed(row.id for row in drifted)
+    return len(drifted)
+
+
+def ensure_ratings(db: Session) -> None:
+    """Fill the rating totals once, when approved reviews exist but no venue counts any (e.g. new columns)"""
+    # Two LIMIT 1 probes per worker boot; repairs after that are scripts/reconcile_ratings.py's job
+    if db.query(Venue.id).filter(Venue.rating_count > 0).first() is not None:
+        return
+    if db.query(Review.id).filter(Review.approved == True).first() is None:
+        return
+    fixed = reconcile_ratings(db)
+    logger.info(f"Backfilled rating totals: {fixed} venues")
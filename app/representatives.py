@@ -0,0 +1,134 @@
+"""
+Representative venue (and photo) per group
+
+Pages that show one picture per city, state or sport pick the top-rated
+venue with a photo in each group. representative_venues does that for any
+set of groups in a single query: photos are ranked per venue with
+ROW_NUMBER() to find the primary (or first) one, then venues are ranked
+per group with ROW_NUMBER() OVER (PARTITION BY ... ORDER BY rating DESC).
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import case, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.rollup import CityRollup, CitySportRollup
+from app.models.venue import Venue, VenuePhoto
+
+
+class Representative(NamedTuple):
+    """Top venue of a group together with its primary photo"""
+    group: tuple
+    venue_id: int
+    name: str
+    slug: str
+    rating: float
+    photo_url: Optional[str]
+
+
+def primary_photos():
+    """Subquery of (venue_id, url): each venue's primary photo, else its first one"""
+    position = func.row_number().over(
+        partition_by=VenuePhoto.venue_id,
+        order_by=(case((VenuePhoto.is_primary == True, 0), else_=1), VenuePhoto.id)
+    ).label("position")
+    ranked = select(VenuePhoto.venue_id, VenuePhoto.url, position).subquery()
+    return select(ranked.c.venue_id, ranked.c.url)\
+        .where(ranked.c.position == 1)\
+        .subquery("primary_photos")
+
+
+def representative_venues(
+    db: Session,
+    group_by: Sequence,
+    *criteria,
+    groups: Optional[Iterable[tuple]] = None,
+    per_group: int = 1,
+    with_photo: bool = True
+) -> Dict[tuple, List[Representative]]:
+    """
+    Top-rated active venues of each group, best first, in one round trip.
+
+    group_by are Venue columns (e.g. Venue.state, Venue.city); criteria are
+    extra filters such as Venue.sport_type == sport. `groups` limits the
+    query to those key tuples. With with_photo, venues without any photo
+    are skipped, so a group's representative is its best venue that has one.
+    """
+    photos = primary_photos()
+    position = func.row_number().over(
+        partition_by=list(group_by),
+        order_by=(func.coalesce(Venue.rating, 0).desc(), Venue.id)
+    ).label("position")
+
+    ranked = select(
+        *group_by, Venue.id, Venue.name, Venue.slug, Venue.rating, photos.c.url, position
+    ).where(Venue.status == "ACTIVE", *criteria)
+
+    if with_photo:
+        ranked = ranked.join(photos, photos.c.venue_id == Venue.id)
+    else:
+        ranked = ranked.outerjoin(photos, photos.c.venue_id == Venue.id)
+
+    if groups is not None:
+        groups = list(groups)
+        if not groups:
+            return {}
+        if len(group_by) == 1:
+            ranked = ranked.where(group_by[0].in_([group[0] for group in groups]))
+        else:
+            ranked = ranked.where(tuple_(*group_by).in_(groups))
+
+    ranked = ranked.subquery()
+    width = len(group_by)
+    rows = db.execute(
+        select(ranked).where(ranked.c.position <= per_group).order_by(ranked.c.position)
+    )
+
+    result: Dict[tuple, List[Representative]] = {}
+    for row in rows:
+        group = tuple(row[:width])
+        venue_id, name, slug, rating, url = row[width:width + 5]
+        result.setdefault(group, []).append(
+            Representative(group, venue_id, name, slug, rating or 0.0, url)
+        )
+    return result
+
+
+def resize_photo_url(url: Optional[str], width: int) -> Optional[str]:
+    """Ask the photo host (Google Places) for a smaller rendition"""
+    if not url:
+        return None
+    if 'maxwidth=' in url:
+        return url.replace('maxwidth=1600', f'maxwidth={width}').replace('maxwidth=800', f'maxwidth={width}')
+    if '?' in url:
+        return f"{url}&maxwidth={width}"
+    return f"{url}?maxwidth={width}"
+
+
+def popular_cities(db: Session, limit: int = 6, sport_type=None, image_width: int = 600) -> List[dict]:
+    """Cities with the most active venues (of one sport, if given), each with a representative image"""
+    rollup = CitySportRollup if sport_type is not None else CityRollup
+    query = db.query(rollup.city, rollup.state, rollup.venue_count)
+    criteria = []
+    if sport_type is not None:
+        query = query.filter(CitySportRollup.sport_type == sport_type)
+        criteria.append(Venue.sport_type == sport_type)
+    cities = query.order_by(rollup.venue_count.desc(), rollup.state, rollup.city).limit(limit).all()
+
+    representatives = representative_venues(
+        db, (Venue.state, Venue.city), *criteria,
+        groups=[(state, city) for city, state, _ in cities]
+    )
+
+    result = []
+    for city, state, count in cities:
+        top = representatives.get((state, city))
+        result.append({
+            "name": city,
+            "state": state,
+            "venue_count": count,
+            "image_url": resize_photo_url(top[0].photo_url, image_width) if top else None,
+            "slug": f"/locations/{state.lower()}/{city.lower().replace(' ', '-')}"
+        })
+    return result
@@ -0,0 +1,41 @@
+"""
+Maintenance for the precomputed venue rollups (app.models.rollup)
+
+Flushes keep the rollups current for ORM writes. refresh_rollups rebuilds
+them after bulk loads or raw SQL, and is safe to run from cron:
+    python scripts/refresh_rollups.py
+"""
+
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.rollup import StateRollup, CityRollup, CitySportRollup, forget_rollup_tables, rebuild_rollups
+from app.models.venue import Venue
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_MODELS = (StateRollup, CityRollup, CitySportRollup)
+
+
+def refresh_rollups(db: Session) -> int:
+    """Rebuild every rollup row in one transaction; returns the number of states"""
+    rebuild_rollups(db.connection())
+    db.commit()
+    return db.query(func.count(StateRollup.state)).scalar()
+
+
+def ensure_rollups(db: Session) -> None:
+    """Create the rollup tables if needed and rebuild them when out of step with venues"""
+    for model in ROLLUP_MODELS:
+        model.__table__.create(bind=engine, checkfirst=True)
+    forget_rollup_tables()
+
+    rolled_up = db.query(func.coalesce(func.sum(CityRollup.venue_count), 0)).scalar()
+    active = db.query(func.count(Venue.id)).filter(Venue.status == "ACTIVE").scalar()
+
+    if rolled_up != active:
+        states = refresh_rollups(db)
+        logger.info(f"Rebuilt venue rollups: {states} states, {active} active venues")
@@ -4,45 +4,58 @@ Admin panel routes for venue management
 
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc, or_
-from pathlib import Path
-from app.database import get_db
+from typing import List
+from app.database import get_db, pool_stats
 from app.models.venue import Venue, VenuePhoto, Review, User, SportType
+from app.models.rollup import StateRollup
 from app.dependencies import require_admin
+from app.user_cache import UserPrincipal
 from app.csrf import require_csrf
 from app.flash import flash
+from app.pagination import Cursor, paginate_query
+from app.ratings import approve_reviews, delete_reviews
+from app.templating import templates
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+# Admin venue lists page on (created_at, id), newest first
+NEWEST_FIRST = [(Venue.created_at, True), (Venue.id, True)]
+
+
+# The review queue works through pending reviews oldest first
+OLDEST_FIRST = [(Review.created_at, False), (Review.id, False)]
+
+
+def _created_key(venue: Venue) -> tuple:
+    return venue.created_at, venue.id
+
+
+def _review_key(review: Review) -> tuple:
+    return review.created_at, review.id
 
 
 @router.get("/", response_class=HTMLResponse)
-async def admin_dashboard(
+def admin_dashboard(
     request: Request, 
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Admin dashboard with statistics - requires admin access"""
     
     # Get statistics
-    total_venues = db.query(Venue).filter(Venue.status == "ACTIVE").count()
+    total_venues = db.query(func.coalesce(func.sum(StateRollup.venue_count), 0)).scalar()
     total_photos = db.query(VenuePhoto).count()
     total_reviews = db.query(Review).count()
     total_users = db.query(User).count()
     
     # Get venues by state
     venues_by_state = db.query(
-        Venue.state,
-        func.count(Venue.id).label('count')
-    ).filter(
-        Venue.status == "ACTIVE"
-    ).group_by(
-        Venue.state
+        StateRollup.state,
+        StateRollup.venue_count.label('count')
     ).order_by(
-        desc('count')
+        StateRollup.venue_count.desc()
     ).limit(10).all()
     
     # Get recent venues
@@ -75,106 +88,14 @@ async def admin_dashboard(
             "venues_by_state": venues_by_state,
             "recent_venues": recent_venues,
             "venues_needing_review": venues_needing_review,
+            "pools": pool_stats(),
             "page_title": "Admin Dashboard | Skaters.com"
         }
     )
 
 
-@router.get("/venues", response_class=HTMLResponse)
-async def admin_venues_list(
-    request: Request,
-    page: int = 1,
-    search: str = "",
-    db: Session = Depends(get_db)
-):
-    """List all venues with management options"""
-    
-    per_page = 50
-    offset = (page - 1) * per_page
-    
-    # Build query
-    query = db.query(Venue).options(joinedload(Venue.photos))
-    
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Venue.name.ilike(search_term)) |
-            (Venue.city.ilike(search_term)) |
-            (Venue.state.ilike(search_term))
-        )
-    
-    # Get total count
-    total = query.count()
-    
-    # Get paginated results
-    venues = query.order_by(desc(Venue.created_at)).offset(offset).limit(per_page).all()
-    
-    # Calculate pagination
-    total_pages = (total + per_page - 1) // per_page
-    
-    return templates.TemplateResponse(
-        "admin/venues.html",
-        {
-            "request": request,
-            "venues": venues,
-            "page": page,
-            "total_pages": total_pages,
-            "total": total,
-            "search": search,
-            "page_title": "Manage Venues | Admin"
-        }
-    )
-
-
-@router.get("/venues/{venue_id}/edit", response_class=HTMLResponse)
-async def admin_edit_venue(
-    request: Request,
-    venue_id: int,
-    db: Session = Depends(get_db)
-):
-    """Edit venue details"""
-    
-    venue = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .options(joinedload(Venue.amenities))\
-        .options(joinedload(Venue.hours))\
-        .options(joinedload(Venue.pricing))\
-        .filter(Venue.id == venue_id)\
-        .first()
-    
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
-    
-    return templates.TemplateResponse(
-        "admin/edit_venue.html",
-        {
-            "request": request,
-            "venue": venue,
-            "page_title": f"Edit {venue.name} | Admin"
-        }
-    )
-
-
-@router.post("/venues/{venue_id}/delete")
-async def admin_delete_venue(
-    venue_id: int,
-    db: Session = Depends(get_db)
-):
-    """Soft delete a venue"""
-    
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
-    
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
-    
-    venue.status = "deleted"
-    db.commit()
-    
-    return RedirectResponse(url="/admin/venues", status_code=303)
-
-
 @router.post("/venues/{venue_id}/verify")
-async def admin_verify_venue(
+def admin_verify_venue(
     venue_id: int,
     db: Session = Depends(get_db)
 ):
@@ -192,11 +113,11 @@ async def admin_verify_venue(
 
 
 @router.get("/venues", response_class=HTMLResponse)
-async def list_venues(
+def list_venues(
     request: Request,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: Session = Depends(get_db),
-    page: int = 1,
+    cursor: str = "",
     q: str = "",
     status: str = "",
     sport_type: str = ""
@@ -204,7 +125,6 @@ async def list_venues(
     """List all venues with filters"""
     
     per_page = 50
-    offset = (page - 1) * per_page
     
     # Base query
     query = db.query(Venue)
@@ -226,22 +146,19 @@ async def list_venues(
     if sport_type:
         query = query.filter(Venue.sport_type == sport_type)
     
-    # Get total count
-    total = query.count()
-    total_pages = (total + per_page - 1) // per_page
-    
-    # Get venues
-    venues = query.order_by(desc(Venue.created_at)).offset(offset).limit(per_page).all()
+    # Get venues (newest first); counted on the first page only
+    pagination = paginate_query(
+        query, NEWEST_FIRST, _created_key, per_page, Cursor.decode(cursor), count=query.count
+    )
     
     return templates.TemplateResponse(
         "admin/venues_list.html",
         {
             "request": request,
             "user": current_user,
-            "venues": venues,
-            "total": total,
-            "page": page,
-            "total_pages": total_pages,
+            "venues": pagination.items,
+            "total": pagination.total,
+            "pagination": pagination,
             "query": q,
             "status": status,
             "sport_type": sport_type,
@@ -251,10 +168,10 @@ async def list_venues(
 
 
 @router.get("/venues/{venue_id}/edit", response_class=HTMLResponse)
-async def edit_venue_page(
+def edit_venue_page(
     request: Request,
     venue_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Display venue edit form"""
@@ -276,10 +193,10 @@ async def edit_venue_page(
 
 
 @router.post("/venues/{venue_id}/update")
-async def update_venue(
+def update_venue(
     request: Request,
     venue_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: Session = Depends(get_db),
     csrf_token: str = Form(...),
     name: str = Form(...),
@@ -326,10 +243,10 @@ async def update_venue(
 
 
 @router.post("/venues/{venue_id}/delete")
-async def delete_venue(
+def delete_venue(
     request: Request,
     venue_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: UserPrincipal = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Delete venue"""
@@ -348,3 +265,91 @@ async def delete_venue(
     db.commit()
     
     return JSONResponse({"success": True})
+
+
+@router.get("/reviews", response_class=HTMLResponse)
+def review_queue(
+    request: Request,
+    current_user: UserPrincipal = Depends(require_admin),
+    db: Session = Depends(get_db),
+    cursor: str = ""
+):
+    """Pending reviews, oldest first, for bulk moderation"""
+    
+    per_page = 50
+    
+    query = db.query(Review)\
+        .options(joinedload(Review.venue), joinedload(Review.user))\
+        .filter(Review.approved == False)
+    
+    pagination = paginate_query(
+        query, OLDEST_FIRST, _review_key, per_page, Cursor.decode(cursor),
+        count=db.query(func.count(Review.id)).filter(Review.approved == False).scalar
+    )
+    
+    return templates.TemplateResponse(
+        "admin/reviews.html",
+        {
+            "request": request,
+            "user": current_user,
+            "reviews": pagination.items,
+            "total": pagination.total,
+            "pagination": pagination,
+            "page_title": "Review Queue | Admin | Skaters.com"
+        }
+    )
+
+
+@router.post("/reviews/approve")
+def approve_selected_reviews(
+    request: Request,
+    current_user: UserPrincipal = Depends(require_admin),
+    db: Session = Depends(get_db),
+    csrf_token: str = Form(...),
+    review_ids: List[int] = Form([])
+):
+    """Approve the selected reviews"""
+    
+    require_csrf(request, csrf_token)
+    
+    approved = approve_reviews(db, review_ids)
+    
+    flash(request, f"Approved {approved} review{'s' if approved != 1 else ''}.", "success")
+    return RedirectResponse(url="/admin/reviews", status_code=303)
+
+
+@router.post("/reviews/reject")
+def reject_selected_reviews(
+    request: Request,
+    current_user: UserPrincipal = Depends(require_admin),
+    db: Session = Depends(get_db),
+    csrf_token: str = Form(...),
+    review_ids: List[int] = Form([])
+):
+    """Reject (delete) the selected reviews"""
+    
+    require_csrf(request, csrf_token)
+    
+    rejected = delete_reviews(db, review_ids)
+    
+    flash(request, f"Rejected {rejected} review{'s' if rejected != 1 else ''}.", "success")
+    return RedirectResponse(url="/admin/reviews", status_code=303)
+
+
+@router.post("/reviews/{review_id}/delete")
+def delete_review(
+    request: Request,
+    review_id: int,
+    current_user: UserPrincipal = Depends(require_admin),
+    db: Session = Depends(get_db),
+    csrf_token: str = Form(...)
+):
+    """Delete a review, approved or not"""
+    
+    require_csrf(request, csrf_token)
+    
+    if not delete_reviews(db, [review_id]):
+        raise HTTPException(status_code=404, detail="Review not found")
+    
+    flash(request, "Review deleted.", "success")
+    return RedirectResponse(url="/admin/reviews", status_code=303)
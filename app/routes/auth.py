@@ -4,20 +4,18 @@ Authentication routes
 
 from fastapi import APIRouter, Request, Depends, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from pathlib import Path
 from app.database import get_db
 from app.models.venue import User
 from app.auth import hash_password, verify_password, get_user_by_username, get_user_by_email
 from app.flash import flash, get_flashed_messages
 from app.csrf import require_csrf
+from app.user_cache import UserPrincipal, user_cache
+from app.templating import templates
 from slugify import slugify
 import re
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -36,7 +34,7 @@ async def login_page(request: Request):
 
 
 @router.post("/login")
-async def login(
+def login(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
@@ -82,6 +80,11 @@ async def login(
     request.session["username"] = user.username
     request.session["email"] = user.email
     
+    # Compact principal so page views need no user query
+    principal = UserPrincipal.from_user(user)
+    request.session["user"] = principal.to_session()
+    user_cache.put(user.id, principal)
+    
     # Add success message
     flash(request, f"Welcome back, {user.username}!", "success")
     
@@ -107,7 +110,7 @@ async def register_page(request: Request):
 
 
 @router.post("/register")
-async def register(
+def register(
     request: Request,
     full_name: str = Form(...),
     email: str = Form(...),
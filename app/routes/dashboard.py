@@ -4,28 +4,27 @@ User dashboard routes
 
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from pathlib import Path
 from app.database import get_db
 from app.models.venue import User, Review, SavedVenue, Venue
 from app.dependencies import require_auth
+from app.user_cache import UserPrincipal
+from app.templating import templates
 from datetime import datetime
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
 @router.get("", response_class=HTMLResponse)
-async def dashboard(
+def dashboard(
     request: Request,
-    current_user: User = Depends(require_auth),
+    current_user: UserPrincipal = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """User dashboard - requires authentication"""
     
-    user = current_user
+    # The profile card needs more than the session principal carries
+    user = db.query(User).filter(User.id == current_user.id).first()
     
     # Get user stats
     saved_count = db.query(SavedVenue).filter(SavedVenue.user_id == user.id).count()
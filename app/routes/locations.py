@@ -4,21 +4,21 @@ Location routes for state and city hierarchy
 
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
-from pathlib import Path
-from app.database import get_db
-from app.models.venue import Venue, SportType
-from app.dependencies import get_current_user_optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import distinct, select
+from app.database import get_async_read_db
+from app.models.venue import SportType
+from app.models.rollup import StateRollup, CityRollup
+from app.dependencies import get_current_user_optional_async
+from app.http_cache import is_not_modified, not_modified, page_validators
+from app.venue_cache import venue_cache, freshness
+from app.templating import templates
 from typing import Optional
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 @router.get("/states", response_class=HTMLResponse)
-async def list_states(request: Request, db: Session = Depends(get_db)):
+async def list_states(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """List all states with venue counts"""
     # Valid US state codes (2 letters)
     us_states = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 
@@ -27,19 +27,23 @@ async def list_states(request: Request, db: Session = Depends(get_db)):
                  'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 
                  'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC']
     
-    states = db.query(
-        Venue.state,
-        func.count(Venue.id).label('venue_count')
-    ).filter(
-        Venue.status == "ACTIVE",
-        Venue.state.in_(us_states)
-    ).group_by(
-        Venue.state
-    ).order_by(
-        Venue.state
-    ).all()
+    # The counts come from every active venue, so the whole snapshot is the stamp
+    last_modified, venue_count = freshness((await venue_cache.get_async()).venues)
+    current_user = await get_current_user_optional_async(request, db)
+    headers = page_validators(request, current_user, last_modified, venue_count)
+    if headers and is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
     
-    current_user = get_current_user_optional(request, db)
+    states = (await db.execute(
+        select(
+            StateRollup.state,
+            StateRollup.venue_count
+        ).where(
+            StateRollup.state.in_(us_states)
+        ).order_by(
+            StateRollup.state
+        )
+    )).all()
     
     return templates.TemplateResponse(
         "states.html",
@@ -49,54 +53,47 @@ async def list_states(request: Request, db: Session = Depends(get_db)):
             "states": [{"code": state, "venue_count": count} for state, count in states],
             "page_title": "Browse Skating Venues by State | Skaters.com",
             "meta_description": "Browse our comprehensive directory of skating venues across all 50 US states. Find skateparks, ice rinks, and roller rinks near you."
-        }
+        },
+        headers=headers
     )
 
 @router.get("/{state}", response_class=HTMLResponse)
-async def state_detail(request: Request, state: str, db: Session = Depends(get_db)):
+async def state_detail(request: Request, state: str, db: AsyncSession = Depends(get_async_read_db)):
     """Show all cities in a state with venue counts"""
-    from sqlalchemy.orm import joinedload
-    from app.models.venue import VenuePhoto
-    
     state_name = state.upper()
+    state_venues = (await venue_cache.get_async()).in_state(state_name)
     
-    # Get all cities in this state with venue counts
-    cities = db.query(
-        Venue.city,
-        func.count(Venue.id).label('venue_count')
-    ).filter(
-        Venue.state == state_name,
-        Venue.status == "ACTIVE"
-    ).group_by(
-        Venue.city
-    ).order_by(
-        Venue.city
-    ).all()
+    last_modified, venue_count = freshness(state_venues)
+    current_user = await get_current_user_optional_async(request, db)
+    headers = page_validators(request, current_user, last_modified, state_name, venue_count)
+    if headers and is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
     
-    # Get featured venues from this state with their photos
-    featured_venues = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .filter(
-            Venue.state == state_name,
-            Venue.status == "ACTIVE"
+    # Get all cities in this state with venue counts
+    cities = (await db.execute(
+        select(
+            CityRollup.city,
+            CityRollup.venue_count
+        ).where(
+            CityRollup.state == state_name
         ).order_by(
-            Venue.rating.desc()
-        ).limit(5).all()
+            CityRollup.city
+        )
+    )).all()
+    
+    # Featured venues are the top rated in the state (the snapshot is already sorted)
+    featured_venues = state_venues[:5]
     
     # Process venues to include photo URLs
     processed_venues = []
     for venue in featured_venues:
-        # Get primary photo or first available
-        photo = next((p for p in venue.photos if p.is_primary), 
-                    venue.photos[0] if venue.photos else None)
-        
-        # Build image URL
+        # Build image URL from the primary or first available photo
         image_url = None
-        if photo:
-            if 'maxwidth=' not in photo.url:
-                image_url = f"{photo.url}?maxwidth=800" if '?' not in photo.url else f"{photo.url}&maxwidth=800"
+        if venue.photo_url:
+            if 'maxwidth=' not in venue.photo_url:
+                image_url = f"{venue.photo_url}?maxwidth=800" if '?' not in venue.photo_url else f"{venue.photo_url}&maxwidth=800"
             else:
-                image_url = photo.url
+                image_url = venue.photo_url
         
         processed_venues.append({
             "name": venue.name,
@@ -108,8 +105,6 @@ async def state_detail(request: Request, state: str, db: Session = Depends(get_d
             "image_url": image_url or f"https://picsum.photos/seed/{venue.slug}/800/600?grayscale"
         })
     
-    current_user = get_current_user_optional(request, db)
-    
     return templates.TemplateResponse(
         "state_detail.html",
         {
@@ -120,53 +115,40 @@ async def state_detail(request: Request, state: str, db: Session = Depends(get_d
             "featured_venues": processed_venues,
             "page_title": f"Skating Venues in {state_name} | Skaters.com",
             "meta_description": f"Find the best skating venues in {state_name}. Browse our directory of skateparks, ice rinks, and roller rinks across {state_name}."
-        }
+        },
+        headers=headers
     )
 
 @router.get("/{state}/{city}", response_class=HTMLResponse)
-async def city_venues(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_venues(request: Request, state: str, city: str, db: AsyncSession = Depends(get_async_read_db)):
     """Show all venues in a specific city"""
-    from sqlalchemy.orm import joinedload
-    
     state_code = state.upper()
     
-    # Get all venues in this city with their photos
-    venues = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .filter(
-            Venue.state == state_code,
-            Venue.city.ilike(city.replace('-', ' ')),
-            Venue.status == "ACTIVE"
-        ).order_by(
-            Venue.rating.desc()
-        ).all()
+    # Get all venues in this city from the snapshot
+    venues = (await venue_cache.get_async()).in_city(state_code, city.replace('-', ' '))
     
     if not venues:
         raise HTTPException(status_code=404, detail="No venues found in this location")
     
+    last_modified, venue_count = freshness(venues)
+    current_user = await get_current_user_optional_async(request, db)
+    headers = page_validators(request, current_user, last_modified, state_code, city, venue_count)
+    if headers and is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
+    
     # Get unique sport types in this city
-    sport_types = db.query(
-        Venue.sport_type
-    ).filter(
-        Venue.state == state_code,
-        Venue.city.ilike(city.replace('-', ' ')),
-        Venue.status == "ACTIVE"
-    ).distinct().all()
+    sport_types = list(dict.fromkeys(venue.sport_type for venue in venues))
     
     # Process venues to include photo URLs
     processed_venues = []
     for venue in venues:
-        # Get primary photo or first available
-        photo = next((p for p in venue.photos if p.is_primary), 
-                    venue.photos[0] if venue.photos else None)
-        
-        # Build image URL
+        # Build image URL from the primary or first available photo
         image_url = None
-        if photo:
-            if 'maxwidth=' not in photo.url:
-                image_url = f"{photo.url}?maxwidth=800" if '?' not in photo.url else f"{photo.url}&maxwidth=800"
+        if venue.photo_url:
+            if 'maxwidth=' not in venue.photo_url:
+                image_url = f"{venue.photo_url}?maxwidth=800" if '?' not in venue.photo_url else f"{venue.photo_url}&maxwidth=800"
             else:
-                image_url = photo.url
+                image_url = venue.photo_url
         
         processed_venues.append({
             "name": venue.name,
@@ -181,8 +163,6 @@ async def city_venues(request: Request, state: str, city: str, db: Session = Dep
             "longitude": venue.longitude
         })
     
-    current_user = get_current_user_optional(request, db)
-    
     return templates.TemplateResponse(
         "city_venues.html",
         {
@@ -191,30 +171,30 @@ async def city_venues(request: Request, state: str, city: str, db: Session = Dep
             "state_code": state_code,
             "city": city.replace('-', ' ').title(),
             "venues": processed_venues,
-            "sport_types": [st[0].value for st in sport_types],
+            "sport_types": [st.value for st in sport_types],
             "page_title": f"Skating Venues in {city.replace('-', ' ').title()}, {state_code} | Skaters.com",
             "meta_description": f"Find the best skating venues in {city.replace('-', ' ').title()}, {state_code}. Browse our directory of skateparks, ice rinks, and roller rinks in the area."
-        }
+        },
+        headers=headers
     )
 
 @router.get("/skate-parks/{state}/{city}", response_class=HTMLResponse)
-async def city_skate_parks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_skate_parks(request: Request, state: str, city: str):
     """SEO-optimized page for skate parks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.SKATEBOARDING, db)
+    return await _sport_city_page(request, state, city, SportType.SKATEBOARDING)
 
 @router.get("/ice-rinks/{state}/{city}", response_class=HTMLResponse)
-async def city_ice_rinks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_ice_rinks(request: Request, state: str, city: str):
     """SEO-optimized page for ice rinks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.ICE_SKATING, db)
+    return await _sport_city_page(request, state, city, SportType.ICE_SKATING)
 
 @router.get("/roller-rinks/{state}/{city}", response_class=HTMLResponse)
-async def city_roller_rinks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_roller_rinks(request: Request, state: str, city: str):
     """SEO-optimized page for roller rinks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.ROLLER_SKATING, db)
+    return await _sport_city_page(request, state, city, SportType.ROLLER_SKATING)
 
-async def _sport_city_page(request: Request, state: str, city: str, sport_type: SportType, db: Session):
+async def _sport_city_page(request: Request, state: str, city: str, sport_type: SportType):
     """Helper function for sport-specific city pages"""
-    from sqlalchemy.orm import joinedload
     
     state_code = state.upper()
     city_name = city.replace('-', ' ').title()
@@ -229,21 +209,21 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
     
     sport_info = sport_names.get(sport_type, {"singular": "Venue", "plural": "Venues", "keyword": "venue"})
     
-    # Get all venues of this sport type in this city
-    venues = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .filter(
-            Venue.state == state_code,
-            Venue.city.ilike(city.replace('-', ' ')),
-            Venue.sport_type == sport_type,
-            Venue.status == "ACTIVE"
-        ).order_by(
-            Venue.rating.desc()
-        ).all()
+    # Get all venues of this sport type in this city from the snapshot
+    venues = [
+        venue for venue in (await venue_cache.get_async()).in_city(state_code, city.replace('-', ' '))
+        if venue.sport_type == sport_type
+    ]
     
     if not venues:
         raise HTTPException(status_code=404, detail=f"No {sport_info['plural'].lower()} found in {city_name}, {state_code}")
     
+    # The page has no signed-in nav, so every visitor shares one ETag
+    last_modified, venue_count = freshness(venues)
+    headers = page_validators(request, None, last_modified, sport_type.name, state_code, city, venue_count)
+    if headers and is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
+    
     # Calculate stats
     total_venues = len(venues)
     avg_rating = sum(v.rating for v in venues) / total_venues if total_venues > 0 else 0
@@ -252,17 +232,14 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
     # Process venues
     processed_venues = []
     for venue in venues:
-        photo = next((p for p in venue.photos if p.is_primary), 
-                    venue.photos[0] if venue.photos else None)
-        
         image_url = None
-        if photo:
-            if 'maxwidth=' in photo.url:
-                image_url = photo.url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
-            elif '?' in photo.url:
-                image_url = f"{photo.url}&maxwidth=400"
+        if venue.photo_url:
+            if 'maxwidth=' in venue.photo_url:
+                image_url = venue.photo_url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
+            elif '?' in venue.photo_url:
+                image_url = f"{venue.photo_url}&maxwidth=400"
             else:
-                image_url = f"{photo.url}?maxwidth=400"
+                image_url = f"{venue.photo_url}?maxwidth=400"
         
         processed_venues.append({
             "name": venue.name,
@@ -313,5 +290,6 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
             "faq_items": faq_items,
             "page_title": page_title,
             "meta_description": meta_description
-        }
+        },
+        headers=headers
     )
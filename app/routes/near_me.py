@@ -5,76 +5,67 @@ Targets high-volume "near me" keywords (201,000+ monthly searches)
 
 from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from pathlib import Path
 from typing import Optional
-from app.database import get_db
-from app.models.venue import Venue, SportType
-import math
+from app.database import get_read_db
+from app.models.venue import SportType
+from app.spatial import find_nearby
+from app.representatives import popular_cities
+from app.templating import templates
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two coordinates using Haversine formula (in miles)"""
-    R = 3959  # Earth's radius in miles
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lon = math.radians(lon2 - lon1)
-    
-    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+# Most venues one /api/venues/nearby call returns
+MAX_NEARBY_RESULTS = 200
 
 @router.get("/ice-rinks", response_class=HTMLResponse)
-async def ice_rinks_hub(request: Request):
+def ice_rinks_hub(request: Request, db: Session = Depends(get_read_db)):
     """Ice rinks hub page - targets 'ice rink ice' keyword (110,000 monthly searches)"""
     return templates.TemplateResponse(
         "ice_rinks_hub.html",
         {
             "request": request,
+            "popular_cities": popular_cities(db, limit=7, sport_type=SportType.ICE_SKATING, image_width=400),
             "page_title": "Ice Rinks - Find Ice Skating Rinks Near You | Skaters.com",
             "meta_description": "Discover ice rinks near you. Find indoor and outdoor ice skating facilities for hockey, figure skating, and recreational fun. Browse by location with ratings and reviews."
         }
     )
 
 @router.get("/skate-parks", response_class=HTMLResponse)
-async def skate_parks_hub(request: Request):
+def skate_parks_hub(request: Request, db: Session = Depends(get_read_db)):
     """Skate parks hub page - targets 'skate park' keyword (301,000 monthly searches)"""
     return templates.TemplateResponse(
         "skate_parks_hub.html",
         {
             "request": request,
+            "popular_cities": popular_cities(db, limit=8, sport_type=SportType.SKATEBOARDING, image_width=400),
             "page_title": "Skate Parks - Find Skateboarding Venues Near You | Skaters.com",
             "meta_description": "Discover skate parks near you. Find indoor and outdoor skateboarding venues with ramps, bowls, and street features. Browse by location with ratings and reviews."
         }
     )
 
 @router.get("/roller-rinks", response_class=HTMLResponse)
-async def roller_rinks_hub(request: Request):
+def roller_rinks_hub(request: Request, db: Session = Depends(get_read_db)):
     """Roller rinks hub page"""
     return templates.TemplateResponse(
         "roller_rinks_hub.html",
         {
             "request": request,
+            "popular_cities": popular_cities(db, limit=8, sport_type=SportType.ROLLER_SKATING, image_width=400),
             "page_title": "Roller Rinks - Find Roller Skating Rinks Near You | Skaters.com",
             "meta_description": "Discover roller skating rinks near you. Find indoor and outdoor roller rinks for recreational skating, parties, and events. Browse by location with ratings and reviews."
         }
     )
 
 @router.get("/inline-skating", response_class=HTMLResponse)
-async def inline_skating_hub(request: Request):
+def inline_skating_hub(request: Request, db: Session = Depends(get_read_db)):
     """Inline skating hub page"""
     return templates.TemplateResponse(
         "inline_skating_hub.html",
         {
             "request": request,
+            "popular_cities": popular_cities(db, limit=8, sport_type=SportType.INLINE_SKATING, image_width=400),
             "page_title": "Inline Skating - Find Inline Skating Venues Near You | Skaters.com",
             "meta_description": "Discover inline skating venues near you. Find paved trails, boardwalks, and skate parks for inline skating. Browse by location with ratings and reviews."
         }
@@ -135,59 +126,26 @@ async def near_me_landing(request: Request):
     )
 
 @router.get("/api/venues/nearby", response_class=JSONResponse)
-async def find_nearby_venues(
+def find_nearby_venues(
     lat: float = Query(..., description="User latitude"),
     lng: float = Query(..., description="User longitude"),
     radius: int = Query(100, description="Search radius in miles"),
     sport_type: Optional[str] = Query(None, description="Filter by sport type"),
-    limit: int = Query(50, description="Maximum number of results"),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=MAX_NEARBY_RESULTS, description="Maximum number of results"),
+    db: Session = Depends(get_read_db)
 ):
     """API endpoint to find venues near a location"""
     
-    # Build query
-    query = db.query(Venue).filter(
-        Venue.status == "ACTIVE",
-        Venue.latitude.isnot(None),
-        Venue.longitude.isnot(None)
-    )
-    
     # Filter by sport type if specified
+    sport_enum = None
     if sport_type:
         try:
             sport_enum = SportType(sport_type)
-            query = query.filter(Venue.sport_type == sport_enum)
         except ValueError:
             pass
     
-    # Get all venues (we'll filter by distance in Python)
-    all_venues = query.all()
-    
-    # Calculate distances and filter
-    nearby_venues = []
-    for venue in all_venues:
-        distance = calculate_distance(lat, lng, venue.latitude, venue.longitude)
-        if distance <= radius:
-            nearby_venues.append({
-                "id": venue.id,
-                "name": venue.name,
-                "slug": venue.slug,
-                "sport_type": venue.sport_type.value,
-                "address": venue.address,
-                "city": venue.city,
-                "state": venue.state,
-                "latitude": venue.latitude,
-                "longitude": venue.longitude,
-                "rating": venue.rating,
-                "review_count": venue.review_count,
-                "distance": round(distance, 1)
-            })
-    
-    # Sort by distance
-    nearby_venues.sort(key=lambda x: x['distance'])
-    
-    # Limit results
-    nearby_venues = nearby_venues[:limit]
+    # Grid index + bounding box narrow the candidates in SQL, exact distance only for those
+    nearby_venues = find_nearby(db, lat, lng, radius, sport_enum, limit)
     
     return {
         "success": True,
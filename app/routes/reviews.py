@@ -4,26 +4,24 @@ Review routes
 
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from pathlib import Path
 from app.database import get_db
-from app.models.venue import Review, Venue, User
+from app.models.venue import Review, Venue
 from app.dependencies import require_auth
+from app.user_cache import UserPrincipal
+from app.templating import templates
 from datetime import datetime
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
 @router.post("/submit")
-async def submit_review(
+def submit_review(
     venue_id: int = Form(...),
     rating: int = Form(...),
     title: str = Form(""),
     comment: str = Form(...),
-    current_user: User = Depends(require_auth),
+    current_user: UserPrincipal = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """Submit a new review - requires authentication"""
@@ -53,13 +51,7 @@ async def submit_review(
     
     db.add(new_review)
     
-    # Update venue rating (simple average for now)
-    all_reviews = db.query(Review).filter(Review.venue_id == venue_id, Review.approved == True).all()
-    if all_reviews:
-        total_rating = sum(r.rating for r in all_reviews)
-        venue.rating = round(total_rating / len(all_reviews), 1)
-        venue.review_count = len(all_reviews)
-    
+    # The venue's rating only changes once the review is approved (app.ratings)
     db.commit()
     
     # Redirect back to venue with success message
@@ -67,10 +59,10 @@ async def submit_review(
 
 
 @router.get("/add/{venue_slug}", response_class=HTMLResponse)
-async def new_review_form(
+def new_review_form(
     request: Request,
     venue_slug: str,
-    current_user: User = Depends(require_auth),
+    current_user: UserPrincipal = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """Display review submission form - requires authentication"""
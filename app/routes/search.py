@@ -4,99 +4,128 @@ Search routes with advanced filtering
 
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
-from pathlib import Path
-from app.database import get_db
-from app.models.venue import Venue, SportType, VenuePhoto
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.database import get_read_db
+from app.models.venue import SportType, VenuePhoto
 from app.dependencies import get_current_user_optional
+from app.search import search_backend
+from app.pagination import Cursor, build_page, paginate_sequence
+from app.venue_cache import venue_cache, rating_order
+from app.templating import templates
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+
+def review_order(venue) -> tuple:
+    """Most reviewed first, ties by id"""
+    return -venue.review_count, venue.id
+
+
+def name_order(venue) -> tuple:
+    return venue.name, venue.id
 
 
 @router.get("/search", response_class=HTMLResponse)
-async def search_venues(
+def search_venues(
     request: Request,
     q: str = "",
     sport_type: str = "",
     state: str = "",
     city: str = "",
-    sort: str = "rating",
-    page: int = 1,
-    db: Session = Depends(get_db)
+    sort: str = "",
+    cursor: str = "",
+    db: Session = Depends(get_read_db)
 ):
     """Advanced venue search with filters and pagination"""
     
     per_page = 24
-    offset = (page - 1) * per_page
+    page_cursor = Cursor.decode(cursor)
     
-    # Start with base query - load photos eagerly
-    query = db.query(Venue).options(joinedload(Venue.photos)).filter(Venue.status == "ACTIVE")
+    # Keyword searches default to relevance order, browsing to rating
+    if not sort:
+        sort = "relevance" if q else "rating"
     
-    # Apply keyword search
-    if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                Venue.name.ilike(search_term),
-                Venue.city.ilike(search_term),
-                Venue.description.ilike(search_term),
-                Venue.address.ilike(search_term)
-            )
-        )
-    
-    # Apply sport type filter
+    # Validate sport type (invalid values are ignored)
+    sport_enum = None
     if sport_type:
         try:
             sport_enum = SportType(sport_type)
-            query = query.filter(Venue.sport_type == sport_enum)
         except ValueError:
-            pass  # Invalid sport type, ignore
-    
-    # Apply state filter
-    if state:
-        query = query.filter(Venue.state == state.upper())
+            pass
+    
+    snapshot = venue_cache.get()
+    use_index = bool(q) and search_backend.searchable(q)
+    sport_filter = sport_enum.value if sport_enum else None
+    
+    if use_index and sort == "relevance":
+        # Ranked full-text search, paged on (rank, id)
+        if not city:
+            # The backend seeks straight to the page, so deep pages cost the same
+            hits, total = search_backend.search(db, q, per_page + 1, sport_filter, state, page_cursor)
+        else:
+            # City is filtered here, so rank every hit and page in memory
+            hits, _ = search_backend.search(db, q, None, sport_filter, state)
+        ranks = dict(hits)
+        venues = [snapshot.by_id[venue_id] for venue_id, _ in hits if venue_id in snapshot.by_id]
+        
+        def sort_key(venue) -> tuple:
+            return ranks[venue.id], venue.id
+    else:
+        if use_index:
+            ids = search_backend.matching_ids(db, q, sport_filter, state)
+            venues = [snapshot.by_id[venue_id] for venue_id in ids if venue_id in snapshot.by_id]
+        else:
+            # Filter the in-memory snapshot of active venues (already in rating order)
+            venues = snapshot.in_state(state) if state else snapshot.venues
+            
+            # Keyword fallback while the index is unavailable (case-insensitive substring)
+            if q:
+                term = q.lower()
+                venues = [
+                    v for v in venues
+                    if term in v.name.lower()
+                    or term in v.city.lower()
+                    or (v.description and term in v.description.lower())
+                    or (v.address and term in v.address.lower())
+                ]
+            
+            # Apply sport type filter
+            if sport_enum:
+                venues = [v for v in venues if v.sport_type == sport_enum]
+        
+        # Page on (sort column, id)
+        if sort == "reviews":
+            sort_key = review_order
+        elif sort == "name":
+            sort_key = name_order
+        else:
+            sort_key = rating_order
+        if use_index or sort_key is not rating_order:
+            venues = sorted(venues, key=sort_key)
     
     # Apply city filter
     if city:
-        query = query.filter(Venue.city.ilike(f"%{city}%"))
-    
-    # Apply sorting
-    if sort == "reviews":
-        query = query.order_by(Venue.review_count.desc())
-    elif sort == "name":
-        query = query.order_by(Venue.name)
-    else:  # Default to rating
-        query = query.order_by(Venue.rating.desc())
+        city_term = city.lower()
+        venues = [v for v in venues if city_term in v.city.lower()]
     
-    # Get total count for pagination
-    total = query.count()
-    
-    # Execute query with pagination
-    venues = query.offset(offset).limit(per_page).all()
-    
-    # Calculate pagination info
-    total_pages = (total + per_page - 1) // per_page
-    has_prev = page > 1
-    has_next = page < total_pages
+    # Paginate by cursor rather than offset; the total comes from the first page
+    if use_index and sort == "relevance" and not city:
+        pagination = build_page(venues, sort_key, per_page, page_cursor, total if page_cursor is None else None)
+    else:
+        pagination = paginate_sequence(venues, sort_key, per_page, page_cursor)
+    venues = pagination.items
     
     # Convert to dict for template with real images
     results = []
     for v in venues:
-        # Get primary photo or first available
-        photo = next((p for p in v.photos if p.is_primary), 
-                    v.photos[0] if v.photos else None)
-        
-        # Build image URL
+        # Build image URL from the primary or first available photo
         image_url = None
-        if photo:
-            if 'maxwidth=' not in photo.url:
-                image_url = f"{photo.url}?maxwidth=400" if '?' not in photo.url else f"{photo.url}&maxwidth=400"
+        if v.photo_url:
+            if 'maxwidth=' not in v.photo_url:
+                image_url = f"{v.photo_url}?maxwidth=400" if '?' not in v.photo_url else f"{v.photo_url}&maxwidth=400"
             else:
-                image_url = photo.url
+                image_url = v.photo_url
         
         results.append({
             "id": v.id,
@@ -126,8 +155,7 @@ async def search_venues(
     current_user = get_current_user_optional(request, db)
     
     # Get all states for dropdown
-    all_states = db.query(Venue.state).filter(Venue.status == "ACTIVE").distinct().order_by(Venue.state).all()
-    states_list = [{"code": s[0], "name": get_state_name(s[0])} for s in all_states]
+    states_list = [{"code": code, "name": get_state_name(code)} for code in snapshot.states]
     
     # Dynamic titles based on sport type
     sport_titles = {
@@ -177,11 +205,8 @@ async def search_venues(
             "city": city,
             "sort": sort,
             "query_params": "&".join(query_params),
-            "page": page,
-            "total_pages": total_pages,
-            "total": total,
-            "has_prev": has_prev,
-            "has_next": has_next,
+            "pagination": pagination,
+            "total": pagination.total,
             "states": states_list,
             "sport_title": sport_info["title"],
             "sport_singular": sport_info["singular"],
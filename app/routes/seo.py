@@ -2,15 +2,22 @@
 SEO routes - sitemap, robots.txt, etc.
 """
 
-from fastapi import APIRouter, Request, Depends, Response
+import re
+
+from fastapi import APIRouter, Request, Depends, Response, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
-from app.database import get_db
-from app.models.venue import Venue, SportType
+from app.database import get_read_db
+from app.http_cache import is_not_modified, not_modified, validator_headers
+from app.sitemap import (
+    SECTIONS, SITEMAP_MAX_AGE, file_start, render_index, render_pages, sitemap_stamp, stream_section
+)
 
 router = APIRouter()
 
+# <section>-<n>.xml, e.g. venues-3.xml
+SITEMAP_FILE = re.compile(r"^([a-z-]+)-([1-9][0-9]*)\.xml$")
+
 
 @router.get("/robots.txt", response_class=Response)
 async def robots_txt():
@@ -27,112 +34,34 @@ Sitemap: https://skaters.com/sitemap.xml
 
 
 @router.get("/sitemap.xml", response_class=Response)
-async def sitemap_xml(db: Session = Depends(get_db)):
-    """Generate XML sitemap for SEO"""
-    
-    # Get all active venues
-    venues = db.query(Venue).filter(Venue.status == "ACTIVE").all()
-    
-    # Get all states
-    states = db.query(Venue.state).filter(Venue.status == "ACTIVE").distinct().all()
-    
-    # Get all cities
-    cities = db.query(Venue.city, Venue.state).filter(Venue.status == "ACTIVE").distinct().all()
-    
-    # Build sitemap XML
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
-    # Homepage
-    xml.append('  <url>')
-    xml.append('    <loc>https://skaters.com/</loc>')
-    xml.append('    <changefreq>daily</changefreq>')
-    xml.append('    <priority>1.0</priority>')
-    xml.append('  </url>')
-    
-    # States page
-    xml.append('  <url>')
-    xml.append('    <loc>https://skaters.com/locations/states</loc>')
-    xml.append('    <changefreq>weekly</changefreq>')
-    xml.append('    <priority>0.9</priority>')
-    xml.append('  </url>')
-    
-    # Individual state pages
-    for (state,) in states:
-        xml.append('  <url>')
-        xml.append(f'    <loc>https://skaters.com/locations/{state.lower()}</loc>')
-        xml.append('    <changefreq>weekly</changefreq>')
-        xml.append('    <priority>0.8</priority>')
-        xml.append('  </url>')
-    
-    # City pages
-    for city, state in cities:
-        city_slug = city.lower().replace(' ', '-')
-        xml.append('  <url>')
-        xml.append(f'    <loc>https://skaters.com/locations/{state.lower()}/{city_slug}</loc>')
-        xml.append('    <changefreq>weekly</changefreq>')
-        xml.append('    <priority>0.7</priority>')
-        xml.append('  </url>')
-    
-    # SEO-optimized "Near Me" pages
-    near_me_pages = [
-        ('ice-rinks', 0.95),  # Hub page - 110K searches
-        ('near-me', 0.9),  # Main near me landing page
-        ('skate-parks/near-me', 0.9),
-        ('ice-rinks/near-me', 0.9),
-        ('roller-rinks/near-me', 0.9),
-        ('indoor-skate-parks/near-me', 0.85),
-        ('outdoor-skate-parks/near-me', 0.85),
-        ('outdoor-ice-rinks/near-me', 0.85),  # 18K searches
-        ('indoor-ice-rinks/near-me', 0.85),
-    ]
-    for path, priority in near_me_pages:
-        xml.append('  <url>')
-        xml.append(f'    <loc>https://skaters.com/{path}</loc>')
-        xml.append('    <changefreq>weekly</changefreq>')
-        xml.append(f'    <priority>{priority}</priority>')
-        xml.append('  </url>')
-    
-    # Sport-specific city pages (top 20 cities for each sport type)
-    top_cities = db.query(
-        Venue.city,
-        Venue.state,
-        Venue.sport_type,
-        func.count(Venue.id).label('count')
-    ).filter(
-        Venue.status == "ACTIVE"
-    ).group_by(
-        Venue.city,
-        Venue.state,
-        Venue.sport_type
-    ).order_by(
-        func.count(Venue.id).desc()
-    ).limit(100).all()
-    
-    sport_url_map = {
-        SportType.SKATEBOARDING: 'skate-parks',
-        SportType.ICE_SKATING: 'ice-rinks',
-        SportType.ROLLER_SKATING: 'roller-rinks',
-        SportType.INLINE_SKATING: 'inline-skating'
-    }
-    
-    for city, state, sport_type, count in top_cities:
-        city_slug = city.lower().replace(' ', '-')
-        sport_slug = sport_url_map.get(sport_type, 'venues')
-        xml.append('  <url>')
-        xml.append(f'    <loc>https://skaters.com/{sport_slug}/{state.lower()}/{city_slug}</loc>')
-        xml.append('    <changefreq>weekly</changefreq>')
-        xml.append('    <priority>0.85</priority>')
-        xml.append('  </url>')
-    
-    # Venue detail pages
-    for venue in venues:
-        xml.append('  <url>')
-        xml.append(f'    <loc>https://skaters.com/venues/{venue.slug}</loc>')
-        xml.append('    <changefreq>monthly</changefreq>')
-        xml.append('    <priority>0.6</priority>')
-        xml.append('  </url>')
-    
-    xml.append('</urlset>')
-    
-    return Response(content='\n'.join(xml), media_type="application/xml")
+def sitemap_xml(request: Request, db: Session = Depends(get_read_db)):
+    """Sitemap index listing the sharded sitemap files"""
+    stamp = sitemap_stamp(db)
+    headers = validator_headers(stamp.etag("index"), stamp.last_modified, f"public, max-age={SITEMAP_MAX_AGE}")
+    if is_not_modified(request, headers["ETag"], stamp.last_modified):
+        return not_modified(headers)
+
+    return Response(content=render_index(db, stamp), media_type="application/xml", headers=headers)
+
+
+@router.get("/sitemaps/{filename}", response_class=Response)
+def sitemap_file(filename: str, request: Request, db: Session = Depends(get_read_db)):
+    """One sitemap file: pages.xml or <section>-<n>.xml, streamed"""
+    match = SITEMAP_FILE.match(filename)
+    if filename != "pages.xml" and not (match and match.group(1) in SECTIONS):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+
+    stamp = sitemap_stamp(db)
+    headers = validator_headers(stamp.etag(filename), stamp.last_modified, f"public, max-age={SITEMAP_MAX_AGE}")
+    if is_not_modified(request, headers["ETag"], stamp.last_modified):
+        return not_modified(headers)
+
+    if filename == "pages.xml":
+        return Response(content=render_pages(), media_type="application/xml", headers=headers)
+
+    section = SECTIONS[match.group(1)]
+    exists, start = file_start(db, section, int(match.group(2)))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+
+    return StreamingResponse(stream_section(section, start), media_type="application/xml", headers=headers)
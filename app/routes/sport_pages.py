@@ -3,38 +3,35 @@ Sport-specific city pages (SEO-optimized)
 Routes: /skate-parks/{state}/{city}, /ice-rinks/{state}/{city}, etc.
 """
 
-from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from pathlib import Path
-from app.database import get_db
-from app.models.venue import Venue, SportType
+from app.models.venue import SportType
+from app.http_cache import is_not_modified, not_modified, page_validators
+from app.venue_cache import venue_cache, freshness
+from app.templating import templates
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
 @router.get("/skate-parks/{state}/{city}", response_class=HTMLResponse)
-async def city_skate_parks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_skate_parks(request: Request, state: str, city: str):
     """SEO-optimized page for skate parks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.SKATEBOARDING, db)
+    return await _sport_city_page(request, state, city, SportType.SKATEBOARDING)
 
 
 @router.get("/ice-rinks/{state}/{city}", response_class=HTMLResponse)
-async def city_ice_rinks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_ice_rinks(request: Request, state: str, city: str):
     """SEO-optimized page for ice rinks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.ICE_SKATING, db)
+    return await _sport_city_page(request, state, city, SportType.ICE_SKATING)
 
 
 @router.get("/roller-rinks/{state}/{city}", response_class=HTMLResponse)
-async def city_roller_rinks(request: Request, state: str, city: str, db: Session = Depends(get_db)):
+async def city_roller_rinks(request: Request, state: str, city: str):
     """SEO-optimized page for roller rinks in a specific city"""
-    return await _sport_city_page(request, state, city, SportType.ROLLER_SKATING, db)
+    return await _sport_city_page(request, state, city, SportType.ROLLER_SKATING)
 
 
-async def _sport_city_page(request: Request, state: str, city: str, sport_type: SportType, db: Session):
+async def _sport_city_page(request: Request, state: str, city: str, sport_type: SportType):
     """Helper function for sport-specific city pages"""
     
     state_code = state.upper()
@@ -50,21 +47,21 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
     
     sport_info = sport_names.get(sport_type, {"singular": "Venue", "plural": "Venues", "keyword": "venue"})
     
-    # Get all venues of this sport type in this city
-    venues = db.query(Venue)\
-        .options(joinedload(Venue.photos))\
-        .filter(
-            Venue.state == state_code,
-            Venue.city.ilike(city.replace('-', ' ')),
-            Venue.sport_type == sport_type,
-            Venue.status == "ACTIVE"
-        ).order_by(
-            Venue.rating.desc()
-        ).all()
+    # Get all venues of this sport type in this city from the snapshot
+    venues = [
+        venue for venue in (await venue_cache.get_async()).in_city(state_code, city.replace('-', ' '))
+        if venue.sport_type == sport_type
+    ]
     
     if not venues:
         raise HTTPException(status_code=404, detail=f"No {sport_info['plural'].lower()} found in {city_name}, {state_code}")
     
+    # The page has no signed-in nav, so every visitor shares one ETag
+    last_modified, venue_count = freshness(venues)
+    headers = page_validators(request, None, last_modified, sport_type.name, state_code, city, venue_count)
+    if headers and is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
+    
     # Calculate stats
     total_venues = len(venues)
     avg_rating = sum(v.rating for v in venues) / total_venues if total_venues > 0 else 0
@@ -73,17 +70,14 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
     # Process venues
     processed_venues = []
     for venue in venues:
-        photo = next((p for p in venue.photos if p.is_primary), 
-                    venue.photos[0] if venue.photos else None)
-        
         image_url = None
-        if photo:
-            if 'maxwidth=' in photo.url:
-                image_url = photo.url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
-            elif '?' in photo.url:
-                image_url = f"{photo.url}&maxwidth=400"
+        if venue.photo_url:
+            if 'maxwidth=' in venue.photo_url:
+                image_url = venue.photo_url.replace('maxwidth=1600', 'maxwidth=400').replace('maxwidth=800', 'maxwidth=400')
+            elif '?' in venue.photo_url:
+                image_url = f"{venue.photo_url}&maxwidth=400"
             else:
-                image_url = f"{photo.url}?maxwidth=400"
+                image_url = f"{venue.photo_url}?maxwidth=400"
         
         processed_venues.append({
             "name": venue.name,
@@ -134,5 +128,6 @@ async def _sport_city_page(request: Request, state: str, city: str, sport_type:
             "faq_items": faq_items,
             "page_title": page_title,
             "meta_description": meta_description
-        }
+        },
+        headers=headers
     )
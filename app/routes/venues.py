@@ -4,105 +4,62 @@ Venue routes for displaying venue details
 
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from pathlib import Path
-from app.database import get_db
-from app.models.venue import Venue, VenuePhoto, VenueAmenity, VenueHours, VenuePricing, SavedVenue, User
-from app.dependencies import require_auth, get_current_user_optional
+from app.database import get_db, get_async_read_db
+from app.models.venue import Venue, SavedVenue
+from app.dependencies import require_auth, get_current_user_optional_async
+from app.http_cache import is_not_modified, not_modified, page_validators
+from app.user_cache import UserPrincipal
+from app.venue_detail import load_venue_detail, venue_detail_cache
+from app.templating import templates
 from datetime import datetime
 
 router = APIRouter()
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
 @router.get("/{slug}", response_class=HTMLResponse)
-async def venue_detail(request: Request, slug: str, db: Session = Depends(get_db)):
+async def venue_detail(request: Request, slug: str, db: AsyncSession = Depends(get_async_read_db)):
     """Display venue detail page - Server-side rendered for SEO"""
     
-    # Query database for venue
-    venue = db.query(Venue).filter(Venue.slug == slug).first()
+    # Revalidate from updated_at (bumped by photo/amenity/hours/pricing writes too)
+    # before loading the venue and rendering
+    stamp = (await db.execute(select(Venue.id, Venue.updated_at).where(Venue.slug == slug))).first()
     
-    if not venue:
+    if not stamp:
         raise HTTPException(status_code=404, detail="Venue not found")
     
-    # Load relationships
-    photos = db.query(VenuePhoto).filter(VenuePhoto.venue_id == venue.id).order_by(VenuePhoto.is_primary.desc()).all()
-    amenities = db.query(VenueAmenity).filter(VenueAmenity.venue_id == venue.id).all()
-    hours = db.query(VenueHours).filter(VenueHours.venue_id == venue.id).first()
-    pricing = db.query(VenuePricing).filter(VenuePricing.venue_id == venue.id).first()
-    
-    # Process photos - ensure primary photo is first
-    photo_list = []
-    for p in photos:
-        # Ensure the URL has the maxwidth parameter set to 1600 for better quality
-        photo_url = p.url
-        if 'maxwidth=' not in photo_url:
-            if '?' in photo_url:
-                photo_url += '&maxwidth=1600'
-            else:
-                photo_url += '?maxwidth=1600'
-        
-        photo_list.append({
-            "url": photo_url, 
-            "caption": p.caption or f"{venue.name} - {venue.city}, {venue.state}",
-            "is_primary": p.is_primary
-        })
-    
-    # Convert to dict for template
-    venue_data = {
-        "id": venue.id,
-        "name": venue.name,
-        "slug": venue.slug,
-        "sport_type": venue.sport_type.value,
-        "city": venue.city,
-        "state": venue.state,
-        "address": venue.address,
-        "zip_code": venue.zip_code,
-        "latitude": venue.latitude,
-        "longitude": venue.longitude,
-        "rating": venue.rating,
-        "review_count": venue.review_count,
-        "description": venue.description,
-        "phone": venue.phone,
-        "website": venue.website,
-        "year_opened": venue.year_opened,
-        "verified": venue.verified,
-        "amenities": [{"name": a.amenity_name, "available": a.available} for a in amenities],
-        "photos": photo_list,
-        "hours": {
-            "monday": hours.monday if hours else None,
-            "tuesday": hours.tuesday if hours else None,
-            "wednesday": hours.wednesday if hours else None,
-            "thursday": hours.thursday if hours else None,
-            "friday": hours.friday if hours else None,
-            "saturday": hours.saturday if hours else None,
-            "sunday": hours.sunday if hours else None,
-        } if hours else None,
-        "pricing": {
-            "admission": pricing.admission,
-            "rental": pricing.rental,
-        } if pricing and (pricing.admission or pricing.rental) else None
-    }
-    
     # Get current user for navigation
-    current_user = get_current_user_optional(request, db)
+    current_user = await get_current_user_optional_async(request, db)
+    
+    headers = page_validators(request, current_user, stamp.updated_at, stamp.id)
+    if headers and is_not_modified(request, headers["ETag"], stamp.updated_at):
+        return not_modified(headers)
+    
+    # Built views are reused while updated_at matches the stamp
+    venue = venue_detail_cache.get(slug, stamp.updated_at)
+    if venue is None:
+        venue = await load_venue_detail(db, stamp.id)
+        if venue is None:
+            raise HTTPException(status_code=404, detail="Venue not found")
+        venue_detail_cache.put(venue)
     
     return templates.TemplateResponse(
         "venue_detail.html",
         {
             "request": request,
             "user": current_user,
-            "venue": venue_data,
+            "venue": venue,
             "page_title": f"{venue.name} | {venue.city}, {venue.state} | Skaters.com",
             "meta_description": venue.description
-        }
+        },
+        headers=headers
     )
 
 
 @router.get("/", response_class=HTMLResponse)
-async def list_venues(
+def list_venues(
     request: Request,
     sport_type: str = None,
     city: str = None,
@@ -150,9 +107,9 @@ async def list_venues(
 
 
 @router.post("/{venue_id}/save", response_class=JSONResponse)
-async def save_venue(
+def save_venue(
     venue_id: int,
-    current_user: User = Depends(require_auth),
+    current_user: UserPrincipal = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """Save a venue to user's favorites - requires authentication"""
@@ -1,17 +1,26 @@
 """
 Web scraping infrastructure for venue data collection
+
+The scrapers are imported on first use, so importing one submodule
+(e.g. app.scrapers.detailed_importer) does not pull in requests and
+BeautifulSoup for all of them.
 """
 
-from .base import BaseScraper
-from .concrete_disciples import ConcreteDisciplesMockScraper
-from .rinkatlas import RinkAtlasMockScraper
-from .rinktime import RinkTimeMockScraper
-from .traillink import TrailLinkMockScraper
+import importlib
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'BaseScraper': '.base',
+    'ConcreteDisciplesMockScraper': '.concrete_disciples',
+    'RinkAtlasMockScraper': '.rinkatlas',
+    'RinkTimeMockScraper': '.rinktime',
+    'TrailLinkMockScraper': '.traillink',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'BaseScraper',
-    'ConcreteDisciplesMockScraper',
-    'RinkAtlasMockScraper',
-    'RinkTimeMockScraper',
-    'TrailLinkMockScraper'
-]
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,123 @@
+"""
+Append-only checkpoint log for bulk scrapes
+
+Every result page of a search, every place-details response and every
+finished (imported) city is appended to a JSONL file as soon as it
+arrives, so each write costs only the new data and a crashed run resumes
+at the next unfetched page or place instead of redoing whole cities.
+
+Record kinds:
+    {"kind": "page", "search": [city, state, sport], "token": ..., "next": ..., "places": [...]}
+    {"kind": "details", "place_id": ..., "details": {...}}
+    {"kind": "city", "city": ..., "state": ..., "venues": [...]}
+
+A page with no token is the first page of a search and restarts it.
+
+A run that finishes every city archives its log (renamed with a
+timestamp suffix), so only an interrupted run is resumed and the next
+scrape fetches fresh data.
+"""
+
+import glob
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = os.getenv('SCRAPE_CHECKPOINT_FILE', 'google_maps_checkpoint.jsonl')
+
+
+class ScrapeCheckpoint:
+    """Replays the log on open, then appends to it"""
+
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.path = path
+        # (city, state, sport) -> [places so far, next page token]
+        self.searches: Dict[Tuple[str, str, str], list] = {}
+        self.place_details: Dict[str, Dict] = {}
+        self.cities: Dict[Tuple[str, str], List[Dict]] = {}
+        self.records = 0
+        torn = False
+        if os.path.exists(path):
+            torn = self._replay()
+        self._file = open(path, 'a', encoding='utf-8')
+        if torn:
+            # Keep the next record off the torn line
+            self._file.write('\n')
+
+    def _replay(self) -> bool:
+        """Load the log; returns whether it ends in a torn (unterminated) line"""
+        line = '\n'
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line torn by a crash mid-write; everything before it is intact
+                    logger.warning(f"Ignoring unreadable checkpoint line in {self.path}")
+                    continue
+                self._apply(record)
+                self.records += 1
+        return not line.endswith('\n')
+
+    def _apply(self, record: Dict) -> None:
+        kind = record['kind']
+        if kind == 'page':
+            key = tuple(record['search'])
+            if record['token'] is None or key not in self.searches:
+                self.searches[key] = [[], None]
+            progress = self.searches[key]
+            progress[0].extend(record['places'])
+            progress[1] = record['next']
+        elif kind == 'details':
+            self.place_details[record['place_id']] = record['details']
+        elif kind == 'city':
+            self.cities[(record['city'], record['state'])] = record['venues']
+
+    def _append(self, record: Dict) -> None:
+        self._apply(record)
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self.records += 1
+
+    def search(self, city: str, state: str, sport: str) -> Optional[Tuple[List[Dict], Optional[str]]]:
+        """(places fetched so far, next page token or None when complete), or None if never started"""
+        progress = self.searches.get((city, state, sport))
+        return (list(progress[0]), progress[1]) if progress else None
+
+    def record_page(self, city: str, state: str, sport: str, token: Optional[str], next_token: Optional[str], places: List[Dict]) -> None:
+        self._append({'kind': 'page', 'search': [city, state, sport], 'token': token, 'next': next_token, 'places': places})
+
+    def details(self, place_id: str) -> Optional[Dict]:
+        return self.place_details.get(place_id)
+
+    def record_details(self, place_id: str, details: Dict) -> None:
+        self._append({'kind': 'details', 'place_id': place_id, 'details': details})
+
+    def record_city(self, city: str, state: str, venues: List[Dict]) -> None:
+        """Mark a city as scraped and imported"""
+        self._append({'kind': 'city', 'city': city, 'state': state, 'venues': venues})
+
+    def archive(self) -> str:
+        """Close the log and move it aside so the next run starts fresh; returns the archived path"""
+        self.close()
+        archived = f"{self.path}.{datetime.utcnow():%Y%m%d-%H%M%S.%f}"
+        os.replace(self.path, archived)
+        return archived
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ScrapeCheckpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def archived_checkpoints(path: str = CHECKPOINT_FILE) -> List[str]:
+    """Logs of finished runs, oldest first"""
+    return sorted(glob.glob(glob.escape(path) + '.*'))
@@ -1,15 +1,34 @@
 """
 Enhanced importer to save RICH venue data to the database.
+
+import_detailed_venue adds one venue through the ORM. import_detailed_venues
+is the set-based path for scraper output: existing place ids, slugs and
+content hashes are read once, then each chunk of venues is written in one
+transaction with a multi-row INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+and executemany statements for photos, hours, pricing and grid cells,
+followed by one rollup recompute.
 """
 
 import sys
+import json
+import time
+import hashlib
 import logging
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.database import SessionLocal
-from app.models.venue import Venue, VenuePhoto, VenueAmenity, VenueHours, VenuePricing, SportType, VenueStatus
+from sqlalchemy import case, inspect, select
+from sqlalchemy.engine import Row
+
+from app.database import SessionLocal, engine, upsert
+from app.geo import encode_geohash
+from app.models.rollup import StateRollup, recompute_rollups
+from app.models.venue import Venue, VenuePhoto, VenueAmenity, VenueHours, VenuePricing, VenueGeoCell, SportType, VenueStatus
+from app.venue_events import notify_venues_changed
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
@@ -50,6 +69,7 @@ def import_detailed_venue(venue_data: dict, db: SessionLocal):
         rating=venue_data.get('rating', 0.0),
         review_count=venue_data.get('review_count', 0),
         google_place_id=venue_data.get('google_place_id'),
+        content_hash=venue_content_hash(venue_data),
         verified=True, # Data from Google is considered verified
         status=VenueStatus.ACTIVE,
         created_at=datetime.utcnow(),
@@ -93,3 +113,254 @@ def import_detailed_venue(venue_data: dict, db: SessionLocal):
 
     logger.info(f"✅ Imported: {venue.name} ({venue.city}, {venue.state}) with full details.")
     return venue
+
+
+# Venues written per transaction by import_detailed_venues
+IMPORT_CHUNK_SIZE = 1000
+
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Scraped fields that make up a venue's content hash
+HASHED_FIELDS = (
+    'name', 'sport_type', 'address', 'city', 'state', 'zip_code', 'latitude', 'longitude',
+    'phone', 'website', 'rating', 'review_count', 'photos', 'opening_hours',
+)
+
+# What a refresh overwrites on an existing venue; slug, description, status
+# and the like belong to the site once the venue exists
+REFRESHED_COLUMNS = (
+    'name', 'sport_type', 'address', 'city', 'state', 'zip_code', 'latitude', 'longitude',
+    'phone', 'website', 'rating', 'review_count', 'google_place_id', 'content_hash', 'updated_at',
+)
+
+
+def _unless_site_rated(column: str):
+    """Upsert value for `column`: the stored one once the venue has approved site reviews (see app.ratings)"""
+    venues = Venue.__table__
+    return lambda excluded: case((venues.c.rating_count > 0, venues.c[column]), else_=excluded[column])
+
+
+SITE_RATING_UPDATES = {column: _unless_site_rated(column) for column in ('rating', 'review_count')}
+
+
+@dataclass
+class ImportStats:
+    imported: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        total = self.imported + self.updated + self.unchanged + self.skipped + self.failed
+        return total / self.seconds if self.seconds else 0.0
+
+
+def venue_content_hash(venue_data: dict) -> str:
+    """Stable hash of the scraped fields, stored in Venue.content_hash"""
+    content = {field: venue_data.get(field) for field in HASHED_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _venue_row(venue_data: dict, now: datetime) -> dict:
+    """Column values for a scraped venue (same defaults as import_detailed_venue)"""
+    return {
+        'name': venue_data.get('name', 'Unknown Venue'),
+        'slug': venue_data.get('slug'),
+        'sport_type': SportType(venue_data['sport_type']),
+        'address': venue_data.get('address'),
+        'city': venue_data.get('city'),
+        'state': venue_data.get('state'),
+        'zip_code': venue_data.get('zip_code'),
+        'country': 'US',
+        'latitude': venue_data.get('latitude'),
+        'longitude': venue_data.get('longitude'),
+        'phone': venue_data.get('phone'),
+        'website': venue_data.get('website'),
+        'description': venue_data.get('description') or '',
+        'rating': venue_data.get('rating', 0.0),
+        'review_count': venue_data.get('review_count', 0),
+        'google_place_id': venue_data.get('google_place_id'),
+        'content_hash': venue_content_hash(venue_data),
+        'verified': True,
+        'status': VenueStatus.ACTIVE,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def _hours_row(venue_id: int, opening_hours: List[str]) -> dict:
+    hours_data = {}
+    for line in opening_hours:
+        day, _, value = line.partition(': ')
+        hours_data[day.lower()] = value
+    return {'venue_id': venue_id, **{day: hours_data.get(day) for day in DAYS}}
+
+
+@dataclass
+class _Pending:
+    """A scraped venue to write, and the existing venue it refreshes (if any)"""
+    venue_data: dict
+    existing: Optional[Row] = None
+
+    @property
+    def by_place_id(self) -> bool:
+        # Conflict target: place id, unless it is missing or the match was on slug
+        place_id = self.venue_data.get('google_place_id')
+        return bool(place_id) and (self.existing is None or self.existing.google_place_id == place_id)
+
+
+def _import_chunk(connection, chunk: List[_Pending]) -> Dict[int, _Pending]:
+    """
+    Upsert one chunk of venues and their details.
+
+    Returns the written venues by id; an existing venue whose stored
+    content hash already matches is left alone and not returned.
+    """
+    now = datetime.utcnow()
+    venue_table = Venue.__table__
+    written = {}
+    for by_place_id in (True, False):
+        group = [pending for pending in chunk if pending.by_place_id == by_place_id]
+        if not group:
+            continue
+        key = 'google_place_id' if by_place_id else 'slug'
+        # One multi-row INSERT ... ON CONFLICT DO UPDATE per conflict target
+        rows = upsert(
+            connection, venue_table, [_venue_row(pending.venue_data, now) for pending in group], [key],
+            update_columns=REFRESHED_COLUMNS, update_expressions=SITE_RATING_UPDATES, changed_column='content_hash',
+            returning=(venue_table.c.id, venue_table.c[key])
+        )
+        by_key = {pending.venue_data.get(key): pending for pending in group}
+        for venue_id, value in rows:
+            written[venue_id] = by_key[value]
+
+    # Photos already on refreshed venues (including user uploads) are kept
+    refreshed = [venue_id for venue_id, pending in written.items() if pending.existing is not None]
+    photo_urls = defaultdict(set)
+    if refreshed:
+        for venue_id, url in connection.execute(
+            select(VenuePhoto.venue_id, VenuePhoto.url).where(VenuePhoto.venue_id.in_(refreshed))
+        ):
+            photo_urls[venue_id].add(url)
+
+    photos, hours, pricing, cells = [], [], [], []
+    groups = set()
+    for venue_id, pending in written.items():
+        venue_data = pending.venue_data
+        name = venue_data.get('name', 'Unknown Venue')
+        known_urls = photo_urls[venue_id]
+        for i, photo_url in enumerate(venue_data.get('photos') or []):
+            if photo_url in known_urls:
+                continue
+            photos.append({
+                'venue_id': venue_id,
+                'url': photo_url,
+                'caption': f"{name} photo {i+1}",
+                'is_primary': i == 0 and not known_urls,
+                'approved': True,
+            })
+        if venue_data.get('opening_hours'):
+            hours.append(_hours_row(venue_id, venue_data['opening_hours']))
+        if pending.existing is None:
+            pricing.append({'venue_id': venue_id, 'admission': "Varies", 'rental': "Varies"})
+        else:
+            groups.add((pending.existing.state, pending.existing.city))
+        if venue_data.get('latitude') is not None and venue_data.get('longitude') is not None:
+            cells.append({'venue_id': venue_id, 'cell': encode_geohash(venue_data['latitude'], venue_data['longitude'])})
+        groups.add((venue_data.get('state'), venue_data.get('city')))
+
+    if photos:
+        connection.execute(VenuePhoto.__table__.insert(), photos)
+    if pricing:
+        connection.execute(VenuePricing.__table__.insert(), pricing)
+    if hours:
+        upsert(connection, VenueHours.__table__, hours, ['venue_id'])
+    if cells:
+        upsert(connection, VenueGeoCell.__table__, cells, ['venue_id'])
+
+    # Core statements skip the session hooks that maintain the rollups
+    if groups and inspect(connection).has_table(StateRollup.__tablename__):
+        recompute_rollups(connection, groups)
+    return written
+
+
+def import_detailed_venues(venues: Iterable[dict], chunk_size: int = IMPORT_CHUNK_SIZE, refresh: bool = False) -> ImportStats:
+    """
+    Import many scraped venues with set-based statements.
+
+    Existing venues are matched on google_place_id, falling back to slug.
+    By default they are skipped; with `refresh` the ones whose content hash
+    changed are updated in place (unchanged ones cost nothing beyond the
+    initial read). Repeats inside `venues` and invalid sport types are
+    skipped. Each chunk is its own transaction; a chunk that fails is
+    rolled back, logged and counted in `failed` without stopping the import.
+    """
+    stats = ImportStats()
+    started = time.perf_counter()
+
+    with engine.connect() as connection:
+        existing = connection.execute(
+            select(Venue.id, Venue.google_place_id, Venue.slug, Venue.content_hash, Venue.state, Venue.city)
+        ).all()
+    by_place_id = {row.google_place_id: row for row in existing if row.google_place_id}
+    by_slug = {row.slug: row for row in existing}
+
+    pending = []
+    seen_place_ids, seen_slugs = set(), set()
+    for venue_data in venues:
+        place_id = venue_data.get('google_place_id')
+        slug = venue_data.get('slug')
+        if (place_id and place_id in seen_place_ids) or (slug and slug in seen_slugs):
+            stats.skipped += 1
+            continue
+        try:
+            SportType(venue_data['sport_type'])
+        except ValueError:
+            logger.error(f"Invalid sport type: {venue_data['sport_type']}")
+            stats.skipped += 1
+            continue
+
+        match = by_place_id.get(place_id) if place_id else None
+        if match is None and slug in by_slug:
+            match = by_slug[slug]
+            if place_id and match.google_place_id:
+                # The slug belongs to a different place
+                logger.warning(f"Slug {slug} is taken by another place - skipping {venue_data.get('name')}")
+                stats.skipped += 1
+                continue
+
+        if place_id:
+            seen_place_ids.add(place_id)
+        if slug:
+            seen_slugs.add(slug)
+        if match is not None:
+            if not refresh:
+                stats.skipped += 1
+                continue
+            if match.content_hash == venue_content_hash(venue_data):
+                stats.unchanged += 1
+                continue
+        pending.append(_Pending(venue_data, match))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            with engine.begin() as connection:
+                written = _import_chunk(connection, chunk)
+        except Exception as e:
+            logger.error(f"Import chunk of {len(chunk)} venues failed: {e}")
+            stats.failed += len(chunk)
+            continue
+        notify_venues_changed(written)
+        created = sum(1 for item in written.values() if item.existing is None)
+        stats.imported += created
+        stats.updated += len(written) - created
+        # Changed by someone else since the initial read
+        stats.unchanged += len(chunk) - len(written)
+        logger.info(f"✅ Imported {stats.imported}, updated {stats.updated} of {len(pending)} venues")
+
+    stats.seconds = time.perf_counter() - started
+    return stats
@@ -16,13 +16,21 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.scrapers.google_maps_scraper import GoogleMapsVenueScraper
-from app.database import SessionLocal, init_db
-from app.scrapers.detailed_importer import import_detailed_venue
-from slugify import slugify
+from app.database import init_db
+from app.scrapers.detailed_importer import import_detailed_venues
+from app.scrapers.checkpoint import ScrapeCheckpoint, archived_checkpoints
+from app.scrapers.places_client import AsyncPlacesClient, PLACES_QPS, scrape_city
+from app.scrapers.response_cache import open_places_cache
+import asyncio
 import json
 import time
 
+# Cities scraped at the same time (requests still share one rate limit)
+CITY_CONCURRENCY = int(os.getenv('SCRAPE_CITY_CONCURRENCY', '4'))
+
+# All scraped venues, written once at the end of a run (scripts/run_importer.py reads it)
+PROGRESS_FILE = 'google_maps_venues.json'
+
 # Top 100 US cities for comprehensive coverage
 TOP_CITIES = [
     # Major metros
@@ -75,110 +83,92 @@ def scrape_all_venues(api_key: str, max_cities: int = 100):
     print(f"\nScraping {max_cities} cities for all venue types...")
     print(f"Estimated venues: {max_cities * 50}+")
     print(f"Estimated cost: ${max_cities * 0.50:.2f} - ${max_cities * 1.00:.2f}")
-    print("\nThis will take approximately 30-60 minutes.")
+    print(f"\n{CITY_CONCURRENCY} cities at a time, at most {PLACES_QPS:g} requests/sec.")
     print("=" * 80)
     
-    scraper = GoogleMapsVenueScraper(api_key)
-    all_venues = []
-    completed_cities = set()
-
-    # --- Make the scraper resumable ---
-    progress_file = 'google_maps_venues.json'
-    if os.path.exists(progress_file):
-        print(f"\nFound existing progress file: {progress_file}")
-        with open(progress_file, 'r') as f:
-            all_venues = json.load(f)
-        for venue in all_venues:
-            completed_cities.add((venue.get('city'), venue.get('state')))
-        print(f"Identified {len(completed_cities)} previously scraped cities. They will be skipped.")
-    # ---------------------------------
-    
     cities_to_scrape = TOP_CITIES[:max_cities]
+    started = time.perf_counter()
+    
+    with ScrapeCheckpoint() as checkpoint:
+        # --- Make the scraper resumable ---
+        if checkpoint.records:
+            print(f"\nResuming from checkpoint: {checkpoint.path}")
+            print(f"{len(checkpoint.cities)} cities done, {len(checkpoint.place_details)} places fetched. They will be skipped.")
+        elif os.path.exists(PROGRESS_FILE) and not archived_checkpoints(checkpoint.path):
+            # Progress saved by older versions: every city in it counts as done.
+            # Once a checkpointed run has finished, the file is just its output.
+            print(f"\nFound existing progress file: {PROGRESS_FILE}")
+            with open(PROGRESS_FILE, 'r') as f:
+                saved_cities = {}
+                for venue in json.load(f):
+                    saved_cities.setdefault((venue.get('city'), venue.get('state')), []).append(venue)
+            for (city, state), venues in saved_cities.items():
+                checkpoint.record_city(city, state, venues)
+            print(f"Identified {len(saved_cities)} previously scraped cities. They will be skipped.")
+        # ---------------------------------
+        
+        all_venues = [venue for venues in checkpoint.cities.values() for venue in venues]
+        asyncio.run(_scrape_cities(api_key, cities_to_scrape, checkpoint, all_venues))
+        
+        # Only an interrupted run resumes; a finished one must not make the next scrape a no-op
+        failed = [city for city, state in cities_to_scrape if (city, state) not in checkpoint.cities]
+        if failed:
+            print(f"\n⚠️  {len(failed)} cities failed ({', '.join(failed)}). Run again to retry them.")
+        else:
+            print(f"\n📦 All cities done, checkpoint archived to {checkpoint.archive()}")
+    
+    print(f"\n⏱️  Scraped {len(cities_to_scrape)} cities in {time.perf_counter() - started:.1f}s")
     
-    for i, (city, state) in enumerate(cities_to_scrape, 1):
-        if (city, state) in completed_cities:
-            print(f"\n[{i}/{len(cities_to_scrape)}] Skipping {city}, {state} (already scraped)..." )
-            continue
+    return all_venues
 
-        print(f"\n[{i}/{len(cities_to_scrape)}] Scraping {city}, {state}...")
 
-        city_venues = []
-        try:
-            # Skateparks
-            print(f"  🛹 Skateparks...", end=" ")
-            skateparks = scraper.search_skateparks(city, state)
-            print(f"{len(skateparks)} found")
-            for venue in skateparks:
-                details = scraper.get_place_details(venue.get('google_place_id'))
-                venue.update({
-                    'website': details.get('website'),
-                    'phone': details.get('formatted_phone_number'),
-                    'opening_hours': details.get('opening_hours', {}).get('weekday_text', []),
-                    'photos': [
-                        f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=1600&photoreference={p.get('photo_reference')}&key={api_key}"
-                        for p in details.get('photos', [])
-                    ],
-                    'slug': slugify(f"{venue.get('name')} {venue.get('city')} {venue.get('state')}")
-                })
-                city_venues.append(venue)
-                time.sleep(0.05)
-            time.sleep(1)
+async def _scrape_cities(api_key: str, cities: list, checkpoint: ScrapeCheckpoint, all_venues: list):
+    """Scrape up to CITY_CONCURRENCY cities at once; imports happen one city at a time"""
+    city_slots = asyncio.Semaphore(CITY_CONCURRENCY)
+    import_lock = asyncio.Lock()
 
-            # Ice rinks
-            print(f"  ⛸️  Ice rinks...", end=" ")
-            ice_rinks = scraper.search_ice_rinks(city, state)
-            print(f"{len(ice_rinks)} found")
-            for venue in ice_rinks:
-                details = scraper.get_place_details(venue.get('google_place_id'))
-                venue.update({
-                    'website': details.get('website'),
-                    'phone': details.get('formatted_phone_number'),
-                    'opening_hours': details.get('opening_hours', {}).get('weekday_text', []),
-                    'photos': [
-                        f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=1600&photoreference={p.get('photo_reference')}&key={api_key}"
-                        for p in details.get('photos', [])
-                    ],
-                    'slug': slugify(f"{venue.get('name')} {venue.get('city')} {venue.get('state')}")
-                })
-                city_venues.append(venue)
-                time.sleep(0.05)
-            time.sleep(1)
+    async def scrape_one(i, city, state):
+        if (city, state) in checkpoint.cities:
+            print(f"\n[{i}/{len(cities)}] Skipping {city}, {state} (already scraped)...")
+            return
 
-            # Roller rinks
-            print(f"  🛼 Roller rinks...", end=" ")
-            roller_rinks = scraper.search_roller_rinks(city, state)
-            print(f"{len(roller_rinks)} found")
-            for venue in roller_rinks:
-                details = scraper.get_place_details(venue.get('google_place_id'))
-                venue.update({
-                    'website': details.get('website'),
-                    'phone': details.get('formatted_phone_number'),
-                    'opening_hours': details.get('opening_hours', {}).get('weekday_text', []),
-                    'photos': [
-                        f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=1600&photoreference={p.get('photo_reference')}&key={api_key}"
-                        for p in details.get('photos', [])
-                    ],
-                    'slug': slugify(f"{venue.get('name')} {venue.get('city')} {venue.get('state')}")
-                })
-                city_venues.append(venue)
-                time.sleep(0.05)
-            time.sleep(1)
+        async with city_slots:
+            counts = {}
+            try:
+                city_venues = await scrape_city(client, city, state, counts, checkpoint=checkpoint)
+            except Exception as e:
+                print(f"  ❌ Error scraping {city}: {e}")
+                return
 
-            print(f"  ✅ Found {len(city_venues)} total new venues for {city}.")
+        print(
+            f"\n[{i}/{len(cities)}] {city}, {state}: "
+            f"🛹 {counts.get('skateboarding', 0)} skateparks, "
+            f"⛸️  {counts.get('ice_skating', 0)} ice rinks, "
+            f"🛼 {counts.get('roller_skating', 0)} roller rinks"
+        )
 
-            # --- Save data for the current city ---
+        # --- Import the current city, then mark it done ---
+        async with import_lock:
             if city_venues:
                 print(f"  💾 Importing {len(city_venues)} new venues to database...")
-                import_to_database(city_venues)
-                all_venues.extend(city_venues)
-                save_progress(all_venues, progress_file) # Overwrite with the full list each time
-            # -------------------------------------
+                try:
+                    await asyncio.to_thread(import_to_database, city_venues)
+                except Exception as e:
+                    print(f"  ❌ Error importing {city}: {e}")
+                    return
+            checkpoint.record_city(city, state, city_venues)
+            all_venues.extend(city_venues)
+        # -------------------------------------
 
-        except Exception as e:
-            print(f"  ❌ Error scraping {city}: {e}")
-            continue
-    
-    return all_venues
+    cache = open_places_cache()
+    try:
+        async with AsyncPlacesClient(api_key, cache=cache) as client:
+            await asyncio.gather(*(scrape_one(i, city, state) for i, (city, state) in enumerate(cities, 1)))
+            print(f"\n🌐 {client.requests} API requests ({client.retries} retried)")
+    finally:
+        if cache is not None:
+            print(f"🗄️  Details cache: {cache.hits} hits, {cache.revalidated} revalidated, {cache.misses} misses")
+            cache.close()
 
 
 def save_progress(venues: list, filename: str):
@@ -187,41 +177,25 @@ def save_progress(venues: list, filename: str):
         json.dump(venues, f, indent=2)
 
 
-def import_to_database(venues: list):
-    """Import scraped venues to database"""
+def import_to_database(venues: list, refresh: bool = False):
+    """Import scraped venues to database (refresh=True also updates changed venues)"""
     print("\n" + "=" * 80)
     print("IMPORTING TO DATABASE")
     print("=" * 80)
     
     init_db()
-    db = SessionLocal()
+    stats = import_detailed_venues(venues, refresh=refresh)
     
-    imported = 0
-    skipped = 0
-    
-    try:
-        for venue in venues:
-            if import_detailed_venue(venue, db):
-                imported += 1
-            else:
-                skipped += 1
-            
-            if (imported + skipped) % 100 == 0:
-                db.commit()
-                print(f"Progress: {imported} imported, {skipped} skipped")
-        
-        db.commit()
-        
-        print(f"\n✅ Import complete!")
-        print(f"   Imported: {imported}")
-        print(f"   Skipped (duplicates): {skipped}")
-        print(f"   Total: {imported + skipped}")
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    print(f"\n✅ Import complete!")
+    print(f"   Imported: {stats.imported}")
+    if refresh:
+        print(f"   Updated: {stats.updated}")
+        print(f"   Unchanged: {stats.unchanged}")
+    print(f"   Skipped (duplicates): {stats.skipped}")
+    if stats.failed:
+        print(f"   Failed: {stats.failed}")
+    print(f"   Total: {stats.imported + stats.updated + stats.unchanged + stats.skipped + stats.failed}")
+    print(f"   Rate: {stats.rows_per_second:.0f} venues/sec")
 
 
 def main():
@@ -269,7 +243,7 @@ def main():
     venues = scrape_all_venues(api_key, num_cities)
     
     # Save results
-    output_file = 'google_maps_venues.json'
+    output_file = PROGRESS_FILE
     save_progress(venues, output_file)
     
     print(f"\n💾 Saved {len(venues)} venues to: {output_file}")
@@ -13,24 +13,82 @@ Cost: $5 per 1,000 requests after free tier
 """
 
 import os
+import sys
 import requests
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional
 import logging
 import time
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.scrapers.response_cache import ResponseCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Overridable so scrapers can be pointed at a local stub server
+PLACES_BASE_URL = os.getenv('GOOGLE_PLACES_BASE_URL', "https://maps.googleapis.com/maps/api/place")
+
+DETAILS_FIELDS = 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,rating,user_ratings_total'
+
+VENUE_TYPES = {
+    'skateboarding': 'skatepark',
+    'ice_skating': 'ice_rink',
+    'roller_skating': 'roller_rink',
+    'inline_skating': 'trail'
+}
+
+
+def parse_place(place: Dict, sport_type: str) -> Dict:
+    """Parse a Google Place search result into our venue format"""
+    
+    # Extract address components
+    address_parts = place.get('formatted_address', '').split(', ')
+    
+    city = ''
+    state = ''
+    zip_code = ''
+    
+    if len(address_parts) >= 3:
+        city = address_parts[-3]
+        state_zip = address_parts[-2].split(' ')
+        if len(state_zip) >= 1:
+            state = state_zip[0]
+        if len(state_zip) >= 2:
+            zip_code = state_zip[1]
+    
+    # Get location
+    location = place.get('geometry', {}).get('location', {})
+    
+    return {
+        'name': place.get('name', 'Unknown'),
+        'sport_type': sport_type,
+        'venue_type': VENUE_TYPES.get(sport_type, 'venue'),
+        'address': place.get('formatted_address', ''),
+        'city': city,
+        'state': state,
+        'zip_code': zip_code,
+        'country': 'US',
+        'latitude': location.get('lat'),
+        'longitude': location.get('lng'),
+        'rating': place.get('rating', 0.0),
+        'review_count': place.get('user_ratings_total', 0),
+        'google_place_id': place.get('place_id'),
+        'description': f"{place.get('name')} - {place.get('formatted_address')}",
+    }
+
 
 class GoogleMapsVenueScraper:
     """Scrape real venue data from Google Maps Places API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache: Optional[ResponseCache] = None):
         self.api_key = api_key or os.getenv('GOOGLE_MAPS_API_KEY')
+        self.cache = cache
         if not self.api_key:
             raise ValueError("Google Maps API key required. Set GOOGLE_MAPS_API_KEY in .env")
         
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
+        self.base_url = PLACES_BASE_URL
         self.venues = []
     
     def search_skateparks(self, city: str, state: str, radius: int = 50000) -> List[Dict]:
@@ -124,66 +182,37 @@ class GoogleMapsVenueScraper:
     
     def _parse_place(self, place: Dict, sport_type: str) -> Dict:
         """Parse Google Place into our venue format"""
-        
-        # Extract address components
-        address_parts = place.get('formatted_address', '').split(', ')
-        
-        city = ''
-        state = ''
-        zip_code = ''
-        
-        if len(address_parts) >= 3:
-            city = address_parts[-3]
-            state_zip = address_parts[-2].split(' ')
-            if len(state_zip) >= 1:
-                state = state_zip[0]
-            if len(state_zip) >= 2:
-                zip_code = state_zip[1]
-        
-        # Get location
-        location = place.get('geometry', {}).get('location', {})
-        
-        return {
-            'name': place.get('name', 'Unknown'),
-            'sport_type': sport_type,
-            'venue_type': self._get_venue_type(sport_type),
-            'address': place.get('formatted_address', ''),
-            'city': city,
-            'state': state,
-            'zip_code': zip_code,
-            'country': 'US',
-            'latitude': location.get('lat'),
-            'longitude': location.get('lng'),
-            'rating': place.get('rating', 0.0),
-            'review_count': place.get('user_ratings_total', 0),
-            'google_place_id': place.get('place_id'),
-            'description': f"{place.get('name')} - {place.get('formatted_address')}",
-        }
+        return parse_place(place, sport_type)
     
     def _get_venue_type(self, sport_type: str) -> str:
         """Map sport type to venue type"""
-        mapping = {
-            'skateboarding': 'skatepark',
-            'ice_skating': 'ice_rink',
-            'roller_skating': 'roller_rink',
-            'inline_skating': 'trail'
-        }
-        return mapping.get(sport_type, 'venue')
+        return VENUE_TYPES.get(sport_type, 'venue')
     
     def get_place_details(self, place_id: str) -> Dict:
-        """Get detailed information about a place"""
+        """Get detailed information about a place (from the response cache when fresh)"""
         url = f"{self.base_url}/details/json"
         params = {
             'place_id': place_id,
-            'fields': 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,rating,user_ratings_total',
-            'key': self.api_key
+            'fields': DETAILS_FIELDS,
         }
+        cached = self.cache.get('details', params) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            return cached.body.get('result', {})
         
         try:
-            response = requests.get(url, params=params)
+            response = requests.get(
+                url,
+                params={**params, 'key': self.api_key},
+                headers=cached.conditional_headers() if cached else None
+            )
+            if response.status_code == 304:
+                self.cache.mark_revalidated('details', params)
+                return cached.body.get('result', {})
             data = response.json()
             
             if data['status'] == 'OK':
+                if self.cache is not None:
+                    self.cache.put('details', params, data, response.headers)
                 return data.get('result', {})
             
         except Exception as e:
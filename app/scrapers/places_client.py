@@ -0,0 +1,304 @@
+"""
+Async Google Places client for bulk scraping
+
+One pooled httpx.AsyncClient shared by every request, a token bucket that
+keeps the whole run under the API quota, a cap on requests in flight, and
+retries with jittered exponential backoff for 429/5xx responses, transport
+errors and OVER_QUERY_LIMIT. Place details can be served from (and
+revalidated against) an on-disk ResponseCache. Point GOOGLE_PLACES_BASE_URL
+at a local stub server (scripts/bench_places.py --serve) to run it without
+an API key.
+
+Create the client inside the running event loop:
+
+    async with AsyncPlacesClient(api_key) as client:
+        venues = await scrape_city(client, 'Austin', 'TX')
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from slugify import slugify
+
+from app.scrapers.checkpoint import ScrapeCheckpoint
+from app.scrapers.google_maps_scraper import DETAILS_FIELDS, PLACES_BASE_URL, parse_place
+from app.scrapers.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Requests per second across the whole run (the Places API quota)
+PLACES_QPS = float(os.getenv('GOOGLE_PLACES_QPS', '50'))
+# Requests in flight at once, shared by all cities
+PLACES_CONCURRENCY = int(os.getenv('GOOGLE_PLACES_CONCURRENCY', '8'))
+# Detail requests in flight at once for a single city
+PLACES_CITY_CONCURRENCY = int(os.getenv('GOOGLE_PLACES_CITY_CONCURRENCY', '4'))
+# Retries per request before giving up on it
+PLACES_MAX_RETRIES = int(os.getenv('GOOGLE_PLACES_MAX_RETRIES', '4'))
+# A next_page_token only becomes valid a couple of seconds after it is issued
+PAGE_TOKEN_DELAY = float(os.getenv('GOOGLE_PLACES_PAGE_TOKEN_DELAY', '2'))
+
+PHOTO_URL = "https://maps.googleapis.com/maps/api/place/photo"
+
+# The searches run for every city: (query prefix, sport type)
+CITY_SEARCHES = (
+    ('skatepark', 'skateboarding'),
+    ('ice skating rink', 'ice_skating'),
+    ('roller skating rink', 'roller_skating'),
+)
+
+RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRY_API_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+
+
+class PlacesError(Exception):
+    """A Places request that still failed after all retries"""
+
+
+class _Retryable(Exception):
+    pass
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncPlacesClient:
+    """Rate-limited, retrying Places API client (text search and details)"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = PLACES_BASE_URL,
+        qps: float = PLACES_QPS,
+        concurrency: int = PLACES_CONCURRENCY,
+        max_retries: int = PLACES_MAX_RETRIES,
+        page_token_delay: float = PAGE_TOKEN_DELAY,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.api_key = api_key
+        self.cache = cache
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.page_token_delay = page_token_delay
+        self.backoff = backoff
+        self.bucket = TokenBucket(qps, burst=concurrency)
+        self.slots = asyncio.Semaphore(concurrency)
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        )
+        self.requests = 0
+        self.retries = 0
+
+    async def __aenter__(self) -> "AsyncPlacesClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.http.aclose()
+
+    async def _get(self, endpoint: str, params: Dict, retry_statuses=(), headers: Optional[Dict] = None) -> Optional[httpx.Response]:
+        """
+        GET {base_url}/{endpoint}/json, retrying transient failures.
+
+        Returns the response (its JSON already checked), or None for a 304
+        answer to conditional `headers`.
+        """
+        url = f"{self.base_url}/{endpoint}/json"
+        params = {**params, 'key': self.api_key}
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.slots:
+                    await self.bucket.acquire()
+                    self.requests += 1
+                    response = await self.http.get(url, params=params, headers=headers)
+                if response.status_code == 304:
+                    return None
+                if response.status_code in RETRY_HTTP_STATUSES:
+                    raise _Retryable(f"HTTP {response.status_code}")
+                response.raise_for_status()
+                data = response.json()
+                if data.get('status') in RETRY_API_STATUSES or data.get('status') in retry_statuses:
+                    raise _Retryable(data['status'])
+                return response
+            except (_Retryable, httpx.TransportError) as e:
+                if attempt == self.max_retries:
+                    raise PlacesError(f"{endpoint}: {e!r} after {attempt + 1} attempts")
+                self.retries += 1
+                # Full jitter keeps retrying workers from moving in lockstep
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def search_places(
+        self,
+        query: str,
+        sport_type: str,
+        page_token: Optional[str] = None,
+        on_page: Optional[Callable[[Optional[str], Optional[str], List[Dict]], None]] = None
+    ) -> List[Dict]:
+        """
+        Text search with every result page, parsed into venue dicts.
+
+        Starts from `page_token` when given (resuming a search), and calls
+        on_page(token, next_token, venues) as each page arrives. On failure
+        the venues of the pages fetched so far are returned.
+        """
+        venues = []
+        try:
+            if page_token is None:
+                data = (await self._get('textsearch', {'query': query})).json()
+                if data['status'] not in ('OK', 'ZERO_RESULTS'):
+                    logger.warning(f"API returned status: {data['status']}")
+                    return []
+            else:
+                # INVALID_REQUEST here means the token is not valid yet
+                data = (await self._get('textsearch', {'pagetoken': page_token}, retry_statuses={'INVALID_REQUEST'})).json()
+
+            while True:
+                page = [parse_place(place, sport_type) for place in data.get('results', [])]
+                next_page_token = data.get('next_page_token')
+                venues.extend(page)
+                if on_page is not None:
+                    on_page(page_token, next_page_token, page)
+                if not next_page_token:
+                    return venues
+                page_token = next_page_token
+                await asyncio.sleep(self.page_token_delay)
+                data = (await self._get('textsearch', {'pagetoken': page_token}, retry_statuses={'INVALID_REQUEST'})).json()
+        except (PlacesError, httpx.HTTPError, ValueError) as e:
+            logger.error(f"Error searching places ({query}): {e}")
+            return venues
+
+    async def place_details(self, place_id: str) -> Dict:
+        """Details of one place (from the response cache when fresh), or {} when they cannot be fetched"""
+        params = {'place_id': place_id, 'fields': DETAILS_FIELDS}
+        cached = self.cache.get('details', params) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            return cached.body.get('result', {})
+
+        try:
+            response = await self._get('details', params, headers=cached.conditional_headers() if cached else None)
+        except (PlacesError, httpx.HTTPError, ValueError) as e:
+            logger.error(f"Error getting place details ({place_id}): {e}")
+            return {}
+        if response is None:
+            self.cache.mark_revalidated('details', params)
+            return cached.body.get('result', {})
+
+        data = response.json()
+        if data.get('status') != 'OK':
+            return {}
+        if self.cache is not None:
+            self.cache.put('details', params, data, response.headers)
+        return data.get('result', {})
+
+
+def photo_urls(details: Dict, api_key: str) -> List[str]:
+    return [
+        f"{PHOTO_URL}?maxwidth=1600&photoreference={photo.get('photo_reference')}&key={api_key}"
+        for photo in details.get('photos', [])
+    ]
+
+
+async def _search(
+    client: AsyncPlacesClient,
+    city: str,
+    state: str,
+    term: str,
+    sport_type: str,
+    checkpoint: Optional[ScrapeCheckpoint]
+) -> List[Dict]:
+    """One search of a city, resumed from (and recorded to) the checkpoint"""
+    query = f"{term} in {city}, {state}"
+    if checkpoint is None:
+        return await client.search_places(query, sport_type)
+
+    def record(token, next_token, page):
+        checkpoint.record_page(city, state, sport_type, token, next_token, page)
+
+    progress = checkpoint.search(city, state, sport_type)
+    if progress is not None:
+        venues, next_token = progress
+        if next_token is None:
+            return venues
+        venues.extend(await client.search_places(query, sport_type, page_token=next_token, on_page=record))
+        if checkpoint.search(city, state, sport_type)[1] is None:
+            return venues
+        # Page tokens expire after a few minutes; start the search over
+        logger.info(f"Restarting search: {query}")
+    return await client.search_places(query, sport_type, on_page=record)
+
+
+async def scrape_city(
+    client: AsyncPlacesClient,
+    city: str,
+    state: str,
+    counts: Optional[Dict] = None,
+    concurrency: int = PLACES_CITY_CONCURRENCY,
+    checkpoint: Optional[ScrapeCheckpoint] = None
+) -> List[Dict]:
+    """
+    Every venue type in a city, with details.
+
+    The searches run concurrently, then details are fetched once per place
+    (places often match more than one search), at most `concurrency` at a
+    time. `counts` collects the number of results per sport type. With a
+    checkpoint, pages and details already in it are not fetched again and
+    new ones are appended as they arrive.
+    """
+    found = await asyncio.gather(*(
+        _search(client, city, state, term, sport_type, checkpoint) for term, sport_type in CITY_SEARCHES
+    ))
+    venues = [venue for results in found for venue in results]
+    if counts is not None:
+        for (_, sport_type), results in zip(CITY_SEARCHES, found):
+            counts[sport_type] = len(results)
+
+    place_ids = list({venue['google_place_id'] for venue in venues if venue.get('google_place_id')})
+    city_slots = asyncio.Semaphore(concurrency)
+
+    async def fetch_details(place_id):
+        if checkpoint is not None and checkpoint.details(place_id) is not None:
+            return checkpoint.details(place_id)
+        async with city_slots:
+            place_details = await client.place_details(place_id)
+        # Failed fetches ({}) are retried on the next run
+        if checkpoint is not None and place_details:
+            checkpoint.record_details(place_id, place_details)
+        return place_details
+
+    details = dict(zip(place_ids, await asyncio.gather(*(fetch_details(place_id) for place_id in place_ids))))
+
+    for venue in venues:
+        place_details = details.get(venue.get('google_place_id'), {})
+        venue.update({
+            'website': place_details.get('website'),
+            'phone': place_details.get('formatted_phone_number'),
+            'opening_hours': place_details.get('opening_hours', {}).get('weekday_text', []),
+            'photos': photo_urls(place_details, client.api_key),
+            'slug': slugify(f"{venue.get('name')} {venue.get('city')} {venue.get('state')}")
+        })
+    return venues
@@ -0,0 +1,106 @@
+"""
+Persistent cache of Places API responses
+
+Responses are stored in a SQLite file keyed by endpoint and query
+parameters (minus the API key), so repeated and overlapping scrapes reuse
+place details instead of paying for them again, and a cache file doubles
+as an offline fixture. Entries younger than the TTL are used as is; older
+ones are revalidated with If-None-Match / If-Modified-Since when the
+response carried an ETag or Last-Modified, and refetched otherwise.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache file (empty disables the cache) and seconds before an entry is revalidated
+PLACES_CACHE_FILE = os.getenv('PLACES_CACHE_FILE', 'places_cache.sqlite3')
+PLACES_CACHE_TTL = int(os.getenv('PLACES_CACHE_TTL', str(7 * 24 * 3600)))
+
+# Parameters that do not change the response
+_IGNORED_PARAMS = {'key'}
+
+
+@dataclass
+class CachedResponse:
+    body: Dict
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed response cache with a TTL"""
+
+    def __init__(self, path: str = PLACES_CACHE_FILE, ttl: int = PLACES_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def cache_key(endpoint: str, params: Dict) -> str:
+        kept = {name: value for name, value in params.items() if name not in _IGNORED_PARAMS}
+        return f"{endpoint}?{json.dumps(kept, sort_keys=True, default=str)}"
+
+    def get(self, endpoint: str, params: Dict) -> Optional[CachedResponse]:
+        """The stored response (fresh or stale), or None"""
+        row = self._db.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+            (self.cache_key(endpoint, params),)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        body, etag, last_modified, fetched_at = row
+        fresh = time.time() - fetched_at < self.ttl
+        if fresh:
+            self.hits += 1
+        return CachedResponse(json.loads(body), etag, last_modified, fetched_at, fresh)
+
+    def put(self, endpoint: str, params: Dict, body: Dict, headers: Optional[Dict] = None) -> None:
+        headers = headers or {}
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (self.cache_key(endpoint, params), json.dumps(body), headers.get('etag'), headers.get('last-modified'), time.time())
+        )
+
+    def mark_revalidated(self, endpoint: str, params: Dict) -> None:
+        """The server answered 304: the stored response is current for another TTL"""
+        self.revalidated += 1
+        self._db.execute(
+            "UPDATE responses SET fetched_at = ? WHERE key = ?",
+            (time.time(), self.cache_key(endpoint, params))
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def open_places_cache() -> Optional[ResponseCache]:
+    """The cache configured by PLACES_CACHE_FILE / PLACES_CACHE_TTL, or None when disabled"""
+    if not PLACES_CACHE_FILE:
+        return None
+    return ResponseCache(PLACES_CACHE_FILE, PLACES_CACHE_TTL)
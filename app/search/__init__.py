@@ -0,0 +1,50 @@
+"""
+Venue keyword search
+
+The backend follows the database: Postgres uses a tsvector column with GIN
+and trigram indexes, SQLite an FTS5 table, and anything else a Whoosh
+index on disk. Set SEARCH_BACKEND to postgres, sqlite or whoosh to override.
+"""
+
+import os
+
+from app.database import engine
+from app.venue_cache import venue_cache
+
+from .base import SearchBackend
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+# Native backend for each SQLAlchemy dialect
+DIALECT_BACKENDS = {
+    "postgresql": "postgres",
+    "sqlite": "sqlite",
+}
+
+
+def create_search_backend(name: str = SEARCH_BACKEND) -> SearchBackend:
+    """Build the configured backend ("auto" picks one from the engine dialect)"""
+    if name == "auto":
+        name = DIALECT_BACKENDS.get(engine.dialect.name, "whoosh")
+
+    # Imported lazily so only the chosen backend's dependencies are loaded
+    if name == "postgres":
+        from .postgres import PostgresSearchBackend
+        return PostgresSearchBackend()
+    if name == "sqlite":
+        from .sqlite_fts import SqliteFtsSearchBackend
+        return SqliteFtsSearchBackend()
+    if name == "whoosh":
+        from .whoosh_index import WhooshSearchBackend
+        return WhooshSearchBackend()
+    raise ValueError(f"Unknown SEARCH_BACKEND: {name}")
+
+
+search_backend = create_search_backend()
+venue_cache.on_snapshot_changed(search_backend.apply_changes)
+
+__all__ = [
+    'SearchBackend',
+    'create_search_backend',
+    'search_backend',
+]
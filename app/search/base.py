@@ -0,0 +1,122 @@
+"""
+Common interface for venue search backends
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Query, Session
+
+from app.models.venue import Venue, SportType
+from app.pagination import Cursor, keyset_filter, keyset_order_by
+from app.venue_cache import VenueSnapshot
+
+# Searched venue fields and their relative weights, most important first
+FIELD_BOOSTS = {
+    "name": 4.0,
+    "city": 2.5,
+    "address": 1.0,
+    "description": 0.75,
+}
+
+# Words too common to narrow a search (the same list Whoosh drops)
+STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from",
+    "have", "if", "in", "is", "it", "may", "not", "of", "on", "or", "tbd",
+    "that", "the", "this", "to", "us", "we", "when", "will", "with", "yet",
+    "you", "your",
+])
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def query_terms(text: str) -> List[Tuple[str, bool]]:
+    """
+    Split free text into (word, prefix) pairs.
+
+    Stop words are dropped. A word is matched as a prefix when it is long
+    enough to be selective (4+ characters), or when it is the last word and
+    the user may still be typing it (2+ characters).
+    """
+    words = [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    return [
+        (word, len(word) >= 4 or (position == len(words) - 1 and len(word) >= 2))
+        for position, word in enumerate(words)
+    ]
+
+
+def active_venue_query(db: Session, columns, sport_type: Optional[str], state: Optional[str]) -> Query:
+    """Query over active venues with the search page's sport and state filters"""
+    query = db.query(*columns).filter(Venue.status == "ACTIVE")
+    if sport_type:
+        query = query.filter(Venue.sport_type == SportType(sport_type))
+    if state:
+        query = query.filter(Venue.state == state.upper())
+    return query
+
+
+def ranked(query: Query, rank, limit: Optional[int], cursor: Optional[Cursor]) -> list:
+    """Rows of a search query in (rank, id) order, past the cursor if one is given"""
+    order = [(rank, False), (Venue.id, False)]
+    if cursor is not None and not cursor.fits(order):
+        cursor = None
+    before = cursor is not None and cursor.before
+    if cursor is not None:
+        query = query.filter(keyset_filter(order, cursor.key, before))
+    query = query.order_by(*keyset_order_by(order, before))
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+class SearchBackend(ABC):
+    """Ranked keyword search over active venues"""
+
+    name = "base"
+
+    @property
+    @abstractmethod
+    def ready(self) -> bool:
+        """Whether open() succeeded and the backend can answer queries"""
+
+    def searchable(self, text: str) -> bool:
+        """Whether the backend can answer this text (it is not only stop words)"""
+        return self.ready and bool(query_terms(text))
+
+    @abstractmethod
+    def open(self, snapshot: VenueSnapshot) -> None:
+        """Create or sync whatever index the backend needs; called once at startup"""
+
+    def apply_changes(self, snapshot: VenueSnapshot, venue_ids: Set[int]) -> None:
+        """Snapshot change hook for backends that keep their own copy of the data"""
+
+    @abstractmethod
+    def search(
+        self,
+        db: Session,
+        text: str,
+        limit: Optional[int],
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None,
+        cursor: Optional[Cursor] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Ranked (venue id, rank) pairs for a query, best match first.
+
+        Lower ranks are better, so hits are ordered by (rank, id). Only the
+        first `limit` hits are returned (None returns them all). With a
+        cursor over (rank, id), hits start after it, or run backwards from
+        it for a Previous link. The second value is the number of matching
+        venues (past the cursor, if given).
+        """
+
+    @abstractmethod
+    def matching_ids(
+        self,
+        db: Session,
+        text: str,
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[int]:
+        """All venue ids matching a query, unranked - for sorting by other columns"""
@@ -0,0 +1,146 @@
+"""
+Postgres full-text venue search
+
+Venues get a generated tsvector column weighting name (A), city (B),
+address (C) and description (D), backed by a GIN index. Matching and
+ts_rank ordering happen inside the database, and the column is always
+current, whichever process wrote the row. A query that matches nothing
+falls back to pg_trgm similarity on name and city, which catches typos.
+The fallback is skipped if the extension cannot be installed.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.venue import Venue
+from app.pagination import Cursor
+from app.search.base import SearchBackend, active_venue_query, query_terms, ranked
+from app.venue_cache import VenueSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration; must be a literal for the generated column
+SEARCH_CONFIG = "english"
+
+# Serializes the DDL below when several workers start at once
+DDL_LOCK_KEY = 720501
+
+SEARCH_VECTOR_DDL = [
+    f"""
+    ALTER TABLE venues ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(city, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(address, '')), 'C') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_venues_search_vector ON venues USING GIN (search_vector)",
+]
+
+TRIGRAM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_venues_name_trgm ON venues USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_venues_city_trgm ON venues USING GIN (city gin_trgm_ops)",
+]
+
+SEARCH_VECTOR = literal_column("venues.search_vector")
+
+
+def build_tsquery(text: str) -> Optional[str]:
+    """to_tsquery() input requiring every word, as a prefix where query_terms() allows"""
+    terms = query_terms(text)
+    if not terms:
+        return None
+    return " & ".join(f"{word}:*" if prefix else word for word, prefix in terms)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector + GIN search with a pg_trgm fallback for misspellings"""
+
+    name = "postgres"
+
+    def __init__(self):
+        self._ready = False
+        self.trigram = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _run_ddl(self, statements: List[str]) -> None:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": DDL_LOCK_KEY})
+            for statement in statements:
+                conn.execute(text(statement))
+
+    def open(self, snapshot: VenueSnapshot) -> None:
+        """Add the search column and indexes if they are missing"""
+        self._run_ddl(SEARCH_VECTOR_DDL)
+        self._ready = True
+
+        try:
+            self._run_ddl(TRIGRAM_DDL)
+            self.trigram = True
+        except SQLAlchemyError as e:
+            logger.warning(f"pg_trgm unavailable, typo-tolerant search disabled: {e}")
+
+    def _similar(self, db: Session, columns, phrase: str, sport_type: Optional[str], state: Optional[str]):
+        """Venues whose name or city is a close trigram match for the whole phrase"""
+        return active_venue_query(db, columns, sport_type, state)\
+            .filter(or_(Venue.name.op("%")(phrase), Venue.city.op("%")(phrase)))
+
+    def search(
+        self,
+        db: Session,
+        text: str,
+        limit: Optional[int],
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None,
+        cursor: Optional[Cursor] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        tsquery_text = build_tsquery(text)
+        if tsquery_text is None:
+            return [], 0
+
+        # Negated so that lower is better; the window count gives the total
+        # match count in the same round trip
+        tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        rank = -func.ts_rank(SEARCH_VECTOR, tsquery)
+        matches = active_venue_query(db, (Venue.id,), sport_type, state)\
+            .filter(SEARCH_VECTOR.op("@@")(tsquery))
+        rows = ranked(matches.add_columns(rank, func.count().over()), rank, limit, cursor)
+
+        # Misspelled queries match nothing at all (not just nothing past the cursor)
+        if not rows and self.trigram and (cursor is None or matches.first() is None):
+            phrase = " ".join(word for word, _ in query_terms(text))
+            similarity = -func.greatest(func.similarity(Venue.name, phrase), func.similarity(Venue.city, phrase))
+            similar = self._similar(db, (Venue.id, similarity, func.count().over()), phrase, sport_type, state)
+            rows = ranked(similar, similarity, limit, cursor)
+
+        return [(row[0], row[1]) for row in rows], (rows[0][2] if rows else 0)
+
+    def matching_ids(
+        self,
+        db: Session,
+        text: str,
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[int]:
+        tsquery_text = build_tsquery(text)
+        if tsquery_text is None:
+            return []
+
+        tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        query = active_venue_query(db, (Venue.id,), sport_type, state)\
+            .filter(SEARCH_VECTOR.op("@@")(tsquery))
+        ids = [venue_id for venue_id, in query]
+        if not ids and self.trigram:
+            phrase = " ".join(word for word, _ in query_terms(text))
+            ids = [venue_id for venue_id, in self._similar(db, (Venue.id,), phrase, sport_type, state)]
+        return ids
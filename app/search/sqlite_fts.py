@@ -0,0 +1,138 @@
+"""
+SQLite FTS5 venue search
+
+An external-content FTS5 table (venues_fts) indexes venue name, city,
+address and description with the porter stemmer. Triggers on venues keep
+it in sync, so writes from any connection are searchable at once. Results
+are ranked with bm25() using the same field weights as the other backends.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.venue import Venue
+from app.pagination import Cursor
+from app.search.base import FIELD_BOOSTS, SearchBackend, active_venue_query, query_terms, ranked
+from app.venue_cache import VenueSnapshot
+
+logger = logging.getLogger(__name__)
+
+FTS_COLUMNS = ", ".join(FIELD_BOOSTS)
+NEW_VALUES = ", ".join(f"new.{name}" for name in FIELD_BOOSTS)
+OLD_VALUES = ", ".join(f"old.{name}" for name in FIELD_BOOSTS)
+
+FTS_TABLE_DDL = f"""
+CREATE VIRTUAL TABLE venues_fts USING fts5(
+    {FTS_COLUMNS},
+    content='venues', content_rowid='id', tokenize='porter unicode61'
+)
+"""
+
+FTS_TRIGGERS = {
+    "venues_fts_insert": f"""
+        CREATE TRIGGER venues_fts_insert AFTER INSERT ON venues BEGIN
+            INSERT INTO venues_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+    """,
+    "venues_fts_delete": f"""
+        CREATE TRIGGER venues_fts_delete AFTER DELETE ON venues BEGIN
+            INSERT INTO venues_fts(venues_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END
+    """,
+    "venues_fts_update": f"""
+        CREATE TRIGGER venues_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON venues BEGIN
+            INSERT INTO venues_fts(venues_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO venues_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+    """,
+}
+
+FTS = table("venues_fts", column("rowid"))
+FTS_TABLE = literal_column("venues_fts")
+
+
+def build_match(text: str) -> Optional[str]:
+    """FTS5 MATCH expression requiring every word, as a prefix where query_terms() allows"""
+    terms = query_terms(text)
+    if not terms:
+        return None
+    return " AND ".join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+
+
+class SqliteFtsSearchBackend(SearchBackend):
+    """FTS5 search kept in sync by triggers on the venues table"""
+
+    name = "sqlite"
+
+    def __init__(self):
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def open(self, snapshot: VenueSnapshot) -> None:
+        """Create the FTS table and triggers, rebuilding the index if either was missing"""
+        with engine.begin() as conn:
+            existing = {
+                name for name, in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name = 'venues_fts' OR type = 'trigger'"
+                ))
+            }
+            # Dropping venues drops its triggers too, leaving the index stale
+            rebuild = not {"venues_fts", *FTS_TRIGGERS} <= existing
+
+            if "venues_fts" not in existing:
+                conn.execute(text(FTS_TABLE_DDL))
+            for name, ddl in FTS_TRIGGERS.items():
+                if name not in existing:
+                    conn.execute(text(ddl))
+            if rebuild:
+                conn.execute(text("INSERT INTO venues_fts(venues_fts) VALUES ('rebuild')"))
+                logger.info("Search index (FTS5) rebuilt")
+
+        self._ready = True
+
+    def _matching(self, db: Session, columns, match: str, sport_type: Optional[str], state: Optional[str]):
+        # bm25() only works in a query reading the FTS table directly, so
+        # rank there and join the venue filters onto the result
+        hits = select(FTS.c.rowid, func.bm25(FTS_TABLE, *FIELD_BOOSTS.values()).label("rank"))\
+            .where(FTS_TABLE.op("MATCH")(match))\
+            .subquery()
+        return active_venue_query(db, columns, sport_type, state)\
+            .join(hits, hits.c.rowid == Venue.id), hits.c.rank
+
+    def search(
+        self,
+        db: Session,
+        text: str,
+        limit: Optional[int],
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None,
+        cursor: Optional[Cursor] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        match = build_match(text)
+        if match is None:
+            return [], 0
+
+        # bm25() is already lower for better matches; the window count gives the total
+        query, rank = self._matching(db, (Venue.id,), match, sport_type, state)
+        rows = ranked(query.add_columns(rank, func.count().over()), rank, limit, cursor)
+        return [(row[0], row[1]) for row in rows], (rows[0][2] if rows else 0)
+
+    def matching_ids(
+        self,
+        db: Session,
+        text: str,
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[int]:
+        match = build_match(text)
+        if match is None:
+            return []
+        query, _ = self._matching(db, (Venue.id,), match, sport_type, state)
+        return [venue_id for venue_id, in query]
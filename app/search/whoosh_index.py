@@ -0,0 +1,255 @@
+"""
+Full-text venue search backed by a Whoosh inverted index
+
+The index covers active venues (name, city, address, description) with
+per-field boosts and BM25F ranking. Queries combine exact, prefix and fuzzy
+term matches so partial words and small typos still find venues. The index
+lives on disk in SEARCH_INDEX_DIR and is shared by all workers. It is
+synced with the venue snapshot at startup and then kept current from
+snapshot changes, so admin edits and imports show up without a rebuild.
+
+Used when the database has no native full-text search (SEARCH_BACKEND=whoosh
+forces it).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from whoosh import index
+from whoosh.analysis import StandardAnalyzer, StemmingAnalyzer
+from whoosh.fields import Schema, ID, KEYWORD, STORED, TEXT
+from whoosh.index import LockError
+from whoosh.query import And, FuzzyTerm, Or, Prefix, Term
+from whoosh.writing import AsyncWriter
+from sqlalchemy.orm import Session
+
+from app.pagination import Cursor, sequence_window
+from app.search.base import FIELD_BOOSTS, SearchBackend
+from app.venue_cache import VenueSnapshot, VenueSummary
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_DIR = os.getenv(
+    "SEARCH_INDEX_DIR",
+    str(Path(__file__).resolve().parents[2] / "search_index")
+)
+
+# Stemmed analyzer for indexing and exact/fuzzy terms; the plain analyzer
+# yields the unstemmed words used for prefix matching. Both drop the same
+# stop words, so their token streams line up.
+# minsize=1 keeps single characters such as street numbers.
+STEMMING_ANALYZER = StemmingAnalyzer(minsize=1)
+PLAIN_ANALYZER = StandardAnalyzer(minsize=1)
+
+VENUE_SCHEMA = Schema(
+    id=ID(stored=True, unique=True, sortable=True),
+    name=TEXT(analyzer=STEMMING_ANALYZER, field_boost=FIELD_BOOSTS["name"]),
+    city=TEXT(analyzer=STEMMING_ANALYZER, field_boost=FIELD_BOOSTS["city"]),
+    address=TEXT(analyzer=STEMMING_ANALYZER, field_boost=FIELD_BOOSTS["address"]),
+    description=TEXT(analyzer=STEMMING_ANALYZER, field_boost=FIELD_BOOSTS["description"]),
+    state=KEYWORD(lowercase=True),
+    sport=KEYWORD,
+    digest=STORED,
+)
+
+
+def _digest(venue: VenueSummary) -> str:
+    """Hash of the indexed fields, used to find documents that are out of date"""
+    text = "\x1f".join([
+        venue.name, venue.city, venue.state, venue.address or "",
+        venue.description or "", venue.sport_type.value
+    ])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _document(venue: VenueSummary) -> dict:
+    return {
+        "id": str(venue.id),
+        "name": venue.name,
+        "city": venue.city,
+        "address": venue.address or "",
+        "description": venue.description or "",
+        "state": venue.state,
+        "sport": venue.sport_type.value,
+        "digest": _digest(venue),
+    }
+
+
+def build_query(text: str, fuzzy: bool = False):
+    """
+    Turn free text into a Whoosh query.
+
+    Every word has to match at least one field, as an exact stemmed term or
+    a prefix of the word (so "skat" finds "skatepark"). With fuzzy=True a
+    term within one edit also counts (so "skatpark" still matches).
+    """
+    stemmed = [token.text for token in STEMMING_ANALYZER(text)]
+    plain = [token.text for token in PLAIN_ANALYZER(text)]
+    if not stemmed:
+        return None
+
+    clauses = []
+    for position, (stem, word) in enumerate(zip(stemmed, plain)):
+        is_last = position == len(stemmed) - 1
+        alternatives = []
+        for field in FIELD_BOOSTS:
+            alternatives.append(Term(field, stem))
+            if len(word) >= 4 or (is_last and len(word) >= 2):
+                alternatives.append(Prefix(field, word, boost=0.75))
+            if fuzzy and len(stem) >= 4:
+                alternatives.append(FuzzyTerm(field, stem, boost=0.5, maxdist=1, prefixlength=1))
+        clauses.append(Or(alternatives))
+
+    return And(clauses) if len(clauses) > 1 else clauses[0]
+
+
+def _hit_order(hit: Tuple[int, float]) -> Tuple[float, int]:
+    return hit[1], hit[0]
+
+
+class WhooshSearchBackend(SearchBackend):
+    """Whoosh index of active venues kept in step with the venue snapshot"""
+
+    name = "whoosh"
+
+    def __init__(self, directory: str = SEARCH_INDEX_DIR):
+        self.directory = directory
+        self._index = None
+        self._searcher = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def searchable(self, text: str) -> bool:
+        """Whether the index can answer this text (it is not only stop words)"""
+        return self.ready and build_query(text) is not None
+
+    def open(self, snapshot: VenueSnapshot) -> None:
+        """Open (or create) the on-disk index and bring it in line with the snapshot"""
+        os.makedirs(self.directory, exist_ok=True)
+        if index.exists_in(self.directory):
+            self._index = index.open_dir(self.directory)
+        else:
+            self._index = index.create_in(self.directory, VENUE_SCHEMA)
+
+        with self._index.searcher() as searcher:
+            indexed = {fields["id"]: fields.get("digest") for fields in searcher.all_stored_fields()}
+
+        stale = [
+            venue for venue in snapshot.venues
+            if indexed.get(str(venue.id)) != _digest(venue)
+        ]
+        removed = indexed.keys() - {str(venue_id) for venue_id in snapshot.by_id}
+
+        if stale or removed:
+            try:
+                writer = self._index.writer()
+            except LockError:
+                # Another worker is already syncing the shared index
+                logger.info("Search index is locked by another process; using it as is")
+                return
+            for venue_id in removed:
+                writer.delete_by_term("id", venue_id)
+            for venue in stale:
+                writer.update_document(**_document(venue))
+            writer.commit()
+            logger.info(f"Search index synced: {len(stale)} updated, {len(removed)} removed")
+
+    def apply_changes(self, snapshot: VenueSnapshot, venue_ids: Set[int]) -> None:
+        """Re-index the given venues from the snapshot (deleting those no longer active)"""
+        if self._index is None:
+            return
+
+        writer = AsyncWriter(self._index)
+        for venue_id in venue_ids:
+            venue = snapshot.by_id.get(venue_id)
+            if venue is None:
+                writer.delete_by_term("id", str(venue_id))
+            else:
+                writer.update_document(**_document(venue))
+        writer.commit()
+
+    def _current_searcher(self):
+        if self._searcher is None:
+            self._searcher = self._index.searcher()
+        else:
+            self._searcher = self._searcher.refresh()
+        return self._searcher
+
+    def _filter(self, sport_type: Optional[str], state: Optional[str]):
+        terms = []
+        if sport_type:
+            terms.append(Term("sport", sport_type))
+        if state:
+            terms.append(Term("state", state.lower()))
+        if not terms:
+            return None
+        return And(terms) if len(terms) > 1 else terms[0]
+
+    def search(
+        self,
+        db: Session,
+        text: str,
+        limit: Optional[int],
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None,
+        cursor: Optional[Cursor] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Ranked (venue id, negated score) pairs for a query.
+
+        Whoosh's top-N cut breaks score ties arbitrarily and cannot seek to
+        a score, so every hit is scored, sorted by (rank, id) and the page
+        is cut out in memory. Typo-tolerant matching is only tried when the
+        exact/prefix query finds nothing. The database session is unused.
+        """
+        query = build_query(text)
+        if query is None:
+            return [], 0
+
+        filter_query = self._filter(sport_type, state)
+        with self._lock:
+            searcher = self._current_searcher()
+            results = searcher.search(query, limit=None, filter=filter_query)
+            if results.is_empty():
+                results = searcher.search(build_query(text, fuzzy=True), limit=None, filter=filter_query)
+            hits = sorted(((int(hit["id"]), -hit.score) for hit in results), key=_hit_order)
+
+        if cursor is not None and len(cursor.key) != 2:
+            cursor = None
+        try:
+            return sequence_window(hits, _hit_order, limit, cursor), len(hits)
+        except TypeError:
+            # Key from a cursor built for another sort order
+            return sequence_window(hits, _hit_order, limit, None), len(hits)
+
+    def matching_ids(
+        self,
+        db: Session,
+        text: str,
+        sport_type: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[int]:
+        """Unranked matching ids, falling back to typo-tolerant terms like search()"""
+        query = build_query(text)
+        if query is None:
+            return []
+
+        filter_query = self._filter(sport_type, state)
+        with self._lock:
+            searcher = self._current_searcher()
+            ids = searcher.reader().column_reader("id")
+            for candidate in (query, build_query(text, fuzzy=True)):
+                if filter_query is not None:
+                    candidate = And([candidate, filter_query])
+                docnums = list(searcher.docs_for_query(candidate))
+                if docnums:
+                    break
+            return [int(ids[docnum]) for docnum in docnums]
+
@@ -0,0 +1,235 @@
+"""
+Sharded, streaming XML sitemaps
+
+/sitemap.xml is a sitemap index pointing at /sitemaps/pages.xml and at
+numbered files for each section (states-1.xml, cities-1.xml,
+sport-cities-1.xml, venues-1.xml, ...), each holding at most
+SITEMAP_URLS_PER_FILE URLs (the protocol allows 50,000). A file is found by
+keyset on its section's sort key and streamed in batches from a
+column-only cursor, so memory use stays flat however many venues there are.
+
+Every file shares one freshness stamp - max(venues.updated_at) plus the
+active venue count from the rollups - which gives the ETag and
+Last-Modified, so a crawler revalidating an unchanged sitemap costs a
+single indexed query.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.database import open_read_session
+from app.http_cache import make_etag
+from app.models.rollup import StateRollup, CityRollup, CitySportRollup
+from app.models.venue import Venue, SportType
+from app.pagination import keyset_filter
+
+SITE_URL = os.getenv("SITE_URL", "https://skaters.com").rstrip("/")
+SITEMAP_URLS_PER_FILE = min(50000, int(os.getenv("SITEMAP_URLS_PER_FILE", "50000")))
+SITEMAP_MAX_AGE = int(os.getenv("SITEMAP_MAX_AGE", "3600"))
+
+# Rows fetched from the cursor (and written to the response) at a time
+STREAM_BATCH = 1000
+
+# Bump when the sitemap markup changes so cached copies are invalidated
+SITEMAP_VERSION = 2
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = XML_DECLARATION + '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+
+# Sports that have /<sport>/<state>/<city> pages
+SPORT_PATHS = {
+    SportType.SKATEBOARDING: 'skate-parks',
+    SportType.ICE_SKATING: 'ice-rinks',
+    SportType.ROLLER_SKATING: 'roller-rinks',
+}
+
+# (path, changefreq, priority)
+STATIC_PAGES = [
+    ('', 'daily', 1.0),
+    ('locations/states', 'weekly', 0.9),
+    ('ice-rinks', 'weekly', 0.95),  # Hub page - 110K searches
+    ('near-me', 'weekly', 0.9),  # Main near me landing page
+    ('skate-parks/near-me', 'weekly', 0.9),
+    ('ice-rinks/near-me', 'weekly', 0.9),
+    ('roller-rinks/near-me', 'weekly', 0.9),
+    ('indoor-skate-parks/near-me', 'weekly', 0.85),
+    ('outdoor-skate-parks/near-me', 'weekly', 0.85),
+    ('outdoor-ice-rinks/near-me', 'weekly', 0.85),  # 18K searches
+    ('indoor-ice-rinks/near-me', 'weekly', 0.85),
+]
+
+
+def city_slug(city: str) -> str:
+    return city.lower().replace(' ', '-')
+
+
+@dataclass(frozen=True)
+class SitemapSection:
+    """A family of URLs, split into numbered files by a unique sort key"""
+    name: str
+    changefreq: str
+    priority: float
+    query: Select
+    key: tuple
+    # Row -> (path, lastmod)
+    url: Callable[..., Tuple[str, Optional[datetime]]]
+
+    @property
+    def order(self) -> List[tuple]:
+        return [(column, False) for column in self.key]
+
+
+SECTIONS = {
+    section.name: section for section in (
+        SitemapSection(
+            name="states",
+            changefreq="weekly",
+            priority=0.8,
+            query=select(StateRollup.state),
+            key=(StateRollup.state,),
+            url=lambda row: (f"locations/{row.state.lower()}", None),
+        ),
+        SitemapSection(
+            name="cities",
+            changefreq="weekly",
+            priority=0.7,
+            query=select(CityRollup.state, CityRollup.city),
+            key=(CityRollup.state, CityRollup.city),
+            url=lambda row: (f"locations/{row.state.lower()}/{city_slug(row.city)}", None),
+        ),
+        SitemapSection(
+            name="sport-cities",
+            changefreq="weekly",
+            priority=0.85,
+            query=select(CitySportRollup.state, CitySportRollup.city, CitySportRollup.sport_type)
+                .where(CitySportRollup.sport_type.in_(list(SPORT_PATHS))),
+            key=(CitySportRollup.state, CitySportRollup.city, CitySportRollup.sport_type),
+            url=lambda row: (f"{SPORT_PATHS[row.sport_type]}/{row.state.lower()}/{city_slug(row.city)}", None),
+        ),
+        SitemapSection(
+            name="venues",
+            changefreq="monthly",
+            priority=0.6,
+            query=select(Venue.id, Venue.slug, Venue.updated_at).where(Venue.status == "ACTIVE"),
+            key=(Venue.id,),
+            url=lambda row: (f"venues/{row.slug}", row.updated_at),
+        ),
+    )
+}
+
+
+@dataclass(frozen=True)
+class SitemapStamp:
+    """Freshness of every sitemap file"""
+    last_modified: Optional[datetime]
+    venue_count: int
+
+    def etag(self, name: str) -> str:
+        return make_etag(SITEMAP_VERSION, SITEMAP_URLS_PER_FILE, name, self.last_modified, self.venue_count)
+
+
+def sitemap_stamp(db: Session) -> SitemapStamp:
+    """One cheap query: the newest venue write (indexed) and the rolled-up venue count"""
+    last_modified, venue_count = db.query(
+        select(func.max(Venue.updated_at)).scalar_subquery(),
+        select(func.coalesce(func.sum(StateRollup.venue_count), 0)).scalar_subquery()
+    ).one()
+    return SitemapStamp(last_modified, venue_count or 0)
+
+
+def file_count(db: Session, section: SitemapSection) -> int:
+    total = db.execute(select(func.count()).select_from(section.query.subquery())).scalar()
+    return max(1, -(-total // SITEMAP_URLS_PER_FILE))
+
+
+def file_start(db: Session, section: SitemapSection, number: int) -> Tuple[bool, Optional[tuple]]:
+    """
+    (exists, key of the last row in the previous file) for file `number`.
+
+    Only the key columns are read to find the boundary; the file itself is
+    then a keyset range scan.
+    """
+    if number == 1:
+        return True, None
+    position = func.row_number().over(order_by=section.key).label("position")
+    ranked = section.query.with_only_columns(*section.key, position).subquery()
+    boundary = db.execute(
+        select(ranked).where(ranked.c.position == (number - 1) * SITEMAP_URLS_PER_FILE)
+    ).first()
+    if boundary is None:
+        return False, None
+    # A boundary row that is also the last row means the file would be empty
+    following = section.query.where(keyset_filter(section.order, tuple(boundary[:-1]))).limit(1)
+    if db.execute(following).first() is None:
+        return False, None
+    return True, tuple(boundary[:-1])
+
+
+def _w3c_date(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+def _url_element(path: str, lastmod: Optional[datetime], changefreq: str, priority: float) -> str:
+    lines = ['  <url>\n', f'    <loc>{escape(f"{SITE_URL}/{path}")}</loc>\n']
+    if lastmod is not None:
+        lines.append(f'    <lastmod>{_w3c_date(lastmod)}</lastmod>\n')
+    lines.append(f'    <changefreq>{changefreq}</changefreq>\n')
+    lines.append(f'    <priority>{priority}</priority>\n')
+    lines.append('  </url>\n')
+    return "".join(lines)
+
+
+def render_index(db: Session, stamp: SitemapStamp) -> str:
+    """The /sitemap.xml index listing every file"""
+    names = ["pages.xml"]
+    for section in SECTIONS.values():
+        names.extend(f"{section.name}-{number}.xml" for number in range(1, file_count(db, section) + 1))
+
+    lastmod = f'    <lastmod>{_w3c_date(stamp.last_modified)}</lastmod>\n' if stamp.last_modified else ''
+    xml = [XML_DECLARATION, '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name in names:
+        xml.append(f'  <sitemap>\n    <loc>{escape(f"{SITE_URL}/sitemaps/{name}")}</loc>\n{lastmod}  </sitemap>\n')
+    xml.append('</sitemapindex>\n')
+    return "".join(xml)
+
+
+def render_pages() -> str:
+    """Fixed landing pages"""
+    return URLSET_OPEN + "".join(
+        _url_element(path, None, changefreq, priority) for path, changefreq, priority in STATIC_PAGES
+    ) + URLSET_CLOSE
+
+
+def stream_section(section: SitemapSection, start: Optional[tuple]) -> Iterator[str]:
+    """
+    Yield one sitemap file in STREAM_BATCH-row chunks.
+
+    Runs after the request's own session has been closed, so it opens a
+    session for the lifetime of the stream.
+    """
+    query = section.query
+    if start is not None:
+        query = query.where(keyset_filter(section.order, start))
+    query = query.order_by(*section.key)\
+        .limit(SITEMAP_URLS_PER_FILE)\
+        .execution_options(yield_per=STREAM_BATCH)
+
+    db = open_read_session()
+    try:
+        yield URLSET_OPEN
+        for rows in db.execute(query).partitions():
+            yield "".join(
+                _url_element(*section.url(row), section.changefreq, section.priority)
+                for row in rows
+            )
+        yield URLSET_CLOSE
+    finally:
+        db.close()
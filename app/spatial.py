@@ -0,0 +1,139 @@
+"""
+Spatial lookups backed by the venue_geo_cells grid index
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.distance import DistanceEngine
+from app.geo import bounding_box, cells_for_bbox, encode_geohash
+from app.models.venue import Venue, VenueGeoCell, SportType
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to render a nearby result - no ORM objects, no relationships
+NEARBY_COLUMNS = (
+    Venue.id,
+    Venue.name,
+    Venue.slug,
+    Venue.sport_type,
+    Venue.address,
+    Venue.city,
+    Venue.state,
+    Venue.latitude,
+    Venue.longitude,
+    Venue.rating,
+    Venue.review_count,
+)
+
+
+def nearby_candidates(
+    db: Session,
+    lat: float,
+    lng: float,
+    radius: float,
+    sport_type: Optional[SportType] = None
+) -> List[Any]:
+    """
+    Get ACTIVE venues inside the bounding box around (lat, lng).
+
+    The geohash cells covering the box narrow the scan through the
+    venue_geo_cells index; the latitude/longitude range then trims the cell
+    edges. Rows are returned as column tuples and still need an exact
+    distance check.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+
+    query = db.query(*NEARBY_COLUMNS).filter(
+        Venue.status == "ACTIVE",
+        Venue.latitude.between(min_lat, max_lat)
+    )
+
+    if min_lng > max_lng:
+        query = query.filter(or_(Venue.longitude >= min_lng, Venue.longitude <= max_lng))
+    else:
+        query = query.filter(Venue.longitude.between(min_lng, max_lng))
+
+    cells = cells_for_bbox(min_lat, max_lat, min_lng, max_lng)
+    if cells:
+        query = query.join(VenueGeoCell, VenueGeoCell.venue_id == Venue.id)\
+            .filter(VenueGeoCell.cell.in_(cells))
+
+    if sport_type:
+        query = query.filter(Venue.sport_type == sport_type)
+
+    return query.all()
+
+
+def find_nearby(
+    db: Session,
+    lat: float,
+    lng: float,
+    radius: float,
+    sport_type: Optional[SportType] = None,
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Get the closest ACTIVE venues within radius miles, nearest first"""
+    rows = nearby_candidates(db, lat, lng, radius, sport_type)
+    if not rows:
+        return []
+
+    positions, distances = DistanceEngine.from_rows(rows).nearest(lat, lng, limit, radius)
+
+    results = []
+    for position, distance in zip(positions, distances):
+        row = rows[position]
+        results.append({
+            "id": row.id,
+            "name": row.name,
+            "slug": row.slug,
+            "sport_type": row.sport_type.value,
+            "address": row.address,
+            "city": row.city,
+            "state": row.state,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "rating": row.rating,
+            "review_count": row.review_count,
+            "distance": round(float(distance), 1)
+        })
+
+    return results
+
+
+def rebuild_geo_index(db: Session, chunk_size: int = 1000) -> int:
+    """Recompute every venue's grid cell. Returns the number of cells written."""
+    table = VenueGeoCell.__table__
+    db.execute(table.delete())
+
+    rows = db.query(Venue.id, Venue.latitude, Venue.longitude).filter(
+        Venue.latitude.isnot(None),
+        Venue.longitude.isnot(None)
+    ).all()
+
+    for start in range(0, len(rows), chunk_size):
+        db.execute(table.insert(), [
+            {"venue_id": venue_id, "cell": encode_geohash(latitude, longitude)}
+            for venue_id, latitude, longitude in rows[start:start + chunk_size]
+        ])
+
+    db.commit()
+    return len(rows)
+
+
+def ensure_geo_index(db: Session) -> None:
+    """Create the grid index table if needed and backfill it when out of step with venues"""
+    VenueGeoCell.__table__.create(bind=engine, checkfirst=True)
+
+    indexed = db.query(func.count(VenueGeoCell.venue_id)).scalar()
+    with_coordinates = db.query(func.count(Venue.id)).filter(
+        and_(Venue.latitude.isnot(None), Venue.longitude.isnot(None))
+    ).scalar()
+
+    if indexed != with_coordinates:
+        count = rebuild_geo_index(db)
+        logger.info(f"Rebuilt venue geo index: {count} venues")
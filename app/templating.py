@@ -0,0 +1,57 @@
+"""
+Shared Jinja2 environment for every page
+
+All routers render through the one `templates` object here, so a worker
+compiles and caches each template once. Compiled templates are also kept
+as bytecode on disk (TEMPLATE_CACHE_DIR), which the image build fills
+ahead of time:
+    python scripts/precompile_templates.py
+so a fresh worker loads bytecode instead of parsing template sources.
+In production templates are not re-checked for edits on every render.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+# Directory for compiled template bytecode (empty disables it)
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", str(TEMPLATES_DIR.parent.parent / ".template_cache"))
+# Re-check template files for edits on each render (off by default in production)
+TEMPLATE_AUTO_RELOAD = os.getenv(
+    "TEMPLATE_AUTO_RELOAD", "false" if os.getenv("ENVIRONMENT") == "production" else "true"
+).lower() == "true"
+
+
+def _bytecode_cache():
+    if not TEMPLATE_CACHE_DIR:
+        return None
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled ({TEMPLATE_CACHE_DIR}): {e}")
+        return None
+    return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+
+environment = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=True,
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+)
+templates = Jinja2Templates(env=environment)
+
+
+def precompile_templates() -> int:
+    """Compile every template into the environment (and the bytecode cache); returns how many"""
+    names = environment.list_templates(filter_func=lambda name: not name.startswith("."))
+    for name in names:
+        environment.get_template(name)
+    return len(names)
@@ -0,0 +1,112 @@
+"""
+Signed-in user lookups without a users query per request
+
+Login stores a compact principal (id, username, full_name, is_admin,
+is_active) in the signed session cookie. The current user is then resolved
+from, in order: the request itself (so several dependencies share one
+lookup), a process-wide cache whose entries are trusted for USER_CACHE_TTL
+seconds, and - for pages that only show who is signed in - the session
+copy. Only authorization checks with an expired cache entry read the users
+table. ORM writes to users in this process update the cache on commit.
+"""
+
+import os
+import time
+from dataclasses import asdict, dataclass
+from itertools import chain
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.venue import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """What pages and permission checks need to know about the signed-in user"""
+    id: int
+    username: str
+    full_name: Optional[str]
+    is_admin: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            full_name=user.full_name,
+            is_admin=bool(user.is_admin),
+            is_active=bool(user.is_active),
+        )
+
+    @classmethod
+    def from_session(cls, data) -> Optional["UserPrincipal"]:
+        """Principal stored by login; None for sessions that predate it"""
+        if not isinstance(data, dict):
+            return None
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+    def to_session(self) -> dict:
+        return asdict(self)
+
+
+class UserCache:
+    """user id -> principal (None for deleted users), trusted for `ttl` seconds"""
+
+    def __init__(self, ttl: float = USER_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[Optional[UserPrincipal], float]] = {}
+
+    def lookup(self, user_id: int) -> Tuple[bool, Optional[UserPrincipal]]:
+        """(hit, principal); a miss means the entry is absent or expired"""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return False, None
+        return True, entry[0]
+
+    def put(self, user_id: int, principal: Optional[UserPrincipal]) -> None:
+        self._entries[user_id] = (principal, time.monotonic() + self.ttl)
+
+    def load(self, db: Session, user_id: int) -> Optional[UserPrincipal]:
+        """Read the user's principal columns and cache them"""
+        row = db.query(
+            User.id, User.username, User.full_name, User.is_admin, User.is_active
+        ).filter(User.id == user_id).first()
+        principal = UserPrincipal.from_user(row) if row else None
+        self.put(user_id, principal)
+        return principal
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_users", {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, User):
+            changed[obj.id] = UserPrincipal.from_user(obj)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_changed_users(session):
+    for user_id, principal in session.info.pop("changed_users", {}).items():
+        user_cache.put(user_id, principal)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_users", None)
@@ -0,0 +1,251 @@
+"""
+In-process snapshot of active venues for public page rendering
+
+The snapshot holds every ACTIVE venue with its primary photo, pre-sorted
+and grouped by state and city, so listing pages render without touching
+the database. It is built once at startup. Commits in this process patch
+the affected venues through app.venue_events. A cheap signature query every
+VENUE_CACHE_TTL seconds picks up writes from other processes, such as
+importers or other workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.venue import Venue, VenuePhoto, SportType
+from app.representatives import primary_photos
+from app.venue_events import on_venues_changed
+
+logger = logging.getLogger(__name__)
+
+VENUE_CACHE_TTL = float(os.getenv("VENUE_CACHE_TTL", "30"))
+
+
+@dataclass(frozen=True)
+class VenueSummary:
+    """Read-only view of an active venue as used by listing pages"""
+    id: int
+    name: str
+    slug: str
+    sport_type: SportType
+    address: Optional[str]
+    city: str
+    state: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    rating: float
+    review_count: int
+    description: Optional[str]
+    photo_url: Optional[str]
+    updated_at: Optional[datetime]
+
+
+SnapshotListener = Callable[["VenueSnapshot", Set[int]], None]
+
+
+def rating_order(venue: VenueSummary) -> Tuple[float, int]:
+    """Highest rated first, ties by id - also the keyset for paging rating-sorted lists"""
+    return -venue.rating, venue.id
+
+
+def freshness(venues: List[VenueSummary]) -> Tuple[Optional[datetime], int]:
+    """(newest updated_at, count) of a venue list - a page listing them changes only when these do"""
+    stamps = [venue.updated_at for venue in venues if venue.updated_at is not None]
+    return (max(stamps) if stamps else None), len(venues)
+
+
+class VenueSnapshot:
+    """Active venues sorted by rating (highest first) with state and city groupings"""
+
+    def __init__(self, venues: Iterable[VenueSummary]):
+        self.by_id: Dict[int, VenueSummary] = {venue.id: venue for venue in venues}
+        self.venues: List[VenueSummary] = sorted(self.by_id.values(), key=rating_order)
+
+        self.by_state: Dict[str, List[VenueSummary]] = defaultdict(list)
+        self.by_city: Dict[Tuple[str, str], List[VenueSummary]] = defaultdict(list)
+        for venue in self.venues:
+            self.by_state[venue.state].append(venue)
+            self.by_city[(venue.state, venue.city.lower())].append(venue)
+
+        self.states: List[str] = sorted(self.by_state)
+
+    def top_rated(self, limit: int) -> List[VenueSummary]:
+        """Highest rated venues across the country"""
+        return self.venues[:limit]
+
+    def in_state(self, state: str) -> List[VenueSummary]:
+        """Venues in a state, highest rated first"""
+        return self.by_state.get(state.upper(), [])
+
+    def in_city(self, state: str, city: str) -> List[VenueSummary]:
+        """Venues in a city (case-insensitive name match), highest rated first"""
+        return self.by_city.get((state.upper(), city.lower()), [])
+
+    def patched(self, venues: Iterable[VenueSummary], removed_ids: Set[int]) -> "VenueSnapshot":
+        """New snapshot with some venues replaced or removed"""
+        merged = {venue_id: venue for venue_id, venue in self.by_id.items() if venue_id not in removed_ids}
+        for venue in venues:
+            merged[venue.id] = venue
+        return VenueSnapshot(merged.values())
+
+    def changed_ids(self, other: "VenueSnapshot") -> Set[int]:
+        """Ids of venues that were added, removed or modified between two snapshots"""
+        changed = set(self.by_id.keys() ^ other.by_id.keys())
+        for venue_id, venue in other.by_id.items():
+            if venue_id in self.by_id and self.by_id[venue_id] != venue:
+                changed.add(venue_id)
+        return changed
+
+
+def load_venue_summaries(db: Session, venue_ids: Optional[Set[int]] = None) -> List[VenueSummary]:
+    """Load active venues and their primary (or first) photo in one column-only query"""
+    photos = primary_photos()
+    venue_query = db.query(
+        Venue.id, Venue.name, Venue.slug, Venue.sport_type, Venue.address,
+        Venue.city, Venue.state, Venue.latitude, Venue.longitude,
+        Venue.rating, Venue.review_count, Venue.description, Venue.updated_at,
+        photos.c.url.label("photo_url")
+    ).outerjoin(photos, photos.c.venue_id == Venue.id)\
+        .filter(Venue.status == "ACTIVE")
+
+    if venue_ids is not None:
+        venue_query = venue_query.filter(Venue.id.in_(venue_ids))
+
+    return [
+        VenueSummary(
+            id=row.id,
+            name=row.name,
+            slug=row.slug,
+            sport_type=row.sport_type,
+            address=row.address,
+            city=row.city,
+            state=row.state,
+            latitude=row.latitude,
+            longitude=row.longitude,
+            rating=row.rating or 0.0,
+            review_count=row.review_count or 0,
+            description=row.description,
+            photo_url=row.photo_url,
+            updated_at=row.updated_at
+        )
+        for row in venue_query.order_by(Venue.id)
+    ]
+
+
+def _signature(db: Session) -> tuple:
+    """Cheap fingerprint of the venue and photo tables, used to spot writes from other processes"""
+    venues = db.query(func.count(Venue.id), func.max(Venue.updated_at)).one()
+    photos = db.query(func.count(VenuePhoto.id), func.max(VenuePhoto.id)).one()
+    return tuple(venues) + tuple(photos)
+
+
+class VenueCache:
+    """Holds the current VenueSnapshot and keeps it fresh"""
+
+    def __init__(self, ttl: float = VENUE_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[VenueSnapshot] = None
+        self._signature: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[SnapshotListener] = []
+
+    def on_snapshot_changed(self, listener: SnapshotListener) -> SnapshotListener:
+        """
+        Register a listener called with (new snapshot, changed venue ids)
+        whenever an existing snapshot is patched or replaced.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def _publish(self, snapshot: VenueSnapshot, changed: Set[int]) -> None:
+        if not changed:
+            return
+        for listener in self._listeners:
+            try:
+                listener(snapshot, changed)
+            except Exception as e:
+                logger.error(f"Snapshot listener {listener.__name__} failed: {e}", exc_info=True)
+
+    def get(self) -> VenueSnapshot:
+        """Current snapshot, building or revalidating it if needed"""
+        if self._snapshot is None:
+            self.rebuild()
+        elif time.monotonic() - self._checked_at > self.ttl:
+            self._revalidate()
+        return self._snapshot
+
+    async def get_async(self) -> VenueSnapshot:
+        """get() for async routes: building or revalidating runs in the threadpool"""
+        if self._snapshot is not None and time.monotonic() - self._checked_at <= self.ttl:
+            return self._snapshot
+        return await run_in_threadpool(self.get)
+
+    def rebuild(self) -> VenueSnapshot:
+        """Load a fresh snapshot from the database"""
+        with self._lock:
+            db = SessionLocal()
+            try:
+                signature = _signature(db)
+                snapshot = VenueSnapshot(load_venue_summaries(db))
+            finally:
+                db.close()
+
+            previous = self._snapshot
+            self._snapshot = snapshot
+            self._signature = signature
+            self._checked_at = time.monotonic()
+
+        logger.info(f"Venue snapshot built: {len(snapshot.venues)} active venues")
+        if previous is not None:
+            self._publish(snapshot, previous.changed_ids(snapshot))
+        return snapshot
+
+    def _revalidate(self) -> None:
+        db = SessionLocal()
+        try:
+            signature = _signature(db)
+        finally:
+            db.close()
+
+        self._checked_at = time.monotonic()
+        if signature != self._signature:
+            self.rebuild()
+
+    def apply_changes(self, venue_ids: Set[int]) -> None:
+        """Reload only the given venues into the current snapshot"""
+        if self._snapshot is None:
+            return
+
+        with self._lock:
+            db = SessionLocal()
+            try:
+                summaries = load_venue_summaries(db, venue_ids)
+                self._signature = _signature(db)
+            finally:
+                db.close()
+
+            snapshot = self._snapshot.patched(summaries, removed_ids=venue_ids)
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+        self._publish(snapshot, venue_ids)
+
+    def clear(self) -> None:
+        """Drop the snapshot; the next get() rebuilds it"""
+        self._snapshot = None
+
+
+venue_cache = VenueCache()
+on_venues_changed(venue_cache.apply_changes)
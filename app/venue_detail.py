@@ -0,0 +1,176 @@
+"""
+Venue detail aggregate for the venue page
+
+load_venue_detail fetches a venue with its photos, hours and pricing in one
+joined SELECT plus one SELECT for amenities, and returns an immutable
+VenueDetail. Built views are kept per slug together with the venue's
+updated_at (which every child write bumps), so a page whose stamp query
+matches renders without loading the venue again.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.venue import Venue
+from app.venue_events import on_venues_changed
+
+# Venue pages kept per process
+VENUE_DETAIL_CACHE_SIZE = int(os.getenv("VENUE_DETAIL_CACHE_SIZE", "2000"))
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+@dataclass(frozen=True)
+class PhotoView:
+    url: str
+    caption: str
+    is_primary: bool
+
+
+@dataclass(frozen=True)
+class AmenityView:
+    name: str
+    available: bool
+
+
+@dataclass(frozen=True)
+class PricingView:
+    admission: Optional[str]
+    rental: Optional[str]
+
+
+@dataclass(frozen=True)
+class VenueDetail:
+    """Read-only view of a venue as shown on its detail page"""
+    id: int
+    name: str
+    slug: str
+    sport_type: str
+    city: str
+    state: str
+    address: Optional[str]
+    zip_code: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    rating: float
+    review_count: int
+    description: Optional[str]
+    phone: Optional[str]
+    website: Optional[str]
+    year_opened: Optional[int]
+    verified: bool
+    amenities: Tuple[AmenityView, ...]
+    photos: Tuple[PhotoView, ...]
+    hours: Optional[Mapping[str, Optional[str]]]
+    pricing: Optional[PricingView]
+    updated_at: Optional[datetime]
+
+    def photos_data(self) -> List[Dict]:
+        """Photos as plain dicts, for the gallery script's JSON"""
+        return [asdict(photo) for photo in self.photos]
+
+
+def _photo_url(url: str) -> str:
+    # Ensure the URL has the maxwidth parameter set to 1600 for better quality
+    if 'maxwidth=' not in url:
+        url += '&maxwidth=1600' if '?' in url else '?maxwidth=1600'
+    return url
+
+
+def build_venue_detail(venue: Venue) -> VenueDetail:
+    """Snapshot a venue whose photos, amenities, hours and pricing are loaded"""
+    # Primary photo first
+    photos = sorted(venue.photos, key=lambda photo: (not photo.is_primary, photo.id))
+    hours = venue.hours
+    pricing = venue.pricing
+    return VenueDetail(
+        id=venue.id,
+        name=venue.name,
+        slug=venue.slug,
+        sport_type=venue.sport_type.value,
+        city=venue.city,
+        state=venue.state,
+        address=venue.address,
+        zip_code=venue.zip_code,
+        latitude=venue.latitude,
+        longitude=venue.longitude,
+        rating=venue.rating,
+        review_count=venue.review_count,
+        description=venue.description,
+        phone=venue.phone,
+        website=venue.website,
+        year_opened=venue.year_opened,
+        verified=venue.verified,
+        amenities=tuple(AmenityView(a.amenity_name, a.available) for a in sorted(venue.amenities, key=lambda a: a.id)),
+        photos=tuple(
+            PhotoView(_photo_url(p.url), p.caption or f"{venue.name} - {venue.city}, {venue.state}", p.is_primary)
+            for p in photos
+        ),
+        hours=MappingProxyType({day: getattr(hours, day) for day in DAYS}) if hours else None,
+        pricing=PricingView(pricing.admission, pricing.rental) if pricing and (pricing.admission or pricing.rental) else None,
+        updated_at=venue.updated_at,
+    )
+
+
+async def load_venue_detail(db: AsyncSession, venue_id: int) -> Optional[VenueDetail]:
+    """The venue and its children in two statements (one-to-ones and photos joined, amenities by IN)"""
+    venue = (await db.scalars(
+        select(Venue)
+        .where(Venue.id == venue_id)
+        .options(
+            joinedload(Venue.photos),
+            joinedload(Venue.hours),
+            joinedload(Venue.pricing),
+            selectinload(Venue.amenities),
+        )
+    )).unique().first()
+    return build_venue_detail(venue) if venue is not None else None
+
+
+class VenueDetailCache:
+    """LRU of VenueDetail per slug, valid while the venue's updated_at is unchanged"""
+
+    def __init__(self, size: int = VENUE_DETAIL_CACHE_SIZE):
+        self.size = size
+        self._views: "OrderedDict[str, VenueDetail]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug: str, updated_at: Optional[datetime]) -> Optional[VenueDetail]:
+        with self._lock:
+            view = self._views.get(slug)
+            if view is None or view.updated_at != updated_at:
+                return None
+            self._views.move_to_end(slug)
+            return view
+
+    def put(self, view: VenueDetail) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._views[view.slug] = view
+            self._views.move_to_end(view.slug)
+            while len(self._views) > self.size:
+                self._views.popitem(last=False)
+
+    def discard(self, venue_ids: Set[int]) -> None:
+        with self._lock:
+            for slug in [slug for slug, view in self._views.items() if view.id in venue_ids]:
+                del self._views[slug]
+
+
+venue_detail_cache = VenueDetailCache()
+
+
+@on_venues_changed
+def _forget_changed_venues(venue_ids: Set[int]) -> None:
+    # Stale entries would also miss on updated_at; this just frees them early
+    venue_detail_cache.discard(venue_ids)
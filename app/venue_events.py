@@ -0,0 +1,92 @@
+"""
+Venue change notifications
+
+Every SQLAlchemy session records which venues it touched while flushing.
+Once the transaction commits, the registered listeners (in-process caches
+and indexes) are told which venue ids changed so they can patch themselves.
+
+Listeners may block (venue_cache reloads the venues through a sync
+session). Commits from sync code run them inline, so the change is
+visible as soon as the commit returns. Commits on the event loop (an
+AsyncSession) hand them to the default executor instead of stalling the
+loop.
+"""
+
+import asyncio
+import logging
+from itertools import chain
+from typing import Callable, Iterable, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.venue import Venue, VenuePhoto, VenueAmenity, VenueHours, VenuePricing
+
+logger = logging.getLogger(__name__)
+
+VenueListener = Callable[[Set[int]], None]
+
+_listeners: List[VenueListener] = []
+
+# Child rows that are part of what a venue looks like on public pages
+_VENUE_CHILDREN = (VenuePhoto, VenueAmenity, VenueHours, VenuePricing)
+
+
+def on_venues_changed(listener: VenueListener) -> VenueListener:
+    """
+    Register a listener called with the set of venue ids changed by each commit.
+
+    It may do blocking I/O, but it can run on a worker thread (see above)
+    alongside other requests, so it must be thread-safe.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def _run_listeners(venue_ids: Set[int]) -> None:
+    for listener in _listeners:
+        try:
+            listener(venue_ids)
+        except Exception as e:
+            logger.error(f"Venue change listener {listener.__name__} failed: {e}", exc_info=True)
+
+
+def notify_venues_changed(venue_ids: Iterable[int]) -> None:
+    """
+    Tell listeners that venues changed.
+
+    Called automatically after each commit; call it directly after writes
+    that bypass the ORM unit of work (bulk inserts, raw SQL).
+    """
+    venue_ids = {venue_id for venue_id in venue_ids if venue_id is not None}
+    if not venue_ids:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _run_listeners(venue_ids)
+    else:
+        loop.run_in_executor(None, _run_listeners, venue_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_venues(session, flush_context):
+    changed = session.info.setdefault("changed_venue_ids", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Venue):
+            changed.add(obj.id)
+        elif isinstance(obj, _VENUE_CHILDREN):
+            changed.add(obj.venue_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changed_venues(session):
+    changed = session.info.pop("changed_venue_ids", None)
+    if changed:
+        notify_venues_changed(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_venues(session):
+    session.info.pop("changed_venue_ids", None)
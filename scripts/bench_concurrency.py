@@ -0,0 +1,114 @@
+"""
+Measure public pages under concurrent load and how long the event loop stalls.
+
+Sends --concurrency requests at a time through httpx's ASGI transport, all
+on one event loop like a uvicorn worker, and probes the loop every
+millisecond meanwhile. A handler that runs sync queries on the loop shows
+up as large loop lag and a p99 close to the whole burst; async or
+threadpool handlers keep the lag near zero. Run it on two commits to
+compare them:
+    python scripts/bench_concurrency.py --concurrency 50 --requests 500
+    python scripts/bench_concurrency.py /venues/some-slug /locations/ca
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_PATHS = [
+    "/",
+    "/locations/states",
+    "/locations/ca",
+    "/locations/ca/los-angeles",
+    "/skate-parks/ca/los-angeles",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe_loop_lag(lags, stop):
+    """Record how late a 1 ms sleep wakes up while requests are in flight"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start) * 1000 - 1)
+
+
+async def bench_path(client, path, requests, concurrency):
+    samples = []
+    statuses = set()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            response = await client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+            statuses.add(response.status_code)
+
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return samples, elapsed, statuses, lags
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    # Skip the anonymous page cache so every request reaches its handler
+    from app.page_cache import page_cache
+    page_cache.ttl = 0
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'path':40} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'max lag ms':>11}")
+            print("-" * 82)
+            for path in args.paths:
+                for _ in range(args.warmup):
+                    await client.get(path)
+                samples, elapsed, statuses, lags = await bench_path(
+                    client, path, args.requests, args.concurrency
+                )
+                status = "" if statuses == {200} else f"  {sorted(statuses)}"
+                print(
+                    f"{path[:40]:40} {statistics.median(samples):9.2f} "
+                    f"{percentile(samples, 99):9.2f} {args.requests / elapsed:9.1f} "
+                    f"{max(lags, default=0):11.2f}{status}"
+                )
+    finally:
+        await app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per path")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per path")
+    args = parser.parse_args()
+
+    # Keep request logging out of the timings
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
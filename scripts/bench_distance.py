@@ -0,0 +1,80 @@
+"""
+Benchmark the vectorized distance engine against the scalar haversine loop.
+
+Uses synthetic US coordinates, so no database is needed:
+    python scripts/bench_distance.py --venues 50000 --queries 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.distance import DistanceEngine
+from app.geo import calculate_distance
+
+
+def scalar_nearest(venues, lat, lng, k, radius):
+    """The original near-me loop: one calculate_distance call per venue"""
+    nearby = []
+    for venue_id, venue_lat, venue_lng in venues:
+        distance = calculate_distance(lat, lng, venue_lat, venue_lng)
+        if distance <= radius:
+            nearby.append((distance, venue_id))
+    nearby.sort()
+    return nearby[:k]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--venues", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=float, default=100)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    venues = [
+        (i, rng.uniform(25.0, 49.0), rng.uniform(-124.0, -67.0))
+        for i in range(args.venues)
+    ]
+    queries = [(rng.uniform(25.0, 49.0), rng.uniform(-124.0, -67.0)) for _ in range(args.queries)]
+    lat, lng = queries[0]
+
+    print(f"{args.venues:,} venues, radius {args.radius} mi, k={args.k}")
+    print("-" * 60)
+
+    # Single point lookup
+    scalar = timed(lambda: scalar_nearest(venues, lat, lng, args.k, args.radius), args.repeat)
+    engine = DistanceEngine([v[0] for v in venues], [v[1] for v in venues], [v[2] for v in venues])
+    vector = timed(lambda: engine.nearest(lat, lng, args.k, args.radius), args.repeat)
+    print(f"single query   scalar {scalar * 1000:9.2f} ms   vectorized {vector * 1000:9.2f} ms   {scalar / vector:6.1f}x")
+
+    # Batch lookup - e.g. "nearby venues" blocks
+    batch_scalar = timed(
+        lambda: [scalar_nearest(venues, q_lat, q_lng, args.k, args.radius) for q_lat, q_lng in queries], 1
+    )
+    q_lats = [q[0] for q in queries]
+    q_lngs = [q[1] for q in queries]
+    batch_vector = timed(lambda: engine.nearest_many(q_lats, q_lngs, args.k, args.radius), 1)
+    print(f"{args.queries} queries    scalar {batch_scalar * 1000:9.2f} ms   vectorized {batch_vector * 1000:9.2f} ms   {batch_scalar / batch_vector:6.1f}x")
+
+    # Sanity check: both paths agree
+    expected = [venue_id for _, venue_id in scalar_nearest(venues, lat, lng, args.k, args.radius)]
+    positions, _ = engine.nearest(lat, lng, args.k, args.radius)
+    assert [int(engine.ids[p]) for p in positions] == expected, "vectorized results differ from scalar loop"
+
+
+if __name__ == "__main__":
+    main()
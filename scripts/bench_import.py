@@ -0,0 +1,120 @@
+"""
+Benchmark the bulk venue importer against the row-at-a-time ORM path.
+
+Imports synthetic scraped venues into two fresh SQLite databases in a temp
+directory (DATABASE_URL is overridden), so the real database is untouched:
+    python scripts/bench_import.py --venues 5000 --chunk-size 1000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+CITIES = [
+    ("CA", "Los Angeles", 34.05, -118.24),
+    ("NY", "New York", 40.71, -74.01),
+    ("TX", "Austin", 30.27, -97.74),
+    ("IL", "Chicago", 41.88, -87.63),
+    ("FL", "Miami", 25.76, -80.19),
+]
+
+HOURS = ["Monday: 9 AM – 9 PM", "Tuesday: 9 AM – 9 PM", "Wednesday: Closed", "Saturday: 10 AM – 11 PM"]
+
+
+def synthetic_venues(count, prefix):
+    rng = random.Random(42)
+    venues = []
+    for i in range(count):
+        state, city, lat, lng = rng.choice(CITIES)
+        venues.append({
+            "name": f"Bench Rink {i}",
+            "slug": f"{prefix}-bench-rink-{i}",
+            "sport_type": rng.choice(["roller_skating", "ice_skating", "skateboarding"]),
+            "address": f"{i} Main St",
+            "city": city,
+            "state": state,
+            "zip_code": "00000",
+            "latitude": lat + rng.uniform(-0.2, 0.2),
+            "longitude": lng + rng.uniform(-0.2, 0.2),
+            "phone": "555-0100",
+            "website": "https://example.com",
+            "description": "A synthetic venue",
+            "rating": round(rng.uniform(3, 5), 1),
+            "review_count": rng.randint(0, 500),
+            "google_place_id": f"{prefix}-place-{i}",
+            "photos": [f"https://example.com/{i}/{n}.jpg" for n in range(rng.randint(0, 5))],
+            "opening_hours": HOURS if rng.random() < 0.7 else [],
+        })
+    return venues
+
+
+def row_at_a_time(venues):
+    """The original import_to_database loop: one venue per flush, commit every 100"""
+    from app.database import SessionLocal
+    from app.scrapers.detailed_importer import import_detailed_venue
+
+    db = SessionLocal()
+    try:
+        for n, venue in enumerate(venues, 1):
+            import_detailed_venue(venue, db)
+            if n % 100 == 0:
+                db.commit()
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--venues", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_import_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+
+    # Imported after DATABASE_URL is set
+    from app.database import engine, init_db
+    from app.scrapers.detailed_importer import import_detailed_venues
+
+    logging.disable(logging.CRITICAL)
+    init_db()
+
+    # Both runs insert into the same database, the second under new ids and slugs
+    print(f"{'path':24} {'venues':>8} {'seconds':>9} {'venues/s':>10}")
+    print("-" * 54)
+
+    venues = synthetic_venues(args.venues, "orm")
+    start = time.perf_counter()
+    row_at_a_time(venues)
+    elapsed = time.perf_counter() - start
+    print(f"{'row-at-a-time':24} {args.venues:8} {elapsed:9.2f} {args.venues / elapsed:10.0f}")
+
+    venues = synthetic_venues(args.venues, "bulk")
+    stats = import_detailed_venues(venues, chunk_size=args.chunk_size)
+    print(f"{'bulk':24} {stats.imported:8} {stats.seconds:9.2f} {stats.rows_per_second:10.0f}")
+
+    # Re-importing the same batch only costs the duplicate check
+    stats = import_detailed_venues(venues, chunk_size=args.chunk_size)
+    print(f"{'bulk (all duplicates)':24} {stats.skipped:8} {stats.seconds:9.2f} {stats.rows_per_second:10.0f}")
+
+    # A nightly refresh: nothing changed, then every tenth venue re-rated
+    stats = import_detailed_venues(venues, chunk_size=args.chunk_size, refresh=True)
+    print(f"{'refresh (unchanged)':24} {stats.unchanged:8} {stats.seconds:9.2f} {stats.rows_per_second:10.0f}")
+    for venue in venues[::10]:
+        venue["rating"] = round(venue["rating"] - 0.1, 1)
+    stats = import_detailed_venues(venues, chunk_size=args.chunk_size, refresh=True)
+    print(f"{'refresh (10% changed)':24} {stats.updated:8} {stats.seconds:9.2f} {stats.rows_per_second:10.0f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare request throughput of the site middleware against the old pair of http middlewares.
+
+Drives the real app in-process through httpx's ASGI transport, once with
+SiteMiddleware and once with the two @app.middleware("http") functions
+it replaced (security headers + eager CSRF/flash state, reproduced below,
+with the state middleware placed inside the session middleware so it does
+its session work), at the same concurrency, so the difference is the
+middleware stack:
+    python scripts/bench_middleware.py --requests 2000
+    python scripts/bench_middleware.py --concurrency 1 /health /static/favicon.ico
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_PATHS = [
+    "/health",
+    "/static/favicon.ico",
+    "/locations/states",
+    "/",
+]
+
+
+def legacy_middleware():
+    """The BaseHTTPMiddleware pair that app.main used before SiteMiddleware"""
+    from starlette.middleware import Middleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from app.csrf import generate_csrf_token
+    from app.flash import get_flashed_messages
+    from app.middleware import CONTENT_SECURITY_POLICY
+
+    async def add_template_context(request, call_next):
+        request.state.messages = get_flashed_messages(request)
+        request.state.csrf_token = generate_csrf_token(request)
+        return await call_next(request)
+
+    async def add_security_headers(request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Content-Security-Policy"] = CONTENT_SECURITY_POLICY
+        return response
+
+    return (
+        Middleware(BaseHTTPMiddleware, dispatch=add_security_headers),
+        Middleware(BaseHTTPMiddleware, dispatch=add_template_context),
+    )
+
+
+async def measure(app, path, requests, concurrency):
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(10):
+            await client.get(path)
+        remaining = requests
+        started = time.perf_counter()
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{path}: HTTP {response.status_code}")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def run(args):
+    from starlette.middleware.sessions import SessionMiddleware
+
+    from app.database import engine
+    from app.main import app
+    from app.middleware import SiteMiddleware
+
+    # Keep SQL echo and request logging out of the timings
+    engine.echo = False
+    logging.disable(logging.CRITICAL)
+
+    current = list(app.user_middleware)
+    headers, context = legacy_middleware()
+    # The context middleware goes inside SessionMiddleware, where it can read the session
+    legacy = [headers]
+    for middleware in current:
+        if middleware.cls is not SiteMiddleware:
+            legacy.append(middleware)
+        if middleware.cls is SessionMiddleware:
+            legacy.append(context)
+
+    await app.router.startup()
+    try:
+        print(f"{'path':30} {'old req/s':>10} {'new req/s':>10} {'change':>8}")
+        print("-" * 61)
+        for path in args.paths:
+            rates = []
+            for stack in (legacy, current):
+                app.user_middleware = stack
+                app.middleware_stack = None
+                rates.append(await measure(app, path, args.requests, args.concurrency))
+            print(f"{path[:30]:30} {rates[0]:10.0f} {rates[1]:10.0f} {(rates[1] / rates[0] - 1) * 100:+7.0f}%")
+    finally:
+        app.user_middleware = current
+        app.middleware_stack = None
+        await app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per path and stack")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
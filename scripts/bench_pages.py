@@ -0,0 +1,76 @@
+"""
+Measure public page latency (p50 / p99) and throughput in-process.
+
+Runs the app through Starlette's TestClient against whatever DATABASE_URL
+points at, so it measures handler + template + database cost without
+network noise:
+    python scripts/bench_pages.py --requests 200
+    python scripts/bench_pages.py --requests 500 / /search?q=park /locations/ca
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_PATHS = [
+    "/",
+    "/search?q=skate",
+    "/search?sport_type=ice_skating",
+    "/locations/states",
+    "/locations/ca",
+    "/locations/ca/los-angeles",
+    "/skate-parks/ca/los-angeles",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per path")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per path")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.database import engine
+
+    # Keep SQL echo and request logging out of the timings
+    engine.echo = False
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'path':45} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    print("-" * 75)
+
+    with TestClient(app) as client:
+        for path in args.paths:
+            for _ in range(args.warmup):
+                client.get(path)
+
+            samples = []
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.get(path)
+                samples.append((time.perf_counter() - start) * 1000)
+            elapsed = time.perf_counter() - started
+
+            status = "" if response.status_code == 200 else f"  [{response.status_code}]"
+            print(
+                f"{path[:45]:45} {statistics.median(samples):9.2f} "
+                f"{percentile(samples, 99):9.2f} {args.requests / elapsed:9.1f}{status}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Benchmark the async Places fetcher against the serial scraper loop on a stub server.
+
+Starts a local stub of the Places text search and details endpoints (with
+per-request latency, page tokens that need a delay before they work, and
+optional injected 429 / OVER_QUERY_LIMIT errors), then scrapes the same
+cities with the old serial loop and with the async client:
+    python scripts/bench_places.py --cities 3 --latency 0.1 --error-rate 0.05
+    python scripts/bench_places.py --skip-serial --cache
+
+Or just run the stub and point the scraper at it:
+    python scripts/bench_places.py --serve --port 8765
+    GOOGLE_PLACES_BASE_URL=http://127.0.0.1:8765 GOOGLE_MAPS_API_KEY=stub python app/scrapers/google_maps_bulk.py
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def stub_app(latency, results_per_page, pages, token_delay, error_rate):
+    """Starlette app answering /textsearch/json and /details/json like the Places API"""
+    rng = random.Random(7)
+    tokens = {}
+    stats = {"requests": 0, "errors": 0, "not_modified": 0}
+
+    def place(query, n):
+        city, state = query.split(" in ", 1)[1].split(", ")
+        # Rinks show up in both the ice and roller searches
+        kind = "rink" if "rink" in query else "park"
+        return {
+            "place_id": f"{kind}-{city}-{n}".lower().replace(" ", "-"),
+            "name": f"{city} {kind.title()} {n}",
+            "formatted_address": f"{n} Main St, {city}, {state} 00000, USA",
+            "geometry": {"location": {"lat": 40.0 + n / 1000, "lng": -75.0 - n / 1000}},
+            "rating": 4.2,
+            "user_ratings_total": n,
+        }
+
+    async def answer(request, body, etag=None):
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            if rng.random() < 0.5:
+                return JSONResponse({"status": "OVER_QUERY_LIMIT"})
+            return JSONResponse({}, status_code=429)
+        return JSONResponse(body, headers={"ETag": etag} if etag else None)
+
+    async def textsearch(request):
+        token = request.query_params.get("pagetoken")
+        if token:
+            query, page, issued = tokens[token]
+            if time.monotonic() - issued < token_delay:
+                return await answer(request, {"status": "INVALID_REQUEST", "results": []})
+        else:
+            query, page = request.query_params["query"], 0
+        start = page * results_per_page
+        body = {"status": "OK", "results": [place(query, n) for n in range(start, start + results_per_page)]}
+        if page + 1 < pages:
+            next_token = f"token-{len(tokens)}"
+            tokens[next_token] = (query, page + 1, time.monotonic())
+            body["next_page_token"] = next_token
+        return await answer(request, body)
+
+    async def details(request):
+        place_id = request.query_params["place_id"]
+        etag = f'"{place_id}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            stats["requests"] += 1
+            stats["not_modified"] += 1
+            await asyncio.sleep(latency)
+            return Response(status_code=304, headers={"ETag": etag})
+        return await answer(request, etag=etag, body={"status": "OK", "result": {
+            "website": f"https://example.com/{place_id}",
+            "formatted_phone_number": "(555) 010-0100",
+            "opening_hours": {"weekday_text": ["Monday: 9 AM – 9 PM", "Tuesday: Closed"]},
+            "photos": [{"photo_reference": f"{place_id}-{n}"} for n in range(3)],
+        }})
+
+    app = Starlette(routes=[Route("/textsearch/json", textsearch), Route("/details/json", details)])
+    app.state.stats = stats
+    return app
+
+
+def start_stub(app, port):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def serial_scrape(base_url, cities):
+    """The original scrape_all_venues loop (sleeps included), without the import"""
+    from slugify import slugify
+    from app.scrapers.google_maps_scraper import GoogleMapsVenueScraper
+
+    scraper = GoogleMapsVenueScraper("stub")
+    scraper.base_url = base_url
+    venues = []
+    for city, state in cities:
+        for search in (scraper.search_skateparks, scraper.search_ice_rinks, scraper.search_roller_rinks):
+            for venue in search(city, state):
+                details = scraper.get_place_details(venue.get('google_place_id'))
+                venue.update({
+                    'website': details.get('website'),
+                    'phone': details.get('formatted_phone_number'),
+                    'opening_hours': details.get('opening_hours', {}).get('weekday_text', []),
+                    'photos': [p.get('photo_reference') for p in details.get('photos', [])],
+                    'slug': slugify(f"{venue.get('name')} {venue.get('city')} {venue.get('state')}")
+                })
+                venues.append(venue)
+                time.sleep(0.05)
+            time.sleep(1)
+    return venues
+
+
+async def async_scrape(base_url, cities, city_concurrency, cache=None):
+    from app.scrapers.places_client import AsyncPlacesClient, scrape_city
+
+    city_slots = asyncio.Semaphore(city_concurrency)
+
+    async def one(city, state):
+        async with city_slots:
+            return await scrape_city(client, city, state)
+
+    async with AsyncPlacesClient("stub", base_url=base_url, cache=cache) as client:
+        found = await asyncio.gather(*(one(city, state) for city, state in cities))
+        return [venue for venues in found for venue in venues], client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cities", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub seconds per request")
+    parser.add_argument("--results", type=int, default=20, help="Results per search page")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per search")
+    parser.add_argument("--token-delay", type=float, default=2.0, help="Seconds before a page token works")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail")
+    parser.add_argument("--city-concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help="Only run the stub server")
+    parser.add_argument("--skip-serial", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="Also run with a details cache (cold, warm, stale)")
+    args = parser.parse_args()
+
+    app = stub_app(args.latency, args.results, args.pages, args.token_delay, args.error_rate)
+    base_url = f"http://127.0.0.1:{args.port}"
+    if args.serve:
+        import uvicorn
+        print(f"Stub Places API on {base_url}")
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+        return
+
+    from app.scrapers.google_maps_bulk import TOP_CITIES
+
+    logging.disable(logging.CRITICAL)
+    server = start_stub(app, args.port)
+    cities = TOP_CITIES[:args.cities]
+    stats = app.state.stats
+
+    print(f"{'path':11} {'cities':>7} {'venues':>7} {'requests':>9} {'seconds':>9} {'s/city':>8}")
+    print("-" * 57)
+    if not args.skip_serial:
+        stats["requests"] = 0
+        start = time.perf_counter()
+        venues = serial_scrape(base_url, cities)
+        elapsed = time.perf_counter() - start
+        print(f"{'serial':11} {len(cities):7} {len(venues):7} {stats['requests']:9} {elapsed:9.1f} {elapsed / len(cities):8.2f}")
+
+    stats["requests"] = stats["errors"] = 0
+    start = time.perf_counter()
+    venues, client = asyncio.run(async_scrape(base_url, cities, args.city_concurrency))
+    elapsed = time.perf_counter() - start
+    print(f"{'async':11} {len(cities):7} {len(venues):7} {stats['requests']:9} {elapsed:9.1f} {elapsed / len(cities):8.2f}")
+    if stats["errors"]:
+        print(f"\n{stats['errors']} injected errors, {client.retries} retries")
+
+    if args.cache:
+        # Cold, warm (fresh entries) and stale (every entry revalidated) details cache
+        from app.scrapers.response_cache import ResponseCache
+
+        cache = ResponseCache(str(Path(tempfile.mkdtemp()) / "places_cache.sqlite3"), ttl=3600)
+        for label, ttl in (("cold cache", 3600), ("warm cache", 3600), ("stale cache", 0)):
+            cache.ttl = ttl
+            stats["requests"] = stats["not_modified"] = 0
+            start = time.perf_counter()
+            venues, client = asyncio.run(async_scrape(base_url, cities, args.city_concurrency, cache))
+            elapsed = time.perf_counter() - start
+            print(f"{label:11} {len(cities):7} {len(venues):7} {stats['requests']:9} {elapsed:9.1f} {elapsed / len(cities):8.2f}"
+                  f"  ({stats['not_modified']} not modified)")
+        cache.close()
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
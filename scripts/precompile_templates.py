@@ -0,0 +1,28 @@
+"""
+Compile every template under app/templates into the bytecode cache.
+
+Run at image build so fresh workers load compiled templates instead of
+parsing sources:
+    python scripts/precompile_templates.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.templating import TEMPLATE_CACHE_DIR, precompile_templates
+
+
+def main():
+    if not TEMPLATE_CACHE_DIR:
+        print("TEMPLATE_CACHE_DIR is empty; nothing to precompile into")
+        return
+    start = time.perf_counter()
+    count = precompile_templates()
+    print(f"Precompiled {count} templates into {TEMPLATE_CACHE_DIR} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
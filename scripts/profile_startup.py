@@ -0,0 +1,103 @@
+"""
+Profile web worker startup: import cost per module and warm-up time.
+
+Imports app.main in a fresh interpreter under `python -X importtime`,
+then reports the slowest modules (cumulative and self time), the cost per
+top-level package, and the time spent in the startup handlers (warm-up).
+Exits non-zero when a module that must stay out of the web process
+(scraper dependencies) was imported, so it can gate a build:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --top 40 --no-startup
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Only the scraper scripts may load these
+FORBIDDEN = ("requests", "bs4", "app.scrapers")
+
+STARTUP_PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def lifespan():
+    await app.router.startup()
+    started = time.perf_counter()
+    await app.router.shutdown()
+    return started
+
+started = asyncio.run(lifespan())
+print(json.dumps({"import": imported - start, "startup": started - imported, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_times():
+    """[(module, self µs, cumulative µs, depth)] for `import app.main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode:
+        sys.exit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def startup_times():
+    result = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=25, help="Modules to list per table")
+    parser.add_argument("--no-startup", action="store_true", help="Skip running the startup handlers")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total = next(cumulative for name, _, cumulative, _ in rows if name == "app.main")
+
+    print(f"import app.main: {total / 1000:.0f} ms, {len(rows)} modules\n")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:8.1f}  {'  ' * depth}{name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        # app.* is split per first-level module, everything else per distribution
+        parts = name.split(".")
+        packages[".".join(parts[:2]) if parts[0] == "app" else parts[0]] += self_us
+    print(f"\n{'self ms':>8}  package")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:8.1f}  {package}")
+
+    modules = {name for name, _, _, _ in rows}
+    if not args.no_startup:
+        probe = startup_times()
+        modules.update(probe["modules"])
+        print(f"\nimport {probe['import']:.2f}s, startup handlers {probe['startup']:.2f}s")
+
+    loaded = sorted(name for name in modules if any(name == bad or name.startswith(bad + ".") for bad in FORBIDDEN))
+    if loaded:
+        print(f"\nScraper dependencies loaded in the web process: {', '.join(loaded)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Recompute every venue's rating totals from its approved reviews.
+
+Fixes venues whose running totals drifted (raw SQL edits, rows written
+before the totals existed). Run after such edits, or periodically from cron:
+    python scripts/reconcile_ratings.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, ensure_columns
+from app.ratings import reconcile_ratings
+
+
+def main():
+    ensure_columns()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        fixed = reconcile_ratings(db)
+        print(f"Ratings reconciled: {fixed} venues fixed in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Rebuild the state / city / sport rollup tables from the venues table.
+
+Run after bulk imports or raw SQL edits, or periodically from cron:
+    python scripts/refresh_rollups.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.rollups import ensure_rollups, refresh_rollups
+
+
+def main():
+    db = SessionLocal()
+    try:
+        ensure_rollups(db)
+        start = time.perf_counter()
+        states = refresh_rollups(db)
+        print(f"Rollups refreshed: {states} states in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 """
 Run only the database import process from an existing JSON file.
+
+Pass --refresh to also update venues that already exist and changed since
+the last import (e.g. new ratings, hours or photos).
 """
 
 import os
@@ -14,6 +17,7 @@ from app.scrapers.google_maps_bulk import import_to_database
 def main():
     load_dotenv()
     json_file = 'google_maps_venues.json'
+    refresh = '--refresh' in sys.argv[1:]
 
     if not os.path.exists(json_file):
         print(f"\n❌ ERROR: JSON file not found: {json_file}")
@@ -27,7 +31,7 @@ def main():
     
     if venues:
         print("Starting database import...")
-        import_to_database(venues)
+        import_to_database(venues, refresh=refresh)
     else:
         print("No venues to import.")
 
@@ -0,0 +1,25 @@
+"""
+Shared fixtures: every test run gets its own SQLite database file
+"""
+
+import os
+import tempfile
+
+# Must be set before app.database creates its engines
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models import rollup, venue  # noqa: F401  (register the tables)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
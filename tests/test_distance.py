@@ -0,0 +1,33 @@
+"""
+Top-k lookups in app.distance and the nearby venues API
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.distance import DistanceEngine
+
+# Downtown LA, Santa Monica, San Diego
+ENGINE = DistanceEngine([1, 2, 3], [34.05, 34.02, 32.72], [-118.24, -118.49, -117.16])
+
+
+def test_nearest_orders_by_distance():
+    positions, distances = ENGINE.nearest(34.0, -118.4, 2)
+    assert ENGINE.ids[positions].tolist() == [2, 1]
+    assert distances[0] < distances[1]
+
+
+@pytest.mark.parametrize("k", [0, -5])
+def test_nearest_without_room_is_empty(k):
+    positions, distances = ENGINE.nearest(34.0, -118.4, k)
+    assert len(positions) == len(distances) == 0
+    assert all(len(positions) == 0 for positions, _ in ENGINE.nearest_many([34.0, 32.7], [-118.4, -117.1], k))
+
+
+@pytest.mark.parametrize("limit", [0, -5, 100000])
+def test_nearby_api_rejects_bad_limit(db, limit):
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.get("/api/venues/nearby", params={"lat": 34, "lng": -118.4, "radius": 5000, "limit": limit})
+        assert response.status_code == 422
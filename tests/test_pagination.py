@@ -0,0 +1,73 @@
+"""
+Keyset cursors from app.pagination: tampered tokens must fall back to the first page
+"""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.venue import SportType, Venue, VenueStatus
+from app.pagination import Cursor, paginate_query
+
+
+def token(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+MALFORMED = [
+    {"k": [], "p": 2},
+    {"k": [None, None], "p": 2},
+    {"k": [[1], {"x": 1}], "p": 2},
+    {"k": 5, "p": 2},
+    {"k": [1, 2], "p": "2"},
+    {"k": [1, 2], "p": 2, "t": "many"},
+    {"k": [{"dt": 5}, 2], "p": 2},
+    {"k": [{"dt": "yesterday"}, 2], "p": 2},
+    [1, 2],
+]
+
+
+def test_round_trip():
+    cursor = Cursor((datetime(2024, 5, 1, 12, 30), 7), before=True, page=3, total=120)
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("payload", MALFORMED)
+def test_malformed_tokens_decode_to_first_page(payload):
+    assert Cursor.decode(token(payload)) is None
+
+
+def test_garbage_tokens_decode_to_first_page():
+    assert Cursor.decode("not-base64!") is None
+    assert Cursor.decode(base64.urlsafe_b64encode(b"{").decode()) is None
+
+
+@pytest.fixture
+def venues(db):
+    db.add_all(
+        Venue(
+            name=f"Skate Park {i}", slug=f"skate-park-{i}", sport_type=SportType.SKATEBOARDING, city="Austin",
+            state="TX", description="A skate park", status=VenueStatus.ACTIVE, rating=4.0, review_count=i
+        )
+        for i in range(1, 4)
+    )
+    db.commit()
+
+
+def test_key_for_another_order_is_ignored(db, venues):
+    order = [(Venue.created_at, True), (Venue.id, True)]
+    page = paginate_query(db.query(Venue), order, lambda v: (v.created_at, v.id), 2, Cursor((1,), page=2))
+    assert [venue.slug for venue in page.items] == ["skate-park-3", "skate-park-2"]
+
+
+@pytest.mark.parametrize("payload", [{"k": [1], "p": 2}, {"k": [], "p": 2}, {"k": [None, None], "p": 2}])
+def test_search_survives_tampered_cursor(db, venues, payload):
+    from app.main import app
+
+    with TestClient(app) as client:
+        for params in ({"q": "skate"}, {"sort": "name"}):
+            response = client.get("/search", params={**params, "cursor": token(payload)})
+            assert response.status_code == 200
@@ -0,0 +1,139 @@
+"""
+Running rating totals kept by app.ratings
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.models.venue import Review, SportType, User, Venue, VenueStatus
+from app.ratings import approve_reviews, delete_reviews, ensure_ratings, reconcile_ratings
+from app.scrapers.detailed_importer import import_detailed_venues
+
+
+@pytest.fixture
+def venue(db):
+    user = User(email="mod@example.com", username="mod", hashed_password="x")
+    venue = Venue(
+        name="Test Park", slug="test-park", sport_type=SportType.SKATEBOARDING, city="Austin", state="TX",
+        description="A park", status=VenueStatus.ACTIVE, rating=4.3, review_count=453
+    )
+    db.add_all([user, venue])
+    db.commit()
+    return venue
+
+
+def add_reviews(db, venue, *ratings):
+    user = db.query(User).first()
+    reviews = [Review(venue_id=venue.id, user_id=user.id, rating=rating, comment="ok") for rating in ratings]
+    db.add_all(reviews)
+    db.commit()
+    return [review.id for review in reviews]
+
+
+def totals(db, venue):
+    db.expire_all()
+    venue = db.get(Venue, venue.id)
+    return venue.rating_sum, venue.rating_count, venue.rating, venue.review_count
+
+
+def test_pending_reviews_keep_imported_rating(db, venue):
+    add_reviews(db, venue, 1, 2)
+    assert totals(db, venue) == (0, 0, 4.3, 453)
+
+
+def test_approve_adds_to_totals(db, venue):
+    ids = add_reviews(db, venue, 5, 5, 4)
+    assert approve_reviews(db, ids) == 3
+    assert totals(db, venue) == (14, 3, 4.7, 3)
+
+
+def test_reapprove_counts_once(db, venue):
+    ids = add_reviews(db, venue, 5, 4)
+    approve_reviews(db, ids)
+    assert approve_reviews(db, ids) == 0
+    assert totals(db, venue) == (9, 2, 4.5, 2)
+
+
+def test_reject_pending_leaves_totals(db, venue):
+    approved = add_reviews(db, venue, 5, 4)
+    approve_reviews(db, approved)
+    pending = add_reviews(db, venue, 1)
+    assert delete_reviews(db, pending) == 1
+    assert totals(db, venue) == (9, 2, 4.5, 2)
+
+
+def test_delete_approved_subtracts(db, venue):
+    ids = add_reviews(db, venue, 5, 4, 1)
+    approve_reviews(db, ids)
+    assert delete_reviews(db, ids[2:]) == 1
+    assert totals(db, venue) == (9, 2, 4.5, 2)
+    assert delete_reviews(db, ids[2:]) == 0
+
+
+def test_deleting_last_review_keeps_rating(db, venue):
+    ids = add_reviews(db, venue, 5)
+    approve_reviews(db, ids)
+    delete_reviews(db, ids)
+    assert totals(db, venue) == (0, 0, 5.0, 1)
+
+
+def test_reconcile_rebuilds_drifted_totals(db, venue):
+    ids = add_reviews(db, venue, 5, 4, 3)
+    approve_reviews(db, ids)
+    assert reconcile_ratings(db) == 0
+
+    db.execute(text("UPDATE venues SET rating_sum = 0, rating_count = 0, rating = 1.0"))
+    db.commit()
+    assert reconcile_ratings(db) == 1
+    assert totals(db, venue) == (12, 3, 4.0, 3)
+    assert reconcile_ratings(db) == 0
+
+
+def scraped(**changes):
+    venue_data = {
+        "name": "Test Park", "slug": "test-park", "sport_type": "skateboarding", "city": "Austin", "state": "TX",
+        "google_place_id": "place-1", "phone": "555-0100", "rating": 4.3, "review_count": 453,
+    }
+    venue_data.update(changes)
+    return venue_data
+
+
+def test_refresh_import_keeps_site_rating(db, venue):
+    venue.google_place_id = "place-1"
+    db.commit()
+    ids = add_reviews(db, venue, 5, 4)
+    approve_reviews(db, ids)
+
+    stats = import_detailed_venues([scraped(phone="555-0199")], refresh=True)
+    assert stats.updated == 1
+    assert totals(db, venue) == (9, 2, 4.5, 2)
+    assert db.get(Venue, venue.id).phone == "555-0199"
+
+
+def test_refresh_import_updates_unreviewed_rating(db, venue):
+    venue.google_place_id = "place-1"
+    db.commit()
+    import_detailed_venues([scraped(rating=4.1, review_count=460)], refresh=True)
+    assert totals(db, venue) == (0, 0, 4.1, 460)
+
+
+def test_ensure_ratings_backfills_empty_totals(db, venue):
+    ids = add_reviews(db, venue, 5, 4)
+    approve_reviews(db, ids)
+
+    # As if the total columns had just been added to an existing table
+    db.execute(text("UPDATE venues SET rating_sum = 0, rating_count = 0, rating = 4.3, review_count = 453"))
+    db.commit()
+    ensure_ratings(db)
+    assert totals(db, venue) == (9, 2, 4.5, 2)
+
+
+def test_ensure_ratings_leaves_repairs_to_reconcile(db, venue):
+    ids = add_reviews(db, venue, 5, 4)
+    approve_reviews(db, ids)
+
+    db.execute(text("UPDATE venues SET rating = 1.0"))
+    db.commit()
+    ensure_ratings(db)
+    assert totals(db, venue) == (9, 2, 1.0, 2)
+    assert reconcile_ratings(db) == 1
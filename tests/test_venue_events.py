@@ -0,0 +1,44 @@
+"""
+Venue change listeners from app.venue_events: inline for sync commits, off the event loop for async ones
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app import venue_events
+
+
+@pytest.fixture
+def calls():
+    calls = []
+    done = threading.Event()
+
+    def record(venue_ids):
+        calls.append((threading.get_ident(), venue_ids))
+        done.set()
+
+    venue_events.on_venues_changed(record)
+    yield calls, done
+    venue_events._listeners.remove(record)
+
+
+def test_sync_notify_runs_listeners_inline(calls):
+    calls, _ = calls
+    venue_events.notify_venues_changed([1, None, 2])
+    assert calls == [(threading.get_ident(), {1, 2})]
+
+
+def test_notify_on_event_loop_runs_listeners_off_it(calls):
+    calls, done = calls
+
+    async def commit():
+        venue_events.notify_venues_changed([3])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(commit())
+    assert done.wait(5)
+    [(thread, venue_ids)] = calls
+    assert venue_ids == {3}
+    assert thread != loop_thread